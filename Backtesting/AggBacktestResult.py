@@ -9,7 +9,7 @@ from DataDownload.DataFile import DataFile
 
 
 class AggBacktestResult:
-    def __init__(self, backtest_results: list[BacktestResult], initial_invest: float = 100, data_file: DataFile = None, with_ts: bool = True):
+    def __init__(self, backtest_results: list[BacktestResult], initial_invest: float = 100, data_file: DataFile = None, with_ts: bool = True, benchmark_mid: None | pd.Series = None):
         backtest_results = [br for br in backtest_results if br is not None]
         if len(backtest_results) == 0:
             return
@@ -28,6 +28,10 @@ class AggBacktestResult:
         if data_file is not None:
             self.ticker = data_file.ticker
             backtest_results.append(BacktestResult.from_data_file(data_file, start_date=self.first_date, end_date=self.last_date))
+        elif benchmark_mid is not None:
+            # mid prices sent back by the process that loaded the DataFile, the benchmark spans the dates of the results like with data_file
+            self.ticker = backtest_results[0].ticker
+            backtest_results.append(BacktestResult.from_mid(self.ticker, benchmark_mid, start_date=self.first_date, end_date=self.last_date))
         else:
             self.ticker = backtest_results[0].ticker
 
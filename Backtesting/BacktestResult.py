@@ -123,8 +123,12 @@ class BacktestResult:
     @staticmethod
     def from_data_file(data_file: DataFile, start_date: date | datetime = None, end_date: date | datetime = None) -> "BacktestResult":
         print(f"Create BacktestResult from DataFile for:{data_file.ticker}")
-        start: int = int(data_file.index.get_indexer(pd.Index([start_date]), method="bfill")[0])
-        end: int = int(data_file.index.get_indexer(pd.Index([end_date]), method="ffill")[0])
-        ts = data_file.mid.iloc[start : end + 1]
+        return BacktestResult.from_mid(data_file.ticker, data_file.mid, start_date=start_date, end_date=end_date)
+
+    @staticmethod
+    def from_mid(ticker: str, mid: pd.Series, start_date: date | datetime = None, end_date: date | datetime = None) -> "BacktestResult":
+        start: int = int(mid.index.get_indexer(pd.Index([start_date]), method="bfill")[0])
+        end: int = int(mid.index.get_indexer(pd.Index([end_date]), method="ffill")[0])
+        ts = mid.iloc[start : end + 1]
         performance_rel = ts / ts.iloc[0]
-        return BacktestResult(ticker=data_file.ticker, performance_rel=performance_rel, strategy_name=f"Benchmark:{data_file.ticker}")
+        return BacktestResult(ticker=ticker, performance_rel=performance_rel, strategy_name=f"Benchmark:{ticker}")
@@ -0,0 +1,203 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, datetime, timedelta
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from Backtesting.Backtesting import Backtesting
+from Backtesting.BacktestResult import BacktestResult
+from Backtesting.Strategy.BaseStrategy import BaseStrategy
+from DataDownload.Bi5Cache import Bi5Cache
+from DataDownload.DataFile import DataFile
+from DataDownload.DataStore import BaseDataStore, LocalDataStore, SplitBucketDataStore
+from DataDownload.SharedMemoryDataFile import SharedMemoryDataFile
+
+# (ticker, start_date, start_at, end_date) of one row of the job matrix
+Dataset = tuple[str, date, int | date, date]
+
+# DataFile a worker process keeps for the next task of the same dataset
+_resident: dict[tuple[str, date, date], DataFile] = {}
+
+
+class DataSource:
+    # how a process opens the data stores and DataFiles, only settings so it can be sent to worker processes
+    def __init__(self, num_threads: int = 1, memmap: bool = False, compact: bool = False, bi5_cache: bool = False, bi5_cache_only: bool = False, bi5_cache_size_gb: float = 10):
+        self.num_threads = num_threads
+        self.memmap = memmap
+        self.compact = compact
+        self.bi5_cache = bi5_cache
+        self.bi5_cache_only = bi5_cache_only
+        self.bi5_cache_size_gb = bi5_cache_size_gb
+        self._bi5_cache = None
+
+    def __getstate__(self) -> dict:
+        # the sqlite connection of the Bi5Cache is opened again in every process
+        return {**self.__dict__, "_bi5_cache": None}
+
+    def bi5(self) -> None | Bi5Cache:
+        if self._bi5_cache is None and (self.bi5_cache or self.bi5_cache_only):
+            self._bi5_cache = Bi5Cache(max_bytes=int(self.bi5_cache_size_gb * 1024**3), only_cache=self.bi5_cache_only)
+        return self._bi5_cache
+
+    def data_store(self, ticker: str) -> BaseDataStore:
+        try:
+            return SplitBucketDataStore(ticker=ticker, num_threads=self.num_threads, bi5_cache=self.bi5())
+        except Exception as e:
+            return LocalDataStore(ticker=ticker, bi5_cache=self.bi5())
+
+    def update(self, ticker: str, start_date: date, end_date: date) -> None:
+        self.data_store(ticker).update_ts(start_date=start_date, end_date=end_date)
+
+    def datafile(self, ticker: str, start_date: date, end_date: date, update: bool = True) -> DataFile:
+        return self.data_store(ticker).create_datafile(start_date=start_date, end_date=end_date, memmap=self.memmap, compact=self.compact, update=update)
+
+
+class BacktestScheduler:
+    # runs the (ticker, window, strategy) job matrix on a process pool
+    # the strategies of a dataset are split into at most as many tasks as there are idle processes, a task loads its DataFile
+    # once and evaluates its strategies on one IndicatorGraph, the results of every task are yielded as soon as it finishes
+    # a dataset split into several tasks is loaded once here and published as SharedMemoryDataFile, its tasks attach to it
+    # memory_budget (bytes) limits the DataFiles that are loaded at once, sizes are estimated from the datasets already loaded
+    # initializer and initargs are passed to the process pool, e.g. to activate an IndicatorCache in every worker process
+    # the stored ts of every ticker is updated here before the tasks are dispatched, the processes only read the stores
+    def __init__(self, source: DataSource, processes: int = 1, threads: int = 1, memory_budget: None | int = None, backtest: bool = True, initializer=None, initargs: tuple = ()):
+        self.source = source
+        self.processes = processes
+        self.threads = threads
+        self.memory_budget = memory_budget
+        self.backtest = backtest
+        self.initializer = initializer
+        self.initargs = initargs
+
+    def tasks(self, datasets: list[Dataset], strategies: list[BaseStrategy]) -> list[tuple]:
+        num_chunks = max(1, min(len(strategies), self.processes // max(1, len(datasets)))) if self.backtest else 1
+        tasks = []
+        for dataset in datasets:
+            chunks = [list(chunk) for chunk in np.array_split(np.array(strategies, dtype=object), num_chunks)] if self.backtest else [[]]
+            for i, chunk in enumerate(chunks):
+                # keep the DataFile in the worker while more tasks of the dataset follow, the first task sends the mid prices back
+                tasks.append((self.source, dataset, chunk, self.threads, self.backtest, i < len(chunks) - 1, i == 0))
+        return tasks
+
+    def update(self, datasets: list[Dataset]) -> None:
+        # the windows of a ticker are merged, so every stored day is appended by one process and its manifest is written once per range
+        windows: dict[str, list[tuple[date, date]]] = {}
+        for ticker, start_date, end_date in sorted({_key(dataset) for dataset in datasets}):
+            merged = windows.setdefault(ticker, [])
+            if merged and start_date <= merged[-1][1] + timedelta(days=1):
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end_date))
+            else:
+                merged.append((start_date, end_date))
+        for ticker, merged in windows.items():
+            for start_date, end_date in merged:
+                self.source.update(ticker, start_date, end_date)
+
+    def _estimate(self, dataset: Dataset, sizes: dict[tuple, int]) -> int:
+        key = _key(dataset)
+        if key in sizes:
+            return sizes[key]
+        if sizes:
+            return int(np.mean(list(sizes.values())))
+        return self.memory_budget // max(1, self.processes)
+
+    def run(self, datasets: list[Dataset], strategies: list[BaseStrategy]) -> Iterator[tuple[Dataset, list[BacktestResult], None | pd.Series, bool]]:
+        # (dataset, results of the task, mid prices of the dataset for the benchmark once all tasks of the dataset are done, all tasks done) in order of completion
+        tasks = self.tasks(datasets, strategies)
+        open_tasks = {dataset: 0 for dataset in datasets}
+        for task in tasks:
+            open_tasks[task[1]] += 1
+        start_time = datetime.now()
+        self.update(datasets)
+        print(f"Schedule {len(tasks)} tasks of {len(datasets)} datasets and {len(strategies)} strategies on {self.processes} processes at <{start_time}>")
+        mids: dict[Dataset, pd.Series] = {}
+        if self.processes <= 1:
+            for task in tasks:
+                dataset, results, mid, _ = _run_task(task)
+                yield self._done(dataset, results, mid, open_tasks, mids)
+            return
+
+        queue, pending, sizes, shared = deque(tasks), {}, {}, {}
+        try:
+            with ProcessPoolExecutor(max_workers=self.processes, initializer=self.initializer, initargs=self.initargs) as executor:
+                while queue or pending:
+                    while queue and len(pending) < self.processes:
+                        dataset = queue[0][1]
+                        # a published dataset is counted once for all of its tasks, the mid prices held for the benchmark are counted as well
+                        estimate = 0 if self.memory_budget is None or dataset in shared else self._estimate(dataset, sizes)
+                        resident = sum(pending.values()) + sum(data.nbytes for data in shared.values()) + sum(mid.memory_usage(index=True) for mid in mids.values())
+                        if pending and self.memory_budget is not None and self.memory_budget < resident + estimate:
+                            break
+                        task = queue.popleft()
+                        if 1 < open_tasks[dataset] and dataset not in shared:
+                            shared[dataset] = SharedMemoryDataFile.publish(self.source.datafile(*_key(dataset), update=False))
+                            estimate = 0
+                        if dataset in shared:
+                            # the mid prices of a published dataset are read here once its last task is done
+                            task = (shared[dataset], *task[1:5], False, False)
+                        pending[executor.submit(_run_task, task)] = estimate
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        del pending[future]
+                        dataset, results, mid, nbytes = future.result()
+                        sizes[_key(dataset)] = nbytes
+                        if open_tasks[dataset] == 1 and dataset in shared:
+                            with shared.pop(dataset) as data:
+                                mid = _copy_mid(data)
+                        yield self._done(dataset, results, mid, open_tasks, mids)
+        finally:
+            for data in shared.values():
+                data.close()
+        end_time = datetime.now()
+        print(f"End schedule at <{end_time}> within {end_time - start_time}")
+
+    @staticmethod
+    def _done(dataset: Dataset, results: list[BacktestResult], mid: None | pd.Series, open_tasks: dict[Dataset, int], mids: dict[Dataset, pd.Series]) -> tuple[Dataset, list[BacktestResult], None | pd.Series, bool]:
+        # the mid prices are yielded with the last task of the dataset
+        if mid is not None:
+            mids[dataset] = mid
+        open_tasks[dataset] -= 1
+        complete = open_tasks[dataset] == 0
+        return dataset, results, mids.pop(dataset) if complete else None, complete
+
+
+def _key(dataset: Dataset) -> tuple[str, date, date]:
+    ticker, start_date, _, end_date = dataset
+    return ticker, start_date, end_date
+
+
+def _copy_mid(data: DataFile) -> pd.Series:
+    # the values and the index of the mid prices of a SharedMemoryDataFile are views of its segment
+    mid = data.mid
+    return pd.Series(mid.to_numpy(copy=True), index=mid.index.copy(deep=True), name=mid.name)
+
+
+def _load(source: DataSource | DataFile, dataset: Dataset) -> DataFile:
+    if isinstance(source, DataFile):
+        # attached SharedMemoryDataFile
+        return source
+    key = _key(dataset)
+    if key not in _resident:
+        # drop the previous DataFile before the next one is loaded
+        _resident.clear()
+        # the scheduler updated the stored ts before, several processes may read the store of the ticker at once
+        _resident[key] = source.datafile(*key, update=False)
+    return _resident[key]
+
+
+def _run_task(task: tuple) -> tuple[Dataset, list[BacktestResult], None | pd.Series, int]:
+    source, dataset, strategies, threads, backtest, keep, send_mid = task
+    data = _load(source, dataset)
+    results = []
+    if backtest and strategies:
+        for strategy, weights in zip(strategies, BaseStrategy.strategies_weights(data, strategies, threads=threads)):
+            backtesting = Backtesting(security=data, strategy=strategy, start_at=dataset[2], threads=threads)
+            backtesting.use_weights(weights)
+            results.append(backtesting.result)
+    # AggBacktestResult cuts the benchmark from the mid prices once the dates of the stored results are known
+    mid = data.mid if send_mid else None
+    nbytes = data.nbytes
+    if not keep:
+        _resident.clear()
+    return dataset, results, mid, nbytes
@@ -1,17 +1,40 @@
 import sys
-from datetime import datetime, date
+import time
+from datetime import datetime, date, timedelta
+from typing import Callable
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
+from numba import jit
 
 from DataDownload.DataFile import DataFile
 from Backtesting.Strategy.BaseStrategy import BaseStrategy
 from Backtesting.BacktestResult import BacktestResult
 from DataDownload.DataStore import BaseDataStore
 
+# ticks per call of a compiled kernel, the progress is reported between the calls
+TICK_CHUNK: int = 1 << 16
+
+
+@jit(nopython=True, nogil=True)
+def _run_ticks(kernel, state: tuple, weights: np.ndarray, start: int, stop: int) -> None:
+    for i in range(start, stop):
+        weights[i] = kernel(i, weights, state)
+
 
 class Backtesting:
-    def __init__(self, security: DataFile, strategy: BaseStrategy, initial_investment: float = 100, start_at: datetime | int = 0, threads: int = 1, iterative: bool = False):
+    def __init__(
+        self,
+        security: DataFile,
+        strategy: BaseStrategy,
+        initial_investment: float = 100,
+        start_at: datetime | int = 0,
+        threads: int = 1,
+        iterative: bool = False,
+        progress: None | Callable[[int, int, timedelta], None] = None,
+        progress_interval: float = 1.0,
+    ):
         self.security: DataFile = security
         self.strategy: BaseStrategy = strategy
         self.initial_investment: float = initial_investment
@@ -23,6 +46,9 @@ class Backtesting:
             raise ValueError(f"start_at must be an integer or datetime object, but was {type(start_at)}")
         self.threads = threads
         self.iterative = iterative
+        # progress(done, total, elapsed) of the iterative mode, at most once per progress_interval seconds
+        self.progress = Backtesting.print_progress if progress is None else progress
+        self.progress_interval = progress_interval
         self._weights = None
         self._performance_rel = None
         self._performance = None
@@ -35,18 +61,14 @@ class Backtesting:
             print(f"Start Backtesting at <{start_time}> ", end="")
             if self.iterative:
                 print("iterative")
-                ticks_to_eval = self.security.index[self.start_at :].to_list()
+                ticks_to_eval = self.security.index[self.start_at :]
                 total_num = len(ticks_to_eval)
                 print(f"Evaluate {total_num:,} ticks from <{ticks_to_eval[0]}> to <{ticks_to_eval[-1]}>")
-                weights: [datetime, None | float] = {}
                 print(f"Start Calculation at <{datetime.now()}>")
-                for i, dt in enumerate(ticks_to_eval):
-                    weights[dt] = self.strategy.get_weight(self.security, dt)
-                    if i % 1000 == 0:
-                        sys.stdout.write("\r")
-                        print(f"Calculating [{100 * (i / total_num):.2f}%][{datetime.now() - start_time}])", end="")
+                weights = self.iterative_weights(start_time)
+                sys.stdout.write("\r")
                 print(f"Finished calculation in {datetime.now() - start_time}")
-                self._weights = pd.Series(data=weights, dtype=float).sort_index()
+                self._weights = pd.Series(data=weights, index=ticks_to_eval.rename(None), dtype=float)
             else:
                 print("non iterative")
                 self._weights = self.strategy.get_weights(self.security).iloc[self.start_at :].astype(float)
@@ -58,6 +80,43 @@ class Backtesting:
             print(f"Calculation duration: <{end_time - start_time}>")
         return self._weights
 
+    def use_weights(self, weights: pd.Series) -> None:
+        # weights of the whole security computed elsewhere, e.g. for several strategies on one IndicatorGraph
+        self._weights = weights.iloc[self.start_at :].astype(float)
+        self._weights.name = None
+        self._weights.ffill(axis="index", inplace=True)
+        self._weights.fillna(0, inplace=True)
+        self._performance_rel = None
+        self._performance = None
+        self._result = None
+
+    def iterative_weights(self, start_time: datetime) -> np.ndarray:
+        # weights of the positions from start_at on, NaN where the weight does not change
+        # the compiled kernel of the strategy runs in chunks, without one get_weight_at is called per position
+        weights = np.full(len(self.security.index), np.nan)
+        kernel = self.strategy.tick_kernel(self.security)
+        total_num = len(weights) - self.start_at
+        last_progress = time.monotonic()
+        i = self.start_at
+        while i < len(weights):
+            if kernel is None:
+                weight = self.strategy.get_weight_at(self.security, i)
+                weights[i] = np.nan if weight is None else weight
+                i += 1
+            else:
+                stop = min(i + TICK_CHUNK, len(weights))
+                _run_ticks(kernel[0], kernel[1], weights, i, stop)
+                i = stop
+            if self.progress_interval <= time.monotonic() - last_progress:
+                self.progress(i - self.start_at, total_num, datetime.now() - start_time)
+                last_progress = time.monotonic()
+        return weights[self.start_at :]
+
+    @staticmethod
+    def print_progress(done: int, total: int, elapsed: timedelta) -> None:
+        sys.stdout.write("\r")
+        print(f"Calculating [{100 * (done / total):.2f}%][{elapsed}])", end="")
+
     def plot_weights(self):
         print("<plot weights>")
         plt.figure(figsize=(15, 6))
@@ -75,7 +134,7 @@ class Backtesting:
             perf_raw = weighted_return.add(1).cumprod()
             new_invest = self.weights.diff().clip(lower=0)
             new_invest.iloc[0] = self.weights.iloc[0]
-            sell_factor = (new_invest.multiply(-self.security.spread.divide(self.security.ask).iloc[self.start_at :])).add(1).cumprod()
+            sell_factor = (new_invest.multiply(self.security.pct_sell_costs.iloc[self.start_at :])).add(1).cumprod()
             self._performance_rel = perf_raw * sell_factor
         return self._performance_rel
 
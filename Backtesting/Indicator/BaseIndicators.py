@@ -1,7 +1,10 @@
+import math
 from abc import ABC, abstractmethod
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from enum import Enum
 
+import numpy as np
 import pandas as pd
 
 from DataDownload.DataFile import DataFile
@@ -24,6 +27,15 @@ class Indication(Enum):
         else:
             return self.value + other
 
+    @staticmethod
+    def signals(sell: np.ndarray, buy: np.ndarray) -> np.ndarray:
+        # int8 Indication values, sell is checked before buy like in the indication() if / elif chains
+        return np.select([sell, buy], [Indication.SELL.value, Indication.BUY.value], Indication.HOLD.value).astype(np.int8)
+
+    @staticmethod
+    def from_signals(signals: pd.Series) -> pd.Series:
+        return signals.map({indication.value: indication for indication in Indication})
+
     @staticmethod
     def quota_sell(arr: list["Indication"]) -> float:
         return arr.count(Indication.SELL) / len(arr)
@@ -37,19 +49,162 @@ class Indication(Enum):
         return arr.count(Indication.BUY) / len(arr)
 
 
+class BoundedCache(OrderedDict):
+    # keeps the last max_size entries, None keeps all and 0 none
+    def __init__(self, max_size: None | int = None):
+        super().__init__()
+        self.max_size = max_size
+
+    def __setitem__(self, key, value) -> None:
+        if self.max_size == 0:
+            return
+        super().__setitem__(key, value)
+        if self.max_size is not None and self.max_size < len(self):
+            self.popitem(last=False)
+
+
 class BaseIndicator(ABC):
+    # size of date_cache and idx_cache of new indicators, None keeps every value, 0 disables the caches
+    cache_size: None | int = None
+
     def __init__(self):
-        self.date_cache: dict[datetime, any] = dict()
-        self.idx_cache: dict[int, any] = dict()
+        self.date_cache: dict[datetime, any] = BoundedCache(self.cache_size)
+        self.idx_cache: dict[int, any] = BoundedCache(self.cache_size)
+
+    def limit_cache(self, cache_size: None | int) -> None:
+        self.cache_size = cache_size
+        self.date_cache = BoundedCache(cache_size)
+        self.idx_cache = BoundedCache(cache_size)
+
+    def fill_cache(self, series: pd.Series) -> None:
+        # the values of a whole series are only kept by unbounded caches, bounded ones keep the values of the per tick path
+        if self.cache_size is not None:
+            return
+        self.date_cache.update(series.to_dict())
+        self.idx_cache.update(zip(range(1, len(series) + 1), series.tolist()))
 
     @abstractmethod
     def indication(self, security: DataFile, end_date: datetime) -> Indication:
         raise NotImplementedError
 
+    # indication at the position i of the security, the per tick path of the iterative backtest
+    def indication_at(self, security: DataFile, i: int) -> Indication:
+        raise NotImplementedError
+
     # @abstractmethod
     def series_indication(self, security: DataFile) -> pd.Series:
         raise NotImplementedError
 
+    # int8 Indication values per tick, for the indicators that signal
+    def series_signal(self, security: DataFile) -> pd.Series:
+        raise NotImplementedError
+
+    # state of the indicator that is updated tick by tick
+    def stream(self) -> "IndicatorStream":
+        raise NotImplementedError
+
+
+class IndicatorStream(ABC):
+    def update(self, date: datetime, price: float):
+        return self.update_ns(pd.Timestamp(date).value, price)
+
+    @abstractmethod
+    def update_ns(self, date: int, price: float):
+        raise NotImplementedError
+
+
+class WindowStream(IndicatorStream):
+    # prices of the window [date - min_period, date], but at least min_period_ticks ticks, like indication()
+    def __init__(self, min_period: timedelta, min_period_ticks: int, capacity: int = 1024):
+        self.window = pd.Timedelta(min_period).value
+        self.min_period_ticks = min_period_ticks
+        # the window is _prices[_head:_tail], the buffer is compacted when full and only grows with the window
+        self._dates = np.empty(capacity, dtype=np.int64)
+        self._prices = np.empty(capacity)
+        self._head, self._tail = 0, 0
+        self.ticks = 0
+        self.price = np.nan
+
+    def update_ns(self, date: int, price: float):
+        if self._tail == len(self._prices):
+            self._compact()
+        previous = float(self._prices[self._tail - 1]) if self._head < self._tail else None
+        self._dates[self._tail] = date
+        self._prices[self._tail] = price
+        self._tail += 1
+        self.ticks += 1
+        self.price = price
+        self._add(price, previous)
+        # the current tick always stays, so a removed price always has a following one
+        while self.min_period_ticks < self._tail - self._head and self._dates[self._head] < date - self.window:
+            self._head += 1
+            self._remove(float(self._prices[self._head - 1]), float(self._prices[self._head]))
+        return self._value()
+
+    def _compact(self) -> None:
+        size = self._tail - self._head
+        if len(self._prices) < 2 * size:
+            dates, prices = np.empty(2 * len(self._dates), dtype=np.int64), np.empty(2 * len(self._prices))
+        else:
+            dates, prices = self._dates, self._prices
+        dates[:size] = self._dates[self._head : self._tail]
+        prices[:size] = self._prices[self._head : self._tail]
+        self._dates, self._prices = dates, prices
+        self._head, self._tail = 0, size
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self._prices[self._head : self._tail]
+
+    # first tick of the window, counted from the first update
+    @property
+    def start(self) -> int:
+        return self.ticks - (self._tail - self._head)
+
+    # previous is the price before price in the window, None for the first tick
+    @abstractmethod
+    def _add(self, price: float, previous: None | float) -> None:
+        raise NotImplementedError
+
+    # following is the price after price, the new first price of the window
+    @abstractmethod
+    def _remove(self, price: float, following: float) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _value(self):
+        raise NotImplementedError
+
+
+class RunningSum:
+    # compensated sum with add and remove, the same updates as the pandas rolling kernels
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+        self._add_compensation = 0.0
+        self._remove_compensation = 0.0
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        y = x - self._add_compensation
+        t = self.total + y
+        self._add_compensation = t - self.total - y
+        self.total = t
+
+    def remove(self, x: float) -> None:
+        self.count -= 1
+        if self.count == 0:
+            self.__init__()
+            return
+        y = -x - self._remove_compensation
+        t = self.total + y
+        self._remove_compensation = t - self.total - y
+        self.total = t
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if 0 < self.count else math.nan
+
 
 class VolatilityIndicator(BaseIndicator):
     pass
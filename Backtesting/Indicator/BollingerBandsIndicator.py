@@ -3,10 +3,13 @@ from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
-from numba import jit, float64
 
 from . import VolatilityIndicator, Indication
+from .BaseIndicators import WindowStream, RunningSum
+from .IndicatorGraph import IndicatorGraph, Node
+from .RollingKernels import rolling_std
 from .SimpleMovingAverageIndicator import SimpleMovingAverageIndicator
+from .TickView import TickView, nan_mean, nan_std, pct_change
 from DataDownload.DataFile import DataFile
 
 
@@ -21,17 +24,18 @@ class BollingerBandsIndicator(VolatilityIndicator):
         self.threads = threads
 
     def indication(self, security: DataFile, end_date: datetime) -> Indication:
-        end_index = security.index.get_loc(end_date) + 1
-        start_index = security.index.get_indexer(pd.DatetimeIndex([end_date - self.min_period]), method="backfill")[0]
-        start_index = max(0, min(start_index, end_index - self.min_period_ticks))
-        period: pd.Series = security.mid.iloc[start_index:end_index]
-        last_price = period.iloc[-1]
-        sma = period.mean()
-        std_dev = period.pct_change().std()
+        return self.indication_at(security, TickView.of(security).position(end_date))
+
+    def indication_at(self, security: DataFile, i: int) -> Indication:
+        view = TickView.of(security)
+        period = view.period(self.timedelta_min_period, self.min_period_ticks, i)
+        last_price = period[-1]
+        sma = nan_mean(period)
+        std_dev = nan_std(pct_change(period))
         upper_band = sma + self.standard_deviations * std_dev
         lower_band = sma - self.standard_deviations * std_dev
-        self.date_cache[end_date] = {"lower_band": lower_band, "sma": sma, "upper_band": upper_band}
-        self.idx_cache[end_index] = {"lower_band": lower_band, "sma": sma, "upper_band": upper_band}
+        self.date_cache[view.index[i]] = {"lower_band": lower_band, "sma": sma, "upper_band": upper_band}
+        self.idx_cache[i + 1] = {"lower_band": lower_band, "sma": sma, "upper_band": upper_band}
         if upper_band <= last_price:
             return Indication.SELL
         elif last_price <= lower_band:
@@ -40,21 +44,24 @@ class BollingerBandsIndicator(VolatilityIndicator):
             return Indication.HOLD
 
     def series_indication(self, security: DataFile) -> pd.Series:
+        return Indication.from_signals(self.series_signal(security))
+
+    def stream(self) -> "BollingerBandsStream":
+        return BollingerBandsStream(self.timedelta_min_period, self.min_period_ticks, self.standard_deviations)
+
+    def std_node(self, graph: IndicatorGraph) -> Node:
+        pct_change = graph.pct_change(graph.column("mid"))
+        starts = graph.add("bollinger_starts", _bollinger_starts, (pct_change, graph.window_starts(self.timedelta_min_period, 0)), (self.min_period_ticks,))
+        return graph.add("rolling_std", rolling_std, (pct_change, starts))
+
+    def signal_node(self, graph: IndicatorGraph) -> Node:
+        return graph.band_signal(graph.column("mid"), self.sma.node(graph), self.std_node(graph), self.standard_deviations, cache=True)
+
+    def series_signal(self, security: DataFile) -> pd.Series:
         start_time = datetime.now()
         print(f"Calculate BollingerBandsIndicator at <{start_time}>")
 
-        sma: pd.Series = self.sma.series_indication(security)
-        pct_change = security.mid.pct_change()
-        std_period_rolling = pct_change.rolling(window=self.min_period_ticks, min_periods=1)
-        selector = std_period_rolling.count().lt(self.min_period_ticks)
-        std_period = std_period_rolling.apply(lambda x: _func(x.to_numpy()))
-        std = pct_change.rolling(window=self.timedelta_min_period).apply(lambda x: _func(x.to_numpy()))
-        std.loc[selector] = std_period.loc[selector]
-
-        df = security.mid.to_frame("price")
-        df["lower_band"] = sma.subtract(std.multiply(self.standard_deviations))
-        df["upper_band"] = sma.add(std.multiply(self.standard_deviations))
-        bb = df.apply(lambda x: Indication.SELL if x.price <= x.lower_band else Indication.BUY if x.upper_band <= x.price else Indication.HOLD, axis="columns")
+        bb = pd.Series(IndicatorGraph.compute(security, self.signal_node), index=security.index)
 
         end_date = datetime.now()
         print(f"End calculation at <{end_date}> within {end_date-start_time}")
@@ -64,6 +71,54 @@ class BollingerBandsIndicator(VolatilityIndicator):
         return pd.DataFrame.from_dict(self.date_cache, orient="index")
 
 
-@jit((float64[:],), nopython=True, nogil=True)
-def _func(period: np.ndarray) -> float64:
-    return period.std()
+def _bollinger_starts(pct_change: np.ndarray, starts: np.ndarray, min_period_ticks: int) -> np.ndarray:
+    # the tick window replaces the time window while it counts less than min_period_ticks non NaN changes
+    tick_starts = np.maximum(0, np.arange(len(pct_change)) + 1 - min_period_ticks)
+    valid_counts = np.concatenate([[0], np.cumsum(~np.isnan(pct_change))])
+    selector = valid_counts[1:] - valid_counts[tick_starts] < min_period_ticks
+    starts = starts.copy()
+    starts[selector] = tick_starts[selector]
+    return starts
+
+
+class BollingerBandsStream(WindowStream):
+    # running sum of the prices and a Welford accumulator of the price changes inside the window
+    def __init__(self, min_period: timedelta, min_period_ticks: int, standard_deviations: float):
+        super().__init__(min_period, min_period_ticks)
+        self.standard_deviations = standard_deviations
+        self.sum = RunningSum()
+        self.count, self.mean, self.m2 = 0, 0.0, 0.0
+        self.value: dict[str, float] = {}
+
+    def _add(self, price: float, previous: None | float) -> None:
+        self.sum.add(price)
+        if previous is not None:
+            change = price / previous - 1
+            self.count += 1
+            delta = change - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (change - self.mean)
+
+    def _remove(self, price: float, following: float) -> None:
+        self.sum.remove(price)
+        change = following / price - 1
+        self.count -= 1
+        if self.count == 0:
+            self.mean, self.m2 = 0.0, 0.0
+        else:
+            delta = change - self.mean
+            self.mean -= delta / self.count
+            self.m2 -= delta * (change - self.mean)
+
+    def _value(self) -> Indication:
+        std_dev = np.sqrt(max(self.m2, 0.0) / (self.count - 1)) if 1 < self.count else np.nan
+        sma = self.sum.mean
+        upper_band = sma + self.standard_deviations * std_dev
+        lower_band = sma - self.standard_deviations * std_dev
+        self.value = {"lower_band": lower_band, "sma": sma, "upper_band": upper_band}
+        if upper_band <= self.price:
+            return Indication.SELL
+        elif self.price <= lower_band:
+            return Indication.BUY
+        else:
+            return Indication.HOLD
@@ -5,59 +5,135 @@ import pandas as pd
 from dateutil.relativedelta import relativedelta
 
 from DataDownload.DataFile import DataFile
-from .BaseIndicators import TrendIndicator
-from numba import jit, float64, int64
+from .BaseIndicators import TrendIndicator, IndicatorStream, WindowStream
+from .IndicatorGraph import IndicatorGraph, Node
+from .RollingKernels import NO_DELTAS, span_alpha, halflife_deltas, ewma, rolling_ewma_mean
+from .TickView import TickView
 
 
 class ExponentialMovingAverageIndicator(TrendIndicator):
+    COMPAT: str = "compat"
+    SPAN: str = "span"
+    TIME: str = "time"
+    MODES: list[str] = [COMPAT, SPAN, TIME]
+
     def __init__(
         self,
         min_period: relativedelta = relativedelta(),
         min_period_ticks: int = 0,
         threads: int = 1,
+        mode: str = COMPAT,
+        span: None | int = None,
+        halflife: None | relativedelta = None,
     ):
         super().__init__()
         self.min_period = min_period
         self.timedelta_min_period = timedelta(days=min_period.days, hours=min_period.hours, minutes=min_period.minutes, seconds=min_period.seconds, microseconds=min_period.microseconds)
         self.min_period_ticks = min_period_ticks
         self.threads = threads
+        if mode not in ExponentialMovingAverageIndicator.MODES:
+            raise ValueError(f"mode has to be one of {ExponentialMovingAverageIndicator.MODES}, not {mode}")
+        self.mode = mode
+        # span mode: ema over ticks, time mode: weights halve every halflife of wall time
+        self.span = max(min_period_ticks, 1) if span is None else span
+        halflife = min_period if halflife is None else halflife
+        self.timedelta_halflife = timedelta(days=halflife.days, hours=halflife.hours, minutes=halflife.minutes, seconds=halflife.seconds, microseconds=halflife.microseconds)
+        if mode == ExponentialMovingAverageIndicator.TIME and self.timedelta_halflife <= timedelta():
+            raise ValueError("time mode needs a positive halflife")
 
     def indication(self, security: DataFile, end_date: datetime) -> float:
-        end_index = security.index.get_loc(end_date) + 1
-        start_index = security.index.get_indexer(pd.DatetimeIndex([end_date - self.min_period]), method="backfill")[0]
-        start_index = max(0, min(start_index, end_index - self.min_period_ticks))
-        period: pd.Series = security.mid.iloc[start_index:end_index]
-        ema = period.ewm(span=end_index - start_index, adjust=False).mean().iloc[-1]
-        self.date_cache[end_date] = ema
-        self.idx_cache[end_index] = ema
+        return self.indication_at(security, TickView.of(security).position(end_date))
+
+    def indication_at(self, security: DataFile, i: int) -> float:
+        view = TickView.of(security)
+        # period.ewm(span=len(period), adjust=False).mean().iloc[-1]
+        period = view.period(self.timedelta_min_period, self.min_period_ticks, i)
+        ema = ewma(period, NO_DELTAS, span_alpha(len(period)), False)[-1]
+        self.date_cache[view.index[i]] = ema
+        self.idx_cache[i + 1] = ema
         return ema
 
+    def stream(self) -> IndicatorStream:
+        # span and time are recursive O(1) states, compat is not: it recomputes the ewm of indication() over the window, O(window) per tick
+        if self.mode == ExponentialMovingAverageIndicator.SPAN:
+            return ExponentialMovingAverageStream(span_alpha(self.span), False)
+        elif self.mode == ExponentialMovingAverageIndicator.TIME:
+            return ExponentialMovingAverageStream(0.5, True, pd.Timedelta(self.timedelta_halflife).value)
+        return ExponentialMovingAverageWindowStream(self.timedelta_min_period, self.min_period_ticks)
+
+    def node(self, graph: IndicatorGraph) -> Node:
+        mid = graph.column("mid")
+        if self.mode == ExponentialMovingAverageIndicator.SPAN:
+            return graph.add("span_ema", _span_ema, (mid,), (self.span,), cache=True)
+        elif self.mode == ExponentialMovingAverageIndicator.TIME:
+            return graph.add("time_ema", _time_ema, (mid, graph.dates()), (pd.Timedelta(self.timedelta_halflife).value,), cache=True)
+        return graph.add("compat_ema", _compat_ema, (mid, graph.window_starts(self.timedelta_min_period, 0)), (self.min_period_ticks,), cache=True)
+
     def series_indication(self, security: DataFile) -> pd.Series:
         start_time = datetime.now()
         print(f"Calculate ExponentialMovingAverageIndicator at <{start_time}>")
 
-        rolling = security.mid.rolling(window=self.timedelta_min_period)
-        selector = rolling.count().lt(self.min_period_ticks)
-        ema: pd.Series = rolling.apply(lambda x: _ewma(x.to_numpy(), x.count()))
-        ema_period = security.mid.ewm(span=self.min_period_ticks, adjust=False).mean()
-        ema.loc[selector] = ema_period.loc[selector]
+        ema = pd.Series(IndicatorGraph.compute(security, self.node), index=security.index, name=security.mid.name)
 
         end_date = datetime.now()
         print(f"End calculation at <{end_date}> within {end_date-start_time}")
-        self.date_cache = ema.to_dict()
+        self.fill_cache(ema)
         return ema
 
 
-@jit((float64[:], int64), nopython=True, nogil=True)
-def _ewma(arr_in, window) -> float64:
-    n = arr_in.shape[0]
-    ewma = np.empty(n, dtype=float64)
-    alpha = 2 / float(window + 1)
-    w = 1
-    ewma_old = arr_in[0]
-    ewma[0] = ewma_old
-    for i in range(1, n):
-        w += (1 - alpha) ** i
-        ewma_old = ewma_old * (1 - alpha) + arr_in[i]
-        ewma[i] = ewma_old / w
-    return ewma.mean()
+def _span_ema(values: np.ndarray, span: int) -> np.ndarray:
+    return ewma(values, NO_DELTAS, span_alpha(span), False)
+
+
+def _time_ema(values: np.ndarray, dates: np.ndarray, halflife: int) -> np.ndarray:
+    return ewma(values, halflife_deltas(dates, halflife), 0.5, True)
+
+
+def _compat_ema(values: np.ndarray, starts: np.ndarray, min_period_ticks: int) -> np.ndarray:
+    # previous numbers: mean of the span = window EWMA over the time window, the span = min_period_ticks ema while the time window counts less ticks
+    ema = rolling_ewma_mean(values, starts)
+    selector = np.arange(len(values)) + 1 - starts < min_period_ticks
+    if selector.any():
+        ema[selector] = ewma(values, NO_DELTAS, span_alpha(min_period_ticks), False)[selector]
+    return ema
+
+
+class ExponentialMovingAverageStream(IndicatorStream):
+    # one step of the ewma kernel, with a halflife the old weight decays by the time since the last tick
+    def __init__(self, alpha: float, adjust: bool, halflife: None | int = None):
+        self.alpha = alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.halflife = halflife
+        self.weighted = None
+        self.old_wt = 1.0
+        self.last_date = None
+
+    def update_ns(self, date: int, price: float) -> float:
+        if self.weighted is None:
+            self.weighted = price
+        elif self.weighted == self.weighted:
+            if self.halflife is None:
+                self.old_wt *= 1.0 - self.alpha
+            else:
+                self.old_wt *= (1.0 - self.alpha) ** ((float(date) - float(self.last_date)) / float(self.halflife))
+            if price == price:
+                if self.weighted != price:
+                    self.weighted = (self.old_wt * self.weighted + self.new_wt * price) / (self.old_wt + self.new_wt)
+                self.old_wt = self.old_wt + self.new_wt if self.adjust else 1.0
+        elif price == price:
+            self.weighted = price
+        self.last_date = date
+        return self.weighted
+
+
+class ExponentialMovingAverageWindowStream(WindowStream):
+    # not an O(1) state: the span of the compat ewm changes with every tick, so it is recomputed over the whole window
+    def _add(self, price: float, previous: None | float) -> None:
+        pass
+
+    def _remove(self, price: float, following: float) -> None:
+        pass
+
+    def _value(self) -> float:
+        return ewma(self.prices, NO_DELTAS, span_alpha(self._tail - self._head), False)[-1]
@@ -0,0 +1,162 @@
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from DataDownload.DataFile import DataFile
+
+
+class IndicatorCache:
+    FOLDER: str = f"{os.path.dirname(__file__)}/../../Data/IndicatorCache"
+    DEFAULT_MAX_BYTES: int = 2 * 1024**3
+    DEFAULT_MAX_DISK_BYTES: int = 10 * 1024**3
+    active: "None | IndicatorCache" = None
+
+    def __init__(self, max_bytes: None | int = DEFAULT_MAX_BYTES, folder: None | str = None, max_disk_bytes: None | int = DEFAULT_MAX_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.folder = folder
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, np.ndarray | tuple[np.ndarray, ...]] = OrderedDict()
+        self._total_bytes = 0
+        self._fingerprints: weakref.WeakKeyDictionary[DataFile, str] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        if self.folder is not None:
+            os.makedirs(self.folder, exist_ok=True)
+
+    def activate(self) -> "IndicatorCache":
+        IndicatorCache.active = self
+        return self
+
+    @staticmethod
+    def activate_new(settings: dict) -> "IndicatorCache":
+        # process pool initializer, every worker process activates its own cache with the settings of the main process
+        return IndicatorCache(**settings).activate()
+
+    @staticmethod
+    def deactivate() -> None:
+        IndicatorCache.active = None
+
+    def fingerprint(self, security: DataFile) -> str:
+        with self._lock:
+            if security in self._fingerprints:
+                return self._fingerprints[security]
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(security.ticker.encode())
+        digest.update(np.ascontiguousarray(security.index.as_unit("ns").asi8).data)
+        digest.update(np.ascontiguousarray(security.mid.to_numpy(dtype=np.float64)).data)
+        with self._lock:
+            self._fingerprints[security] = digest.hexdigest()
+        return digest.hexdigest()
+
+    def key(self, security: DataFile, op: str, digest: str) -> str:
+        return f"{self.fingerprint(security)}-{op}-{digest}"
+
+    @staticmethod
+    def nbytes(value: np.ndarray | tuple[np.ndarray, ...]) -> int:
+        if isinstance(value, tuple):
+            return sum(array.nbytes for array in value)
+        return value.nbytes
+
+    def get_or_compute(self, security: DataFile, op: str, digest: str, compute) -> np.ndarray | tuple[np.ndarray, ...]:
+        key = self.key(security, op, digest)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        value = self._load(key)
+        if value is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._put(key, value)
+            return value
+        with self._lock:
+            self.misses += 1
+        value = compute()
+        self._put(key, value)
+        self._store(key, value)
+        return value
+
+    def _put(self, key: str, value: np.ndarray | tuple[np.ndarray, ...]) -> None:
+        size = IndicatorCache.nbytes(value)
+        with self._lock:
+            if self.max_bytes is not None and self.max_bytes < size:
+                return
+            if key in self._entries:
+                self._total_bytes -= IndicatorCache.nbytes(self._entries.pop(key))
+            self._entries[key] = value
+            self._total_bytes += size
+            while self.max_bytes is not None and self.max_bytes < self._total_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_bytes -= IndicatorCache.nbytes(evicted)
+
+    def _path(self, key: str) -> str:
+        return f"{self.folder}/{key}.npz"
+
+    def _store(self, key: str, value: np.ndarray | tuple[np.ndarray, ...]) -> None:
+        if self.folder is None:
+            return
+        arrays = value if isinstance(value, tuple) else (value,)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        np.savez(tmp_path, is_tuple=np.array(isinstance(value, tuple)), **{f"item_{i}": array for i, array in enumerate(arrays)})
+        os.replace(tmp_path, path)
+        self._evict_disk()
+
+    def _load(self, key: str) -> None | np.ndarray | tuple[np.ndarray, ...]:
+        if self.folder is None or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with np.load(self._path(key)) as arrays:
+                items = tuple(arrays[f"item_{i}"] for i in range(len(arrays.files) - 1))
+                is_tuple = bool(arrays["is_tuple"])
+        except (OSError, ValueError, KeyError):
+            return None
+        os.utime(self._path(key))
+        return items if is_tuple else items[0]
+
+    def _evict_disk(self) -> None:
+        if self.max_disk_bytes is None:
+            return
+        # other processes may share the folder, so the sizes are read from the folder
+        files = [entry for entry in os.scandir(self.folder) if entry.name.endswith(".npz") and ".tmp" not in entry.name]
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in files)
+        for entry in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                total -= entry.stat().st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self._total_bytes
+
+    @property
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            requests = self.hits + self.disk_hits + self.misses
+            return dict(
+                hits=self.hits,
+                disk_hits=self.disk_hits,
+                misses=self.misses,
+                hit_rate=(self.hits + self.disk_hits) / requests if 0 < requests else 0.0,
+                entries=len(self._entries),
+                bytes=self._total_bytes,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = OrderedDict()
+            self._total_bytes = 0
+
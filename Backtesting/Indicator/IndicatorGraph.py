@@ -0,0 +1,163 @@
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from .BaseIndicators import Indication
+from .IndicatorCache import IndicatorCache
+from .TickView import diff_period, pct_change
+from .WindowBounds import WindowBounds
+from DataDownload.DataFile import DataFile
+
+
+class Node:
+    def __init__(self, op: str, func, inputs: tuple["Node", ...], params: tuple, cache: bool):
+        self.op = op
+        self.func = func
+        self.inputs = inputs
+        self.params = params
+        self.cache = cache
+        # identical op, params and inputs give an identical key, that is what the graph dedupes on
+        self.key: tuple = (op, params, tuple(node.key for node in inputs))
+
+    @property
+    def digest(self) -> str:
+        return hashlib.blake2b(repr(self.key).encode(), digest_size=16).hexdigest()
+
+    def __repr__(self) -> str:
+        return f"Node({self.op}, {self.params})"
+
+
+class IndicatorGraph:
+    SOURCE: str = "security"
+
+    def __init__(self):
+        self.nodes: dict[tuple, Node] = {}
+        self.source = self.add(IndicatorGraph.SOURCE, None)
+
+    def add(self, op: str, func, inputs: tuple[Node, ...] = (), params: tuple = (), cache: bool = False) -> Node:
+        node = Node(op=op, func=func, inputs=inputs, params=params, cache=cache)
+        if node.key not in self.nodes:
+            self.nodes[node.key] = node
+        return self.nodes[node.key]
+
+    def column(self, name: str) -> Node:
+        return self.add("column", _column, (self.source,), (name,))
+
+    def dates(self) -> Node:
+        return self.add("dates", _dates, (self.source,))
+
+    def constant(self, name: str, value: np.ndarray) -> Node:
+        # keyed by content, an id could be reused by another array and hit its cached consumers
+        return self.add("constant", lambda name, value_digest: value, params=(name, _content_digest(value)))
+
+    def diff(self, node: Node) -> Node:
+        return self.add("diff", diff_period, (node,))
+
+    def pct_change(self, node: Node) -> Node:
+        return self.add("pct_change", pct_change, (node,))
+
+    def window_starts(self, min_period: timedelta, min_period_ticks: int) -> Node:
+        return self.add("window_starts", _window_starts, (self.source,), (pd.Timedelta(min_period).value, min_period_ticks))
+
+    def item(self, node: Node, i: int) -> Node:
+        return self.add("item", _item, (node,), (i,))
+
+    def threshold_signal(self, node: Node, lower: float, upper: float, cache: bool = False) -> Node:
+        return self.add("threshold_signal", _threshold_signal, (node,), (lower, upper), cache=cache)
+
+    def band_signal(self, price: Node, center: Node, width: Node, factor: float, cache: bool = False) -> Node:
+        return self.add("band_signal", _band_signal, (price, center, width), (factor,), cache=cache)
+
+    def _required(self, outputs: dict[str, Node]) -> list[Node]:
+        required, stack = {}, list(outputs.values())
+        while stack:
+            node = stack.pop()
+            if node.key not in required:
+                required[node.key] = node
+                stack.extend(node.inputs)
+        # inputs are always added before the nodes using them, so insertion order is a topological order
+        return [node for key, node in self.nodes.items() if key in required]
+
+    def _run(self, node: Node, security: DataFile, values: dict[tuple, any]):
+        if node.op == IndicatorGraph.SOURCE:
+            return security
+        inputs = [values[input_node.key] for input_node in node.inputs]
+        cache = IndicatorCache.active
+        if node.cache and cache is not None:
+            return cache.get_or_compute(security, node.op, node.digest, lambda: node.func(*inputs, *node.params))
+        return node.func(*inputs, *node.params)
+
+    def evaluate(self, security: DataFile, outputs: dict[str, Node], threads: int = 1) -> dict[str, any]:
+        nodes = self._required(outputs)
+        consumers = {node.key: 0 for node in nodes}
+        for node in nodes:
+            for input_node in node.inputs:
+                consumers[input_node.key] += 1
+        keep = {node.key for node in outputs.values()}
+        values: dict[tuple, any] = {}
+
+        def release(node: Node) -> None:
+            # intermediate values are dropped as soon as every consumer ran
+            for input_node in node.inputs:
+                consumers[input_node.key] -= 1
+                if consumers[input_node.key] == 0 and input_node.key not in keep:
+                    del values[input_node.key]
+
+        if threads <= 1:
+            for node in nodes:
+                values[node.key] = self._run(node, security, values)
+                release(node)
+        else:
+            done, running, pending = set(), {}, list(nodes)
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                while pending or running:
+                    for node in [node for node in pending if all(input_node.key in done for input_node in node.inputs)]:
+                        pending.remove(node)
+                        running[executor.submit(self._run, node, security, values)] = node
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        node = running.pop(future)
+                        values[node.key] = future.result()
+                        done.add(node.key)
+                        release(node)
+        return {name: values[node.key] for name, node in outputs.items()}
+
+    @staticmethod
+    def compute(security: DataFile, build) -> any:
+        graph = IndicatorGraph()
+        return graph.evaluate(security, {"value": build(graph)})["value"]
+
+
+def _content_digest(value: np.ndarray) -> str:
+    value = np.ascontiguousarray(value)
+    digest = hashlib.blake2b(f"{value.dtype.str}{value.shape}".encode(), digest_size=16)
+    digest.update(value.data)
+    return digest.hexdigest()
+
+
+def _column(security: DataFile, name: str) -> np.ndarray:
+    return getattr(security, name).to_numpy(dtype=np.float64)
+
+
+def _dates(security: DataFile) -> np.ndarray:
+    return security.index.as_unit("ns").asi8
+
+
+def _window_starts(security: DataFile, min_period: int, min_period_ticks: int) -> np.ndarray:
+    return WindowBounds.starts(security, pd.Timedelta(min_period), min_period_ticks)
+
+
+def _item(values: tuple, i: int) -> np.ndarray:
+    return values[i]
+
+
+def _threshold_signal(values: np.ndarray, lower: float, upper: float) -> np.ndarray:
+    return Indication.signals(values <= lower, upper <= values)
+
+
+def _band_signal(price: np.ndarray, center: np.ndarray, width: np.ndarray, factor: float) -> np.ndarray:
+    # same float operations as center -/+ width * factor on the series
+    return Indication.signals(price <= center - width * factor, center + width * factor <= price)
@@ -1,60 +1,141 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 
 import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 
-from .BaseIndicators import VolatilityIndicator, Indication
+from .BaseIndicators import VolatilityIndicator, Indication, IndicatorStream, WindowStream
 
 from .SimpleAverageTrueRangeIndicator import SimpleAverageTrueRangeIndicator
 from .ExponentialMovingAverage import ExponentialMovingAverageIndicator
+from .IndicatorGraph import IndicatorGraph, Node
+from .RollingKernels import NO_DELTAS, ewma, span_alpha, true_ranges
+from .TickView import TickView
 from DataDownload.DataFile import DataFile
 
 
 class KeltnerChannelsIndicator(VolatilityIndicator):
-    def __init__(self, min_period: relativedelta = relativedelta(), min_period_ticks: int = 0, n: int = 14, times_art: float = 2, threads: int = 1):
+    def __init__(
+        self,
+        min_period: relativedelta = relativedelta(),
+        min_period_ticks: int = 0,
+        n: int = 14,
+        times_art: float = 2,
+        threads: int = 1,
+        ema_mode: str = ExponentialMovingAverageIndicator.COMPAT,
+        atr_mode: str = SimpleAverageTrueRangeIndicator.WINDOW,
+        chunk_ticks: None | int = None,
+    ):
         super().__init__()
         self.min_period = min_period
+        self.timedelta_min_period = timedelta(days=min_period.days, hours=min_period.hours, minutes=min_period.minutes, seconds=min_period.seconds, microseconds=min_period.microseconds)
         self.min_period_ticks = min_period_ticks
         self.n = n
         self.times_art = times_art
         self.threads = threads
+        self.ema_mode = ema_mode
+        self.atr_mode = atr_mode
+        self.chunk_ticks = chunk_ticks
 
     def indication(self, security: DataFile, end_date: datetime) -> Indication:
-        end_index = security.index.get_loc(end_date) + 1
-        start_index = security.index.get_indexer(pd.DatetimeIndex([end_date - self.min_period]), method="backfill")[0]
-        start_index = max(0, min(start_index, end_index - self.min_period_ticks))
-        period: pd.Series = security.mid.iloc[start_index:end_index]
-        ema = period.ewm(span=end_index - start_index, adjust=False).mean()[-1]
-        split = np.array_split(period, min(end_index - start_index, self.n))
-        trs = np.array([max(arr.max(), arr.flat[0]) - min(arr.min(), arr.flat[0]) for arr in split])
-        atr = trs.mean()
+        return self.indication_at(security, TickView.of(security).position(end_date))
+
+    def indication_at(self, security: DataFile, i: int) -> Indication:
+        view = TickView.of(security)
+        period = view.period(self.timedelta_min_period, self.min_period_ticks, i)
+        ema = ewma(period, NO_DELTAS, span_alpha(len(period)), False)[-1]
+        atr = true_ranges(period, self.n).mean()
 
         lower_band = ema - self.times_art * atr
         upper_band = ema + self.times_art * atr
 
-        self.date_cache[end_date] = {"lower_band": lower_band, "ema": ema, "upper_band": upper_band}
-        self.idx_cache[end_index] = {"lower_band": lower_band, "ema": ema, "upper_band": upper_band}
-
-        if upper_band <= ema:
-            return Indication.SELL
-        elif ema <= lower_band:
-            return Indication.BUY
-        else:
-            return Indication.HOLD
+        self.date_cache[view.index[i]] = {"lower_band": lower_band, "ema": ema, "upper_band": upper_band}
+        self.idx_cache[i + 1] = {"lower_band": lower_band, "ema": ema, "upper_band": upper_band}
+        return _band_indication(view.mid[i], lower_band, upper_band)
 
     def series_indication(self, security: DataFile, atr: pd.Series = None) -> pd.Series:
+        return Indication.from_signals(self.series_signal(security, atr=atr))
+
+    def ema(self) -> ExponentialMovingAverageIndicator:
+        return ExponentialMovingAverageIndicator(min_period=self.min_period, min_period_ticks=self.min_period_ticks, threads=self.threads, mode=self.ema_mode)
+
+    def atr(self) -> SimpleAverageTrueRangeIndicator:
+        return SimpleAverageTrueRangeIndicator(min_period=self.min_period, min_period_ticks=self.min_period_ticks, n=self.n, mode=self.atr_mode, chunk_ticks=self.chunk_ticks)
+
+    def stream(self) -> IndicatorStream:
+        # only a recursive ema with the chunks atr is an O(1) streaming state that equals series_signal,
+        # otherwise the stream recomputes indication() over the buffered window, O(window) per tick
+        if self.ema_mode != ExponentialMovingAverageIndicator.COMPAT and self.atr_mode == SimpleAverageTrueRangeIndicator.CHUNKS:
+            return KeltnerChannelsRecursiveStream(self.ema().stream(), self.atr().stream(), self.times_art)
+        return KeltnerChannelsStream(self.timedelta_min_period, self.min_period_ticks, self.n, self.times_art)
+
+    def signal_node(self, graph: IndicatorGraph, atr: None | Node = None) -> Node:
+        ema = self.ema().node(graph)
+        if atr is None:
+            atr = self.atr().node(graph)
+        return graph.band_signal(graph.column("mid"), ema, atr, self.times_art, cache=True)
+
+    def series_signal(self, security: DataFile, atr: pd.Series = None) -> pd.Series:
         start_time = datetime.now()
         print(f"Calculate KeltnerChannelsIndicator at <{start_time}>")
 
-        ema = ExponentialMovingAverageIndicator(min_period=self.min_period, min_period_ticks=self.min_period_ticks, threads=self.threads).series_indication(security=security)
         if atr is None:
-            atr = SimpleAverageTrueRangeIndicator(min_period=self.min_period, min_period_ticks=self.min_period_ticks, n=self.n).series_indication(security=security)
-        df = security.mid.to_frame("price")
-        df["lower_band"] = ema - self.times_art * atr
-        df["upper_band"] = ema + self.times_art * atr
-        kc = df.apply(lambda x: Indication.SELL if x.price <= x.lower_band else Indication.BUY if x.upper_band <= x.price else Indication.HOLD, axis="columns")
+            kc = IndicatorGraph.compute(security, self.signal_node)
+        else:
+            kc = IndicatorGraph.compute(security, lambda graph: self.signal_node(graph, atr=graph.constant("atr", atr.to_numpy(dtype=np.float64))))
+        kc = pd.Series(kc, index=security.index)
 
         end_date = datetime.now()
         print(f"End calculation at <{end_date}> within {end_date-start_time}")
         return kc
+
+
+def _band_indication(price: float, lower_band: float, upper_band: float) -> Indication:
+    # the rule of series_signal: the price at or below the lower band sells, at or above the upper band buys
+    if price <= lower_band:
+        return Indication.SELL
+    elif upper_band <= price:
+        return Indication.BUY
+    else:
+        return Indication.HOLD
+
+
+class KeltnerChannelsStream(WindowStream):
+    # not an O(1) state: ema and true ranges of indication() are recomputed over the whole window on every tick
+    def __init__(self, min_period: timedelta, min_period_ticks: int, n: int, times_art: float):
+        super().__init__(min_period, min_period_ticks)
+        self.n = n
+        self.times_art = times_art
+        self.value: dict[str, float] = {}
+
+    def _add(self, price: float, previous: None | float) -> None:
+        pass
+
+    def _remove(self, price: float, following: float) -> None:
+        pass
+
+    def _value(self) -> Indication:
+        period = self.prices
+        ema = ewma(period, NO_DELTAS, span_alpha(len(period)), False)[-1]
+        atr = true_ranges(period, self.n).mean()
+        lower_band = ema - self.times_art * atr
+        upper_band = ema + self.times_art * atr
+        self.value = {"lower_band": lower_band, "ema": ema, "upper_band": upper_band}
+        return _band_indication(self.price, lower_band, upper_band)
+
+
+class KeltnerChannelsRecursiveStream(IndicatorStream):
+    # bands of the ema and atr streams
+    def __init__(self, ema: IndicatorStream, atr: IndicatorStream, times_art: float):
+        self.ema = ema
+        self.atr = atr
+        self.times_art = times_art
+        self.value: dict[str, float] = {}
+
+    def update_ns(self, date: int, price: float) -> Indication:
+        ema = self.ema.update_ns(date, price)
+        atr = self.atr.update_ns(date, price)
+        lower_band = ema - atr * self.times_art
+        upper_band = ema + atr * self.times_art
+        self.value = {"lower_band": lower_band, "ema": ema, "upper_band": upper_band}
+        return _band_indication(price, lower_band, upper_band)
@@ -1,9 +1,14 @@
 from datetime import datetime, timedelta
 
+import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 
 from Backtesting.Indicator import TrendIndicator, Indication
+from Backtesting.Indicator.BaseIndicators import WindowStream, RunningSum
+from Backtesting.Indicator.IndicatorGraph import IndicatorGraph, Node
+from Backtesting.Indicator.RollingKernels import rolling_mean
+from Backtesting.Indicator.TickView import TickView, diff_period, nan_mean
 from DataDownload.DataFile import DataFile
 from multiprocesspandas import applyparallel
 
@@ -19,17 +24,18 @@ class RelativeStrengthIndexIndicator(TrendIndicator):
         self.threads = threads
 
     def indication(self, security: DataFile, end_date: datetime) -> Indication:
-        end_index = security.index.get_loc(end_date) + 1
-        start_index = security.index.get_indexer(pd.DatetimeIndex([end_date - self.min_period]), method="backfill")[0]
-        start_index = max(0, min(start_index, end_index - self.min_period_ticks))
-        period: pd.Series = security.mid.iloc[start_index:end_index]
-        diff = period.diff()
-        avg_gain = diff.clip(lower=0).mean()
-        avg_loss = -diff.clip(upper=0).mean()
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        self.date_cache[end_date] = rsi
-        self.idx_cache[end_index] = rsi
+        return self.indication_at(security, TickView.of(security).position(end_date))
+
+    def indication_at(self, security: DataFile, i: int) -> Indication:
+        view = TickView.of(security)
+        diff = diff_period(view.period(self.timedelta_min_period, self.min_period_ticks, i))
+        avg_gain = nan_mean(np.maximum(diff, 0.0))
+        avg_loss = -nan_mean(np.minimum(diff, 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = avg_gain / avg_loss
+            rsi = 100 - (100 / (1 + rs))
+        self.date_cache[view.index[i]] = rsi
+        self.idx_cache[i + 1] = rsi
         if rsi <= self.lower:
             return Indication.BUY
         elif self.upper <= rsi:
@@ -38,25 +44,67 @@ class RelativeStrengthIndexIndicator(TrendIndicator):
             return Indication.HOLD
 
     def series_indication(self, security: DataFile) -> pd.Series:
+        return Indication.from_signals(self.series_signal(security))
+
+    def node(self, graph: IndicatorGraph) -> Node:
+        return graph.add("rsi", _rsi, (graph.diff(graph.column("mid")), graph.window_starts(self.timedelta_min_period, self.min_period_ticks)), cache=True)
+
+    def stream(self) -> "RelativeStrengthIndexStream":
+        return RelativeStrengthIndexStream(self.timedelta_min_period, self.min_period_ticks, self.lower, self.upper)
+
+    def signal_node(self, graph: IndicatorGraph) -> Node:
+        return graph.threshold_signal(self.node(graph), self.lower, self.upper, cache=True)
+
+    def series_signal(self, security: DataFile) -> pd.Series:
         start_time = datetime.now()
         print(f"Calculate RelativeStrengthIndexIndicator at <{start_time}>")
 
-        diff = security.mid.diff()
-        gain = diff.clip(lower=0)
-        loss = -diff.clip(upper=0)
-        avg_loss_rolling = loss.rolling(window=self.timedelta_min_period)
-        selector = avg_loss_rolling.count().lt(self.min_period_ticks)
-        avg_gain_periods = gain.rolling(window=self.min_period_ticks, min_periods=1).mean()
-        avg_loss_periods = loss.rolling(window=self.min_period_ticks, min_periods=1).mean()
-        avg_gain: pd.Series = gain.rolling(window=self.timedelta_min_period).mean()
-        avg_loss: pd.Series = avg_loss_rolling.mean()
-        avg_gain.loc[selector] = avg_gain_periods.loc[selector]
-        avg_loss.loc[selector] = avg_loss_periods.loc[selector]
-        rs = avg_gain.divide(avg_loss)
-        rsi = rs.apply(lambda x: 100 - (100 / (x + 1)))
-        self.date_cache = rsi
-        rsi = rsi.apply(lambda x: Indication.SELL if x <= self.lower else Indication.BUY if self.upper <= x else Indication.HOLD)
+        graph = IndicatorGraph()
+        values = graph.evaluate(security, {"rsi": self.node(graph), "signal": self.signal_node(graph)})
+        self.fill_cache(pd.Series(values["rsi"], index=security.index, name=security.mid.name))
+        rsi = pd.Series(values["signal"], index=security.index, name=security.mid.name)
 
         end_date = datetime.now()
         print(f"End calculation at <{end_date}> within {end_date-start_time}")
         return rsi
+
+
+def _rsi(diff: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    # same values as diff.clip(lower=0) and -diff.clip(upper=0), including the -0.0 losses
+    avg_gain = rolling_mean(np.maximum(diff, 0.0), starts)
+    avg_loss = rolling_mean(-np.minimum(diff, 0.0), starts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (avg_gain / avg_loss + 1))
+
+
+class RelativeStrengthIndexStream(WindowStream):
+    # running sums of the gains and losses between the ticks of the window
+    def __init__(self, min_period: timedelta, min_period_ticks: int, lower: float, upper: float):
+        super().__init__(min_period, min_period_ticks)
+        self.lower = lower
+        self.upper = upper
+        self.gains = RunningSum()
+        self.losses = RunningSum()
+        self.value = np.nan
+
+    def _add(self, price: float, previous: None | float) -> None:
+        if previous is not None:
+            diff = price - previous
+            self.gains.add(max(diff, 0.0))
+            self.losses.add(-min(diff, 0.0))
+
+    def _remove(self, price: float, following: float) -> None:
+        diff = following - price
+        self.gains.remove(max(diff, 0.0))
+        self.losses.remove(-min(diff, 0.0))
+
+    def _value(self) -> Indication:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rs = np.float64(self.gains.mean) / np.float64(self.losses.mean)
+            self.value = 100 - (100 / (1 + rs))
+        if self.value <= self.lower:
+            return Indication.BUY
+        elif self.upper <= self.value:
+            return Indication.SELL
+        else:
+            return Indication.HOLD
@@ -0,0 +1,350 @@
+import numpy as np
+from numba import jit
+
+RMQ_BLOCK: int = 32
+NO_DELTAS: np.ndarray = np.empty(0)
+
+
+def window_starts(dates: np.ndarray, window: int, min_ticks: int, side: str = "right") -> np.ndarray:
+    # first tick of the time window (t - window, t] (side="left": [t - window, t]), widened to at least min_ticks ticks like rolling(window) + rolling(min_ticks)
+    ends = np.arange(1, len(dates) + 1)
+    time_starts = np.minimum(np.searchsorted(dates, dates - window, side=side), ends)
+    return np.minimum(time_starts, np.maximum(0, ends - min_ticks))
+
+
+@jit(nopython=True, nogil=True)
+def _rmq_tables(values: np.ndarray, block: int):
+    num = values.shape[0]
+    num_blocks = (num + block - 1) // block
+    prefix_max, prefix_min = np.empty(num), np.empty(num)
+    suffix_max, suffix_min = np.empty(num), np.empty(num)
+    for b in range(num_blocks):
+        lo, hi = b * block, min(num, (b + 1) * block)
+        prefix_max[lo], prefix_min[lo] = values[lo], values[lo]
+        for i in range(lo + 1, hi):
+            prefix_max[i] = max(prefix_max[i - 1], values[i])
+            prefix_min[i] = min(prefix_min[i - 1], values[i])
+        suffix_max[hi - 1], suffix_min[hi - 1] = values[hi - 1], values[hi - 1]
+        for i in range(hi - 2, lo - 1, -1):
+            suffix_max[i] = max(suffix_max[i + 1], values[i])
+            suffix_min[i] = min(suffix_min[i + 1], values[i])
+
+    log_table = np.zeros(max(num_blocks, 1) + 1, dtype=np.int64)
+    for i in range(2, num_blocks + 1):
+        log_table[i] = log_table[i // 2] + 1
+    levels = log_table[max(num_blocks, 1)] + 1
+    sparse_max, sparse_min = np.empty((levels, max(num_blocks, 1))), np.empty((levels, max(num_blocks, 1)))
+    for b in range(num_blocks):
+        sparse_max[0, b] = prefix_max[min(num, (b + 1) * block) - 1]
+        sparse_min[0, b] = prefix_min[min(num, (b + 1) * block) - 1]
+    for k in range(1, levels):
+        half = 1 << (k - 1)
+        for b in range(num_blocks - (1 << k) + 1):
+            sparse_max[k, b] = max(sparse_max[k - 1, b], sparse_max[k - 1, b + half])
+            sparse_min[k, b] = min(sparse_min[k - 1, b], sparse_min[k - 1, b + half])
+    return prefix_max, prefix_min, suffix_max, suffix_min, sparse_max, sparse_min, log_table
+
+
+@jit(nopython=True, nogil=True)
+def true_ranges(period: np.ndarray, n: int) -> np.ndarray:
+    # max - min of the min(n, len) np.array_split chunks of period
+    chunks = min(n, period.shape[0])
+    each, extras = period.shape[0] // chunks, period.shape[0] % chunks
+    trs = np.empty(chunks)
+    lo = 0
+    for c in range(chunks):
+        hi = lo + (each + 1 if c < extras else each)
+        trs[c] = period[lo:hi].max() - period[lo:hi].min()
+        lo = hi
+    return trs
+
+
+@jit(nopython=True, nogil=True)
+def rolling_atr(values: np.ndarray, starts: np.ndarray, n: int) -> np.ndarray:
+    # mean of max - min over the min(n, len) np.array_split chunks of every window, summed in the same order as before
+    block = RMQ_BLOCK
+    prefix_max, prefix_min, suffix_max, suffix_min, sparse_max, sparse_min, log_table = _rmq_tables(values, block)
+    num = values.shape[0]
+    out = np.empty(num)
+    for i in range(num):
+        length = i + 1 - starts[i]
+        if length <= 0:
+            out[i] = np.nan
+            continue
+        chunks = min(n, length)
+        each, extras = length // chunks, length % chunks
+        total = 0.0
+        lo = starts[i]
+        for c in range(chunks):
+            hi = lo + (each if c < extras else each - 1)
+            # max / min of values[lo:hi + 1], scanned inside a block, else from the block tables
+            block_lo, block_hi = lo // block, hi // block
+            if block_lo == block_hi:
+                mx, mn = values[lo], values[lo]
+                for j in range(lo + 1, hi + 1):
+                    mx = max(mx, values[j])
+                    mn = min(mn, values[j])
+            else:
+                mx, mn = max(suffix_max[lo], prefix_max[hi]), min(suffix_min[lo], prefix_min[hi])
+                if block_lo + 1 < block_hi:
+                    k = log_table[block_hi - block_lo - 1]
+                    right = block_hi - (1 << k)
+                    mx = max(mx, max(sparse_max[k, block_lo + 1], sparse_max[k, right]))
+                    mn = min(mn, min(sparse_min[k, block_lo + 1], sparse_min[k, right]))
+            total += mx - mn
+            lo = hi + 1
+        out[i] = total / chunks
+    return out
+
+
+@jit(nopython=True, nogil=True)
+def chunk_atr(values: np.ndarray, chunk_ticks: int, n: int) -> np.ndarray:
+    # mean of max - min over the last n fixed chunks of chunk_ticks ticks (counted from the first tick), the current chunk up to the tick
+    # the sum of the completed chunks only changes when a chunk completes, so the series and the stream take O(1) per tick
+    num = values.shape[0]
+    out = np.empty(num)
+    ranges = np.empty(num // chunk_ticks + 1)
+    completed, count = 0.0, 0
+    high, low = np.nan, np.nan
+    for i in range(num):
+        x = values[i]
+        if i % chunk_ticks == 0:
+            chunk = i // chunk_ticks
+            if 0 < chunk:
+                ranges[chunk - 1] = high - low
+                first = max(0, chunk - n + 1)
+                completed, count = 0.0, chunk - first
+                for j in range(first, chunk):
+                    completed += ranges[j]
+            high, low = x, x
+        else:
+            if high < x:
+                high = x
+            if x < low:
+                low = x
+        out[i] = (completed + (high - low)) / (count + 1)
+    return out
+
+
+@jit(nopython=True, nogil=True)
+def _add_mean(x: float, state: np.ndarray, counts: np.ndarray) -> None:
+    # state: sum, add compensation, remove compensation, previous value, counts: observations, negatives, repeats of the previous value
+    if not np.isnan(x):
+        counts[0] += 1
+        y = x - state[1]
+        t = state[0] + y
+        state[1] = t - state[0] - y
+        state[0] = t
+        if np.signbit(x):
+            counts[1] += 1
+        if x == state[3]:
+            counts[2] += 1
+        else:
+            counts[2] = 1
+        state[3] = x
+
+
+@jit(nopython=True, nogil=True)
+def _remove_mean(x: float, state: np.ndarray, counts: np.ndarray) -> None:
+    if not np.isnan(x):
+        counts[0] -= 1
+        y = -x - state[2]
+        t = state[0] + y
+        state[2] = t - state[0] - y
+        state[0] = t
+        if np.signbit(x):
+            counts[1] -= 1
+
+
+@jit(nopython=True, nogil=True)
+def rolling_mean(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    # mean of the non NaN values[starts[i]:i + 1], same compensated add/remove updates as pandas rolling().mean()
+    num = values.shape[0]
+    out = np.empty(num)
+    state, counts = np.zeros(4), np.zeros(3, dtype=np.int64)
+    for i in range(num):
+        if i == 0 or starts[i] < starts[i - 1] or i <= starts[i]:
+            state[:] = 0.0
+            counts[:] = 0
+            state[3] = values[min(starts[i], i)]
+            for j in range(starts[i], i + 1):
+                _add_mean(values[j], state, counts)
+        else:
+            for j in range(starts[i - 1], starts[i]):
+                _remove_mean(values[j], state, counts)
+            _add_mean(values[i], state, counts)
+        nobs, neg_ct, repeats = counts[0], counts[1], counts[2]
+        if nobs == 0:
+            out[i] = np.nan
+        else:
+            out[i] = state[0] / nobs
+            if nobs <= repeats:
+                out[i] = state[3]
+            elif neg_ct == 0 and out[i] < 0:
+                out[i] = 0.0
+            elif neg_ct == nobs and 0 < out[i]:
+                out[i] = 0.0
+    return out
+
+
+@jit(nopython=True, nogil=True)
+def rolling_std(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    # population std of values[starts[i]:i + 1] with Welford add/remove updates, NaN if the window holds a NaN
+    num = values.shape[0]
+    out = np.empty(num)
+    count, nan_count, mean, m2 = 0, 0, 0.0, 0.0
+    lo, removed = 0, 0
+    for i in range(num):
+        x = values[i]
+        if np.isnan(x):
+            nan_count += 1
+        else:
+            count += 1
+            delta = x - mean
+            mean += delta / count
+            m2 += delta * (x - mean)
+        while lo < starts[i]:
+            x = values[lo]
+            lo += 1
+            if np.isnan(x):
+                nan_count -= 1
+            else:
+                count -= 1
+                removed += 1
+                if count == 0:
+                    mean, m2 = 0.0, 0.0
+                else:
+                    delta = x - mean
+                    mean -= delta / count
+                    m2 -= delta * (x - mean)
+        if starts[i] < lo or count < removed:
+            # rebuild once the window has been fully replaced, so rounding errors of the removals cannot pile up
+            lo = min(lo, starts[i])
+            count, nan_count, mean, m2, removed = 0, 0, 0.0, 0.0, 0
+            for j in range(lo, i + 1):
+                if np.isnan(values[j]):
+                    nan_count += 1
+                else:
+                    count += 1
+                    delta = values[j] - mean
+                    mean += delta / count
+                    m2 += delta * (values[j] - mean)
+        if count == 0 or 0 < nan_count:
+            out[i] = np.nan
+        else:
+            out[i] = np.sqrt(max(m2, 0.0) / count)
+    return out
+
+
+@jit(nopython=True, nogil=True)
+def stochastic_k(period: np.ndarray) -> float:
+    # %K of one window, the per tick counterpart of rolling_stochastic
+    if len(period) == 0:
+        return np.nan
+    last = period[-1]
+    low = period.min()
+    high = period.max()
+    if low == high:
+        return 50
+    return 100 * (last - low) / (high - low)
+
+
+@jit(nopython=True, nogil=True)
+def rolling_stochastic(values: np.ndarray, starts: np.ndarray):
+    # low, high and %K of values[starts[i]:i + 1] with monotonic deques, starts has to be non decreasing
+    num = values.shape[0]
+    low, high, k = np.empty(num), np.empty(num), np.empty(num)
+    min_deque, max_deque = np.empty(num, dtype=np.int64), np.empty(num, dtype=np.int64)
+    min_head, min_tail, max_head, max_tail = 0, 0, 0, 0
+    last_nan = -1
+    for i in range(num):
+        x = values[i]
+        if np.isnan(x):
+            last_nan = i
+        else:
+            while min_head < min_tail and x <= values[min_deque[min_tail - 1]]:
+                min_tail -= 1
+            min_deque[min_tail] = i
+            min_tail += 1
+            while max_head < max_tail and values[max_deque[max_tail - 1]] <= x:
+                max_tail -= 1
+            max_deque[max_tail] = i
+            max_tail += 1
+        while min_head < min_tail and min_deque[min_head] < starts[i]:
+            min_head += 1
+        while max_head < max_tail and max_deque[max_head] < starts[i]:
+            max_head += 1
+
+        if i < starts[i] or starts[i] <= last_nan:
+            # an empty window has no %K, like the rolling apply that is not called for it
+            low[i], high[i], k[i] = np.nan, np.nan, np.nan
+        else:
+            low[i], high[i] = values[min_deque[min_head]], values[max_deque[max_head]]
+            k[i] = 50.0 if low[i] == high[i] else 100 * (x - low[i]) / (high[i] - low[i])
+    return low, high, k
+
+
+def rolling_min_max(values: np.ndarray, starts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    low, high, _ = rolling_stochastic(values, starts)
+    return low, high
+
+
+@jit(nopython=True, nogil=True)
+def span_alpha(span: float) -> float:
+    # alpha as pandas ewm(span=span) derives it
+    return 1.0 / (1.0 + (span - 1) / 2)
+
+
+def halflife_deltas(dates: np.ndarray, halflife: int) -> np.ndarray:
+    # time between two ticks in halflifes, as pandas ewm(halflife=halflife, times=dates) computes it from float dates
+    return np.diff(dates.astype(np.float64)) / float(halflife)
+
+
+@jit(nopython=True, nogil=True)
+def ewma(values: np.ndarray, deltas: np.ndarray, alpha: float, adjust: bool) -> np.ndarray:
+    # recursive ewm().mean(), the old weight decays by (1 - alpha) ** deltas[i - 1] (one tick if deltas is empty), same float operations as pandas
+    num = values.shape[0]
+    out = np.empty(num)
+    if num == 0:
+        return out
+    new_wt = 1.0 if adjust else alpha
+    weighted = values[0]
+    old_wt = 1.0
+    out[0] = weighted
+    for i in range(1, num):
+        x = values[i]
+        if weighted == weighted:
+            old_wt *= (1.0 - alpha) ** deltas[i - 1] if 0 < deltas.shape[0] else 1.0 - alpha
+            if x == x:
+                if weighted != x:
+                    weighted = (old_wt * weighted + new_wt * x) / (old_wt + new_wt)
+                old_wt = old_wt + new_wt if adjust else 1.0
+        elif x == x:
+            weighted = x
+        out[i] = weighted
+    return out
+
+
+@jit(nopython=True, nogil=True)
+def rolling_ewma_mean(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    # mean of the adjusted EWMA over values[starts[i]:i + 1] with span = window length, NaN if the window holds a NaN
+    num = values.shape[0]
+    out = np.empty(num)
+    last_nan = -1
+    for i in range(num):
+        if np.isnan(values[i]):
+            last_nan = i
+        length = i + 1 - starts[i]
+        if length <= 0 or starts[i] <= last_nan:
+            out[i] = np.nan
+            continue
+        alpha = 2 / float(length + 1)
+        w = 1
+        ewma_old = values[starts[i]]
+        total = ewma_old
+        for j in range(1, length):
+            w += (1 - alpha) ** j
+            ewma_old = ewma_old * (1 - alpha) + values[starts[i] + j]
+            total += ewma_old / w
+        out[i] = total / length
+    return out
@@ -1,58 +1,118 @@
+from collections import deque
 from datetime import datetime, timedelta
 
 import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
-from numba import jit, float64, int64
 
 from DataDownload.DataFile import DataFile
 from . import VolatilityIndicator
+from .BaseIndicators import IndicatorStream, WindowStream
+from .IndicatorGraph import IndicatorGraph, Node
+from .RollingKernels import chunk_atr, rolling_atr, true_ranges
+from .TickView import TickView
 
 
 class SimpleAverageTrueRangeIndicator(VolatilityIndicator):
-    def __init__(self, min_period: relativedelta = relativedelta(), min_period_ticks: int = 0, n: int = 14, threads: int = 1):
+    WINDOW: str = "window"
+    CHUNKS: str = "chunks"
+    MODES: list[str] = [WINDOW, CHUNKS]
+
+    def __init__(self, min_period: relativedelta = relativedelta(), min_period_ticks: int = 0, n: int = 14, threads: int = 1, mode: str = WINDOW, chunk_ticks: None | int = None):
         super().__init__()
         self.min_period = min_period
         self.timedelta_min_period = timedelta(days=min_period.days, hours=min_period.hours, minutes=min_period.minutes, seconds=min_period.seconds, microseconds=min_period.microseconds)
         self.min_period_ticks = min_period_ticks
         self.n = n
         self.threads = threads
+        if mode not in SimpleAverageTrueRangeIndicator.MODES:
+            raise ValueError(f"mode has to be one of {SimpleAverageTrueRangeIndicator.MODES}, not {mode}")
+        self.mode = mode
+        # window mode: n np.array_split chunks of the hybrid window, chunks mode: the last n fixed chunks of chunk_ticks ticks
+        self.chunk_ticks = max(min_period_ticks // n, 1) if chunk_ticks is None else chunk_ticks
+        if self.chunk_ticks < 1:
+            raise ValueError("chunks mode needs a positive chunk_ticks")
 
     def indication(self, security: DataFile, end_date: datetime) -> None | float:
-        end_index = security.index.get_loc(end_date) + 1
-        start_index = security.index.get_indexer(pd.DatetimeIndex([end_date - self.min_period]), method="backfill")[0]
-        start_index = max(0, min(start_index, end_index - self.min_period_ticks))
-        if start_index == end_index:
+        return self.indication_at(security, TickView.of(security).position(end_date))
+
+    def indication_at(self, security: DataFile, i: int) -> None | float:
+        view = TickView.of(security)
+        if self.mode == SimpleAverageTrueRangeIndicator.CHUNKS:
+            # the chunks are aligned to the first tick, so the last n of them start at a multiple of chunk_ticks
+            start = max(0, i // self.chunk_ticks - self.n + 1) * self.chunk_ticks
+            atr = chunk_atr(view.mid[start : i + 1], self.chunk_ticks, self.n)[-1]
+            self.date_cache[view.index[i]] = atr
+            self.idx_cache[i + 1] = atr
+            return atr
+        period = view.period(self.timedelta_min_period, self.min_period_ticks, i)
+        if len(period) == 0:
             return None
-        period: pd.Series[float] = security.mid.iloc[start_index:end_index]
-        split = np.array_split(period, min(end_index - start_index, self.n))
-        trs = np.array([max(arr.max(), arr.flat[0]) - min(arr.min(), arr.flat[0]) for arr in split])
-        atr = trs.mean()
-        self.date_cache[end_date] = atr
-        self.idx_cache[end_index] = atr
+        atr = true_ranges(period, self.n).mean()
+        self.date_cache[view.index[i]] = atr
+        self.idx_cache[i + 1] = atr
         return atr
 
+    def stream(self) -> IndicatorStream:
+        # chunks mode keeps the ranges of the completed chunks in O(1), window mode is not a streaming state: it recomputes the chunks over the window, O(window) per tick
+        if self.mode == SimpleAverageTrueRangeIndicator.CHUNKS:
+            return ChunkAverageTrueRangeStream(self.chunk_ticks, self.n)
+        return SimpleAverageTrueRangeStream(self.timedelta_min_period, self.min_period_ticks, self.n)
+
+    def node(self, graph: IndicatorGraph) -> Node:
+        if self.mode == SimpleAverageTrueRangeIndicator.CHUNKS:
+            return graph.add("chunk_atr", chunk_atr, (graph.column("mid"),), (self.chunk_ticks, self.n), cache=True)
+        return graph.add("atr", rolling_atr, (graph.column("mid"), graph.window_starts(self.timedelta_min_period, self.min_period_ticks)), (self.n,), cache=True)
+
     def series_indication(self, security: DataFile) -> pd.Series:
         start_time = datetime.now()
         print(f"Calculate SimpleAverageTrueRangeIndicator at <{start_time}>")
 
-        rolling = security.mid.rolling(window=self.timedelta_min_period)
-        selector = rolling.count().lt(self.min_period_ticks)
-        rolling_atr_period = security.mid.rolling(window=self.min_period_ticks, min_periods=1).apply(lambda x: _func(x.to_numpy(), self.n))
-        rolling_atr = rolling.apply(lambda x: _func(x.to_numpy(), self.n))
-        rolling_atr.loc[selector] = rolling_atr_period.loc[selector]
+        atr = pd.Series(IndicatorGraph.compute(security, self.node), index=security.index, name=security.mid.name)
 
         end_date = datetime.now()
         print(f"End calculation at <{end_date}> within {end_date-start_time}")
-        return rolling_atr
-
-
-@jit((float64[:], int64), nopython=True, nogil=True)
-def _func(period: np.ndarray, n: int64) -> float64:
-    n = min(n, period.shape[0])
-    x = np.empty(n, dtype=np.float64)
-    arr = np.array_split(period, n)
-    for i in range(n):
-        ar = arr[i]
-        x[i] = max(ar.max(), ar.flat[0]) - min(ar.min(), ar.flat[0])
-    return x.mean()
+        return atr
+
+
+class SimpleAverageTrueRangeStream(WindowStream):
+    # not an O(1) state: the np.array_split chunks move with every tick, so the true ranges are recomputed over the whole window
+    def __init__(self, min_period: timedelta, min_period_ticks: int, n: int):
+        super().__init__(min_period, min_period_ticks)
+        self.n = n
+
+    def _add(self, price: float, previous: None | float) -> None:
+        pass
+
+    def _remove(self, price: float, following: float) -> None:
+        pass
+
+    def _value(self) -> float:
+        return true_ranges(self.prices, self.n).mean()
+
+
+class ChunkAverageTrueRangeStream(IndicatorStream):
+    # one step of chunk_atr, the ranges of the last n - 1 completed chunks are kept in a deque
+    def __init__(self, chunk_ticks: int, n: int):
+        self.chunk_ticks = chunk_ticks
+        self.ranges: deque[float] = deque(maxlen=n - 1)
+        self.completed = 0.0
+        self.high, self.low = np.nan, np.nan
+        self.ticks = 0
+
+    def update_ns(self, date: int, price: float) -> float:
+        if self.ticks % self.chunk_ticks == 0:
+            if 0 < self.ticks:
+                self.ranges.append(self.high - self.low)
+                # summed in the order of chunk_atr, once per completed chunk
+                self.completed = 0.0
+                for tr in self.ranges:
+                    self.completed += tr
+            self.high, self.low = price, price
+        else:
+            if self.high < price:
+                self.high = price
+            if price < self.low:
+                self.low = price
+        self.ticks += 1
+        return (self.completed + (self.high - self.low)) / (len(self.ranges) + 1)
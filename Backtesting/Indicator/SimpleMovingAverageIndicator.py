@@ -3,7 +3,10 @@ from datetime import datetime, timedelta
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 
-from .BaseIndicators import TrendIndicator
+from .BaseIndicators import TrendIndicator, WindowStream, RunningSum
+from .IndicatorGraph import IndicatorGraph, Node
+from .RollingKernels import rolling_mean
+from .TickView import TickView, nan_mean
 from DataDownload.DataFile import DataFile
 
 
@@ -15,27 +18,43 @@ class SimpleMovingAverageIndicator(TrendIndicator):
         self.min_period_ticks = min_period_ticks
 
     def indication(self, security: DataFile, end_date: datetime) -> float:
-        end_index = security.index.get_loc(end_date) + 1
-        start_index = security.index.get_indexer(pd.DatetimeIndex([end_date - self.min_period]), method="backfill")[0]
-        start_index = max(0, min(start_index, end_index - self.min_period_ticks))
-        period: pd.Series = security.mid.iloc[start_index:end_index]
-        avg = period.mean()
-        self.date_cache[end_date] = avg
-        self.idx_cache[end_index] = avg
+        return self.indication_at(security, TickView.of(security).position(end_date))
+
+    def indication_at(self, security: DataFile, i: int) -> float:
+        view = TickView.of(security)
+        avg = nan_mean(view.period(self.timedelta_min_period, self.min_period_ticks, i))
+        self.date_cache[view.index[i]] = avg
+        self.idx_cache[i + 1] = avg
         return avg
 
+    def stream(self) -> "SimpleMovingAverageStream":
+        return SimpleMovingAverageStream(self.timedelta_min_period, self.min_period_ticks)
+
+    def node(self, graph: IndicatorGraph) -> Node:
+        return graph.add("sma", rolling_mean, (graph.column("mid"), graph.window_starts(self.timedelta_min_period, self.min_period_ticks)), cache=True)
+
     def series_indication(self, security: DataFile) -> pd.Series:
         start_time = datetime.now()
         print(f"Calculate SimpleMovingAverageIndicator at <{start_time}>")
 
-        rolling = security.mid.rolling(window=self.timedelta_min_period)
-        selector = rolling.count().lt(self.min_period_ticks)
-        rolling = rolling.mean()
-        rolling_periods = security.mid.rolling(window=self.min_period_ticks, min_periods=1).mean()
-        rolling.loc[selector] = rolling_periods.loc[selector]
-        self.date_cache = rolling.to_dict()
-        self.idx_cache = rolling.reset_index().to_dict()
+        rolling = pd.Series(IndicatorGraph.compute(security, self.node), index=security.index, name=security.mid.name)
+        self.fill_cache(rolling)
 
         end_date = datetime.now()
         print(f"End calculation at <{end_date}> within {end_date-start_time}")
         return rolling
+
+
+class SimpleMovingAverageStream(WindowStream):
+    def __init__(self, min_period: timedelta, min_period_ticks: int):
+        super().__init__(min_period, min_period_ticks)
+        self.sum = RunningSum()
+
+    def _add(self, price: float, previous: None | float) -> None:
+        self.sum.add(price)
+
+    def _remove(self, price: float, following: float) -> None:
+        self.sum.remove(price)
+
+    def _value(self) -> float:
+        return self.sum.mean
@@ -1,12 +1,16 @@
+from collections import deque
 from datetime import datetime, timedelta
 
 import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 from matplotlib import pyplot as plt
-from numba import jit, float64
 
 from . import MomentumIndicator, Indication
+from .BaseIndicators import WindowStream
+from .IndicatorGraph import IndicatorGraph, Node
+from .RollingKernels import rolling_stochastic, stochastic_k
+from .TickView import TickView
 from DataDownload.DataFile import DataFile
 
 
@@ -23,13 +27,13 @@ class StochasticOscillatorIndicator(MomentumIndicator):
         self.threads = threads
 
     def indication(self, security: DataFile, end_date: datetime) -> Indication:
-        end_index = security.index.get_loc(end_date) + 1
-        start_index = security.index.get_indexer(pd.DatetimeIndex([end_date - self.min_period]), method="backfill")[0]
-        start_index = max(0, min(start_index, end_index - self.min_period_ticks))
-        period: pd.Series = security.mid.iloc[start_index:end_index]
-        soi = _func(period.to_numpy())
-        self.date_cache[end_date] = soi
-        self.idx_cache[end_index] = soi
+        return self.indication_at(security, TickView.of(security).position(end_date))
+
+    def indication_at(self, security: DataFile, i: int) -> Indication:
+        view = TickView.of(security)
+        soi = stochastic_k(view.period(self.timedelta_min_period, self.min_period_ticks, i))
+        self.date_cache[view.index[i]] = soi
+        self.idx_cache[i + 1] = soi
 
         if self.upper <= soi:
             return Indication.SELL
@@ -39,20 +43,32 @@ class StochasticOscillatorIndicator(MomentumIndicator):
             return Indication.HOLD
 
     def series_indication(self, security: DataFile) -> pd.Series:
+        return Indication.from_signals(self.series_signal(security))
+
+    def node(self, graph: IndicatorGraph) -> Node:
+        # low, high and soi
+        return graph.add("stochastic", rolling_stochastic, (graph.column("mid"), graph.window_starts(self.timedelta_min_period, self.min_period_ticks)), cache=True)
+
+    def stream(self) -> "StochasticOscillatorStream":
+        return StochasticOscillatorStream(self.timedelta_min_period, self.min_period_ticks, self.lower, self.upper)
+
+    def signal_node(self, graph: IndicatorGraph) -> Node:
+        return graph.threshold_signal(graph.item(self.node(graph), 2), self.lower, self.upper, cache=True)
+
+    def series_signal(self, security: DataFile) -> pd.Series:
         start_time = datetime.now()
         print(f"Calculate StochasticOscillatorIndicator at <{start_time}>")
 
-        rolling = security.mid.rolling(window=self.timedelta_min_period)
-        selector = rolling.count().lt(self.min_period_ticks)
-        soi_rolling = rolling.apply(lambda period: _func(period.to_numpy()))
-        soi_rolling_periods = security.mid.rolling(window=self.min_period_ticks, min_periods=1).apply(lambda period: _func(period.to_numpy()))
-        soi_rolling.loc[selector] = soi_rolling_periods.loc[selector]
-        soi_rolling = soi_rolling.apply(lambda x: Indication.SELL if x <= self.lower else Indication.BUY if self.upper <= x else Indication.HOLD)
+        soi_rolling = pd.Series(IndicatorGraph.compute(security, self.signal_node), index=security.index, name=security.mid.name)
 
         end_date = datetime.now()
         print(f"End calculation at <{end_date}> within {end_date-start_time}")
         return soi_rolling
 
+    def series_low_high(self, security: DataFile) -> pd.DataFrame:
+        low, high, soi = IndicatorGraph.compute(security, self.node)
+        return pd.DataFrame({"low": low, "high": high, "soi": soi}, index=security.index)
+
     def plot_soi(self):
         soi = pd.Series(self.date_cache).sort_index()
         plt.figure(figsize=(15, 6))
@@ -62,13 +78,36 @@ class StochasticOscillatorIndicator(MomentumIndicator):
         plt.show()
 
 
-@jit((float64[:],), nopython=True, nogil=True)
-def _func(period: np.ndarray) -> float64:
-    if len(period) == 0:
-        return 50
-    last = period[-1]
-    low = period.min()
-    hig = period.max()
-    if period.min() == period.max():
-        return 50
-    return 100 * (last - low) / (hig - low)
+class StochasticOscillatorStream(WindowStream):
+    # monotonic deques of (tick, price) for the low and high of the window
+    def __init__(self, min_period: timedelta, min_period_ticks: int, lower: float, upper: float):
+        super().__init__(min_period, min_period_ticks)
+        self.lower = lower
+        self.upper = upper
+        self.lows: deque[tuple[int, float]] = deque()
+        self.highs: deque[tuple[int, float]] = deque()
+        self.value = np.nan
+
+    def _add(self, price: float, previous: None | float) -> None:
+        while self.lows and price <= self.lows[-1][1]:
+            self.lows.pop()
+        self.lows.append((self.ticks - 1, price))
+        while self.highs and self.highs[-1][1] <= price:
+            self.highs.pop()
+        self.highs.append((self.ticks - 1, price))
+
+    def _remove(self, price: float, following: float) -> None:
+        while self.lows[0][0] < self.start:
+            self.lows.popleft()
+        while self.highs[0][0] < self.start:
+            self.highs.popleft()
+
+    def _value(self) -> Indication:
+        low, high = self.lows[0][1], self.highs[0][1]
+        self.value = 50 if low == high else 100 * (self.price - low) / (high - low)
+        if self.upper <= self.value:
+            return Indication.SELL
+        elif self.value <= self.lower:
+            return Indication.BUY
+        else:
+            return Indication.HOLD
@@ -0,0 +1,163 @@
+import numpy as np
+from numba import jit
+
+from .RollingKernels import ewma, span_alpha, stochastic_k, true_ranges
+
+# the indicators of one window mid[starts[i]:i + 1] for compiled per tick strategies, the values equal indication_at
+# numpy sums with pairwise summation, the sums below use the same blocks so they round the same
+
+PAIRWISE_BLOCK: int = 128
+SELL: int = -1
+HOLD: int = 0
+BUY: int = 1
+
+
+@jit(nopython=True, nogil=True)
+def _pairwise_sum(values: np.ndarray, lo: int, num: int) -> float:
+    if num < 8:
+        res = 0.0
+        for i in range(lo, lo + num):
+            res += values[i]
+        return res
+    elif num <= PAIRWISE_BLOCK:
+        r0, r1, r2, r3 = values[lo], values[lo + 1], values[lo + 2], values[lo + 3]
+        r4, r5, r6, r7 = values[lo + 4], values[lo + 5], values[lo + 6], values[lo + 7]
+        i = 8
+        while i < num - num % 8:
+            r0 += values[lo + i]
+            r1 += values[lo + i + 1]
+            r2 += values[lo + i + 2]
+            r3 += values[lo + i + 3]
+            r4 += values[lo + i + 4]
+            r5 += values[lo + i + 5]
+            r6 += values[lo + i + 6]
+            r7 += values[lo + i + 7]
+            i += 8
+        res = ((r0 + r1) + (r2 + r3)) + ((r4 + r5) + (r6 + r7))
+        while i < num:
+            res += values[lo + i]
+            i += 1
+        return res
+    half = num // 2
+    half -= half % 8
+    return _pairwise_sum(values, lo, half) + _pairwise_sum(values, lo + half, num - half)
+
+
+@jit(nopython=True, nogil=True)
+def pairwise_sum(values: np.ndarray) -> float:
+    # ndarray.sum of a contiguous float array
+    return _pairwise_sum(values, 0, values.shape[0])
+
+
+@jit(nopython=True, nogil=True)
+def nan_mean(values: np.ndarray) -> float:
+    # TickView.nan_mean
+    count = 0
+    for x in values:
+        if x == x:
+            count += 1
+    if count == 0:
+        return np.nan
+    if count < values.shape[0]:
+        values = np.where(np.isnan(values), 0.0, values)
+    return pairwise_sum(values) / count
+
+
+@jit(nopython=True, nogil=True)
+def nan_std(values: np.ndarray) -> float:
+    # TickView.nan_std, ddof=1
+    mask = np.isnan(values)
+    count = values.shape[0] - np.count_nonzero(mask)
+    if count <= 1:
+        return np.nan
+    if count < values.shape[0]:
+        values = np.where(mask, 0.0, values)
+    avg = pairwise_sum(values) / count
+    sqr = np.empty(values.shape[0])
+    for i in range(values.shape[0]):
+        sqr[i] = 0.0 if mask[i] else (avg - values[i]) * (avg - values[i])
+    return np.sqrt(pairwise_sum(sqr) / (count - 1))
+
+
+@jit(nopython=True, nogil=True)
+def pct_change(values: np.ndarray) -> np.ndarray:
+    pct = np.empty(values.shape[0])
+    if 0 < values.shape[0]:
+        pct[0] = np.nan
+    for i in range(1, values.shape[0]):
+        pct[i] = values[i] / values[i - 1] - 1
+    return pct
+
+
+@jit(nopython=True, nogil=True)
+def sma_at(mid: np.ndarray, starts: np.ndarray, i: int) -> float:
+    return nan_mean(mid[starts[i] : i + 1])
+
+
+@jit(nopython=True, nogil=True)
+def atr_at(mid: np.ndarray, starts: np.ndarray, i: int, n: int) -> float:
+    # NaN where indication_at gives None
+    period = mid[starts[i] : i + 1]
+    if period.shape[0] == 0:
+        return np.nan
+    ranges = true_ranges(period, n)
+    return pairwise_sum(ranges) / ranges.shape[0]
+
+
+@jit(nopython=True, nogil=True)
+def ema_at(mid: np.ndarray, starts: np.ndarray, i: int) -> float:
+    period = mid[starts[i] : i + 1]
+    return ewma(period, np.empty(0), span_alpha(period.shape[0]), False)[-1]
+
+
+@jit(nopython=True, nogil=True)
+def bollinger_at(mid: np.ndarray, starts: np.ndarray, i: int, standard_deviations: float) -> int:
+    period = mid[starts[i] : i + 1]
+    sma = nan_mean(period)
+    std_dev = nan_std(pct_change(period))
+    if sma + standard_deviations * std_dev <= period[-1]:
+        return SELL
+    elif period[-1] <= sma - standard_deviations * std_dev:
+        return BUY
+    return HOLD
+
+
+@jit(nopython=True, nogil=True)
+def keltner_at(mid: np.ndarray, starts: np.ndarray, i: int, n: int, times_art: float) -> int:
+    period = mid[starts[i] : i + 1]
+    ema = ewma(period, np.empty(0), span_alpha(period.shape[0]), False)[-1]
+    ranges = true_ranges(period, n)
+    atr = pairwise_sum(ranges) / ranges.shape[0]
+    if period[-1] <= ema - times_art * atr:
+        return SELL
+    elif ema + times_art * atr <= period[-1]:
+        return BUY
+    return HOLD
+
+
+@jit(nopython=True, nogil=True, error_model="numpy")
+def rsi_at(mid: np.ndarray, starts: np.ndarray, i: int, lower: float, upper: float) -> int:
+    # gains and losses of diff_period, the first difference is NaN
+    period = mid[starts[i] : i + 1]
+    gains, losses = np.empty(period.shape[0]), np.empty(period.shape[0])
+    gains[0], losses[0] = np.nan, np.nan
+    for k in range(1, period.shape[0]):
+        diff = period[k] - period[k - 1]
+        gains[k] = np.nan if diff != diff else max(diff, 0.0)
+        losses[k] = np.nan if diff != diff else min(diff, 0.0)
+    rsi = 100 - (100 / (1 + nan_mean(gains) / -nan_mean(losses)))
+    if rsi <= lower:
+        return BUY
+    elif upper <= rsi:
+        return SELL
+    return HOLD
+
+
+@jit(nopython=True, nogil=True)
+def stochastic_at(mid: np.ndarray, starts: np.ndarray, i: int, lower: float, upper: float) -> int:
+    soi = stochastic_k(mid[starts[i] : i + 1])
+    if upper <= soi:
+        return SELL
+    elif soi <= lower:
+        return BUY
+    return HOLD
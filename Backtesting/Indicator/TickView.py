@@ -0,0 +1,85 @@
+import threading
+import weakref
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from .WindowBounds import WindowBounds
+from DataDownload.DataFile import DataFile
+
+
+class TickView:
+    # raw numpy views of a DataFile for the per tick indication path, positions instead of dates
+    _views: weakref.WeakKeyDictionary[DataFile, "TickView"] = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
+    def __init__(self, security: DataFile):
+        self.index: pd.Index = security.index
+        self.dates: np.ndarray = security.index.as_unit("ns").asi8
+        self.mid: np.ndarray = security.mid.to_numpy(dtype=np.float64)
+        # weak, the views are values of a WeakKeyDictionary on the DataFile
+        self._security = weakref.ref(security)
+
+    @staticmethod
+    def of(security: DataFile) -> "TickView":
+        with TickView._lock:
+            if security not in TickView._views:
+                TickView._views[security] = TickView(security)
+            return TickView._views[security]
+
+    def position(self, end_date: datetime) -> int:
+        # same as index.get_loc for the unique, sorted index of a DataFile
+        value = pd.Timestamp(end_date).as_unit("ns").value
+        i = int(np.searchsorted(self.dates, value))
+        if i == len(self.dates) or self.dates[i] != value:
+            raise KeyError(end_date)
+        return i
+
+    def starts(self, min_period: timedelta, min_period_ticks: int) -> np.ndarray:
+        # window [end_date - min_period, end_date] of indication(), but at least min_period_ticks ticks
+        return WindowBounds.starts(self._security(), min_period, min_period_ticks, side="left")
+
+    def period(self, min_period: timedelta, min_period_ticks: int, i: int) -> np.ndarray:
+        return self.mid[self.starts(min_period, min_period_ticks)[i] : i + 1]
+
+
+# the reductions below follow pandas nanops without bottleneck, so the per tick values equal the Series methods
+
+
+def nan_mean(values: np.ndarray) -> float:
+    mask = np.isnan(values)
+    count = len(values) - np.count_nonzero(mask)
+    if count == 0:
+        return np.nan
+    if count < len(values):
+        values = np.where(mask, 0.0, values)
+    return values.sum() / count
+
+
+def nan_std(values: np.ndarray) -> float:
+    # ddof=1 like Series.std
+    mask = np.isnan(values)
+    count = len(values) - np.count_nonzero(mask)
+    if count <= 1:
+        return np.nan
+    if count < len(values):
+        values = np.where(mask, 0.0, values)
+    sqr = (values.sum() / count - values) ** 2
+    if count < len(values):
+        sqr[mask] = 0.0
+    return np.sqrt(sqr.sum() / (count - 1))
+
+
+def diff_period(values: np.ndarray) -> np.ndarray:
+    diff = np.empty(len(values))
+    diff[:1] = np.nan
+    diff[1:] = values[1:] - values[:-1]
+    return diff
+
+
+def pct_change(values: np.ndarray) -> np.ndarray:
+    pct = np.empty(len(values))
+    pct[:1] = np.nan
+    pct[1:] = values[1:] / values[:-1] - 1
+    return pct
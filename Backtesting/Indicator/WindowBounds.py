@@ -0,0 +1,33 @@
+import threading
+import weakref
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from .RollingKernels import window_starts
+from DataDownload.DataFile import DataFile
+
+
+class WindowBounds:
+    # starts of the hybrid windows per DataFile and (min_period, min_period_ticks, side), shared by all indicators and TickView
+    _starts: weakref.WeakKeyDictionary[DataFile, dict[tuple[int, int, str], np.ndarray]] = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def starts(security: DataFile, min_period: timedelta, min_period_ticks: int, side: str = "right") -> np.ndarray:
+        # side="right" gives the windows (t - min_period, t] of the rolling series, side="left" the windows [t - min_period, t] of indication()
+        key = (pd.Timedelta(min_period).value, min_period_ticks, side)
+        with WindowBounds._lock:
+            bounds = WindowBounds._starts.setdefault(security, {})
+            if key in bounds:
+                return bounds[key]
+        starts = window_starts(security.index.as_unit("ns").asi8, *key)
+        starts.flags.writeable = False
+        with WindowBounds._lock:
+            return bounds.setdefault(key, starts)
+
+    @staticmethod
+    def clear() -> None:
+        with WindowBounds._lock:
+            WindowBounds._starts = weakref.WeakKeyDictionary()
@@ -1,4 +1,5 @@
 from .BaseIndicators import Indication, VolatilityIndicator, VolumeIndicator, MomentumIndicator, TrendIndicator
+from .IndicatorCache import IndicatorCache
 from .BollingerBandsIndicator import BollingerBandsIndicator
 from .ExponentialMovingAverage import ExponentialMovingAverageIndicator
 from .KeltnerChannelsIndicator import KeltnerChannelsIndicator
@@ -0,0 +1,85 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from Backtesting.Backtesting import Backtesting
+from Backtesting.Strategy.BaseStrategy import BaseStrategy
+from DataDownload.DataFile import DataFile
+from DataDownload.SharedMemoryDataFile import SharedMemoryDataFile
+
+# DataFile of a worker process, attached to the shared memory of the sweep once per worker
+_worker_security: None | DataFile = None
+
+
+class ParameterSweep:
+    # backtests every combination of a parameter grid (keyword arguments of the strategy class) on one DataFile
+    # the strategies of a chunk share one IndicatorGraph, indicator series that do not depend on a swept parameter are computed once
+    # the last parameter of the grid changes fastest, so with the windows first the combinations of one window land in the same chunk
+    def __init__(
+        self,
+        security: DataFile,
+        strategy_class: type[BaseStrategy],
+        grid: dict[str, list],
+        start_at: datetime | int = 0,
+        processes: int = 1,
+        threads: int = 1,
+        chunk_size: None | int = None,
+    ):
+        self.security: DataFile = security
+        self.strategy_class: type[BaseStrategy] = strategy_class
+        self.grid: dict[str, list] = grid
+        self.start_at = start_at
+        self.processes = processes
+        self.threads = threads
+        self.chunk_size = chunk_size
+
+    @property
+    def combinations(self) -> list[dict[str, any]]:
+        return [dict(zip(self.grid, values)) for values in itertools.product(*self.grid.values())]
+
+    def chunks(self) -> list[list[dict[str, any]]]:
+        combinations = self.combinations
+        chunk_size = self.chunk_size if self.chunk_size is not None else max(1, -(-len(combinations) // max(1, self.processes)))
+        return [combinations[i : i + chunk_size] for i in range(0, len(combinations), chunk_size)]
+
+    def run(self) -> pd.DataFrame:
+        start_time = datetime.now()
+        chunks = self.chunks()
+        print(f"Calculate ParameterSweep of {self.strategy_class.__name__} with {sum(len(chunk) for chunk in chunks)} combinations in {len(chunks)} chunks at <{start_time}>")
+        if self.processes <= 1:
+            tables = [sweep_chunk(self.security, self.strategy_class, chunk, self.start_at, self.threads) for chunk in chunks]
+        else:
+            # the columns are published once instead of being pickled into every worker
+            security = self.security if isinstance(self.security, SharedMemoryDataFile) else SharedMemoryDataFile.publish(self.security)
+            try:
+                with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker, initargs=(security,)) as executor:
+                    tables = list(executor.map(_sweep_worker, [(self.strategy_class, chunk, self.start_at, self.threads) for chunk in chunks]))
+            finally:
+                if security is not self.security:
+                    security.close()
+        table = pd.concat(tables, ignore_index=True)
+        end_time = datetime.now()
+        print(f"End calculation at <{end_time}> within {end_time - start_time}")
+        return table
+
+
+def sweep_chunk(security: DataFile, strategy_class: type[BaseStrategy], combinations: list[dict[str, any]], start_at: datetime | int, threads: int) -> pd.DataFrame:
+    # one row per combination, the parameters followed by the statistics of its BacktestResult
+    strategies = [strategy_class(threads=threads, **params) for params in combinations]
+    rows = []
+    for params, strategy, weights in zip(combinations, strategies, BaseStrategy.strategies_weights(security, strategies, threads=threads)):
+        backtesting = Backtesting(security=security, strategy=strategy, start_at=start_at, threads=threads)
+        backtesting.use_weights(weights)
+        rows.append({**params, **backtesting.result.to_info_df().iloc[:, 0].to_dict()})
+    return pd.DataFrame(rows)
+
+
+def _init_worker(security: DataFile) -> None:
+    global _worker_security
+    _worker_security = security
+
+
+def _sweep_worker(args: tuple) -> pd.DataFrame:
+    return sweep_chunk(_worker_security, *args)
@@ -1,8 +1,11 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
+from typing import Callable
 
+import numpy as np
 import pandas as pd
 
+from Backtesting.Indicator.IndicatorGraph import IndicatorGraph, Node
 from DataDownload.DataFile import DataFile
 
 
@@ -14,3 +17,33 @@ class BaseStrategy(ABC):
     @abstractmethod
     def get_weights(self, security: DataFile) -> pd.Series:
         raise NotImplementedError
+
+    def get_weight_at(self, security: DataFile, i: int) -> None | float:
+        return self.get_weight(security, security.index[i])
+
+    # compiled per tick weights for the iterative backtest, None falls back to get_weight_at
+    # a jitted kernel(i, weights, state) returns the weight at position i (NaN keeps the weight) from the raw arrays and numbers
+    # of the state tuple, weights holds the weights of the earlier positions for path dependent strategies
+    def tick_kernel(self, security: DataFile) -> None | tuple[Callable, tuple]:
+        return None
+
+    # indicator nodes of the strategy, the graph dedupes the ones shared with other strategies
+    def nodes(self, graph: IndicatorGraph) -> dict[str, Node]:
+        raise NotImplementedError
+
+    # weights from the evaluated nodes
+    def combine(self, security: DataFile, values: dict[str, np.ndarray]) -> pd.Series:
+        raise NotImplementedError
+
+    def evaluate(self, security: DataFile, threads: int = 1) -> dict[str, np.ndarray]:
+        graph = IndicatorGraph()
+        return graph.evaluate(security, self.nodes(graph), threads=threads)
+
+    @staticmethod
+    def strategies_weights(security: DataFile, strategies: list["BaseStrategy"], threads: int = 1) -> list[pd.Series]:
+        # one graph for all strategies, so every shared indicator is computed once
+        graph = IndicatorGraph()
+        strategies_nodes = [strategy.nodes(graph) for strategy in strategies]
+        outputs = {(i, name): node for i, nodes in enumerate(strategies_nodes) for name, node in nodes.items()}
+        values = graph.evaluate(security, outputs, threads=threads)
+        return [strategy.combine(security, {name: values[(i, name)] for name in nodes}) for i, (strategy, nodes) in enumerate(zip(strategies, strategies_nodes))]
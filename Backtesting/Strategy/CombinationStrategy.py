@@ -1,26 +1,45 @@
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
+from numba import jit
 
 from DataDownload.DataFile import DataFile
 from . import BaseStrategy
+from .SignalCombiner import SignalCombiner
 from ..Indicator import BollingerBandsIndicator, RelativeStrengthIndexIndicator, StochasticOscillatorIndicator, Indication
+from ..Indicator.IndicatorGraph import IndicatorGraph, Node
+from ..Indicator.TickKernels import BUY, SELL, bollinger_at, rsi_at, stochastic_at
+from ..Indicator.TickView import TickView
 
 
 class CombinationStrategy(BaseStrategy):
-    def __init__(self, invest: float = 1.0, threads: int = 1):
+    def __init__(
+        self,
+        invest: float = 1.0,
+        threads: int = 1,
+        min_period: relativedelta = relativedelta(hours=2),
+        min_period_ticks: int = 400,
+        standard_deviations: float = 2,
+        rsi_lower: float = 30,
+        rsi_upper: float = 70,
+        so_lower: float = 20,
+        so_upper: float = 80,
+    ):
         self.invest = invest
-        min_period = relativedelta(hours=2)
-        min_period_ticks = 400
-        self.bb = BollingerBandsIndicator(min_period=min_period, min_period_ticks=min_period_ticks, threads=threads)
-        self.rsi = RelativeStrengthIndexIndicator(min_period=min_period, min_period_ticks=min_period_ticks, lower=30, upper=70, threads=threads)
-        self.so = StochasticOscillatorIndicator(min_period=min_period, min_period_ticks=min_period_ticks, lower=20, upper=80, threads=threads)
+        self.threads = threads
+        self.bb = BollingerBandsIndicator(min_period=min_period, min_period_ticks=min_period_ticks, standard_deviations=standard_deviations, threads=threads)
+        self.rsi = RelativeStrengthIndexIndicator(min_period=min_period, min_period_ticks=min_period_ticks, lower=rsi_lower, upper=rsi_upper, threads=threads)
+        self.so = StochasticOscillatorIndicator(min_period=min_period, min_period_ticks=min_period_ticks, lower=so_lower, upper=so_upper, threads=threads)
 
     def get_weight(self, security: DataFile, end_date: datetime) -> None | float:
-        bb = self.bb.indication(security=security, end_date=end_date)
-        rsi = self.rsi.indication(security=security, end_date=end_date)
-        so = self.so.indication(security=security, end_date=end_date)
+        return self.get_weight_at(security, TickView.of(security).position(end_date))
+
+    def get_weight_at(self, security: DataFile, i: int) -> None | float:
+        bb = self.bb.indication_at(security=security, i=i)
+        rsi = self.rsi.indication_at(security=security, i=i)
+        so = self.so.indication_at(security=security, i=i)
         count_sell = [bb, rsi, so].count(Indication.SELL)
         count_buy = [bb, rsi, so].count(Indication.BUY)
         if 3 <= count_buy and count_sell == 0:
@@ -30,22 +49,48 @@ class CombinationStrategy(BaseStrategy):
         else:
             return None
 
+    def tick_kernel(self, security: DataFile) -> tuple:
+        view = TickView.of(security)
+        starts_bb = view.starts(self.bb.timedelta_min_period, self.bb.min_period_ticks)
+        starts_rsi = view.starts(self.rsi.timedelta_min_period, self.rsi.min_period_ticks)
+        starts_so = view.starts(self.so.timedelta_min_period, self.so.min_period_ticks)
+        bb = (starts_bb, float(self.bb.standard_deviations))
+        rsi = (starts_rsi, float(self.rsi.lower), float(self.rsi.upper))
+        so = (starts_so, float(self.so.lower), float(self.so.upper))
+        return _tick_weight, (view.mid, bb, rsi, so, float(self.invest))
+
     def get_weights(self, security: DataFile) -> pd.Series:
         start_time = datetime.now()
         print(f"Calculate CombinationStrategy at <{start_time}>")
 
-        df = self.bb.series_indication(security=security).to_frame("bb")
-        df["rsi"] = self.rsi.series_indication(security=security)
-        df["so"] = self.so.series_indication(security=security)
-        combine_strat = df.apply(
-            lambda x: self.invest
-            if 2 <= x.to_list().count(Indication.BUY) and x.to_list().count(Indication.SELL) == 0
-            else 0
-            if 3 <= x.to_list().count(Indication.SELL) and x.to_list().count(Indication.BUY) == 0
-            else None,
-            axis="columns",
-        )
+        combine_strat = self.combine(security, self.evaluate(security, threads=self.threads))
 
         end_date = datetime.now()
         print(f"End CombinationStrategy calculation at <{end_date}> within {end_date - start_time}")
         return combine_strat
+
+    def nodes(self, graph: IndicatorGraph) -> dict[str, Node]:
+        return {"bb": self.bb.signal_node(graph), "rsi": self.rsi.signal_node(graph), "so": self.so.signal_node(graph)}
+
+    def combine(self, security: DataFile, values: dict[str, np.ndarray]) -> pd.Series:
+        # the weights take 2 buy but 3 sell votes
+        return pd.Series(SignalCombiner.vote([values["bb"], values["rsi"], values["so"]], self.invest, min_buy=2, min_sell=3), index=security.index)
+
+
+@jit(nopython=True, nogil=True)
+def _tick_weight(i: int, weights: np.ndarray, state: tuple) -> float:
+    mid, bb, rsi, so, invest = state
+    signals = (
+        bollinger_at(mid, bb[0], i, bb[1]),
+        rsi_at(mid, rsi[0], i, rsi[1], rsi[2]),
+        stochastic_at(mid, so[0], i, so[1], so[2]),
+    )
+    count_sell, count_buy = 0, 0
+    for signal in signals:
+        count_sell += signal == SELL
+        count_buy += signal == BUY
+    if 3 <= count_buy and count_sell == 0:
+        return invest
+    elif 2 <= count_sell and count_buy == 0:
+        return 0.0
+    return np.nan
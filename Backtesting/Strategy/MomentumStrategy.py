@@ -1,23 +1,31 @@
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
+from numba import jit
 
 from DataDownload.DataFile import DataFile
 from . import BaseStrategy
+from .SignalCombiner import SignalCombiner
 from ..Indicator import StochasticOscillatorIndicator, Indication
+from ..Indicator.IndicatorGraph import IndicatorGraph, Node
+from ..Indicator.TickKernels import BUY, SELL, stochastic_at
+from ..Indicator.TickView import TickView
 
 
 class MomentumStrategy(BaseStrategy):
-    def __init__(self, invest: float = 1.0, threads: int = 1):
+    def __init__(self, invest: float = 1.0, threads: int = 1, min_period: relativedelta = relativedelta(hours=1), min_period_ticks: int = 200, lower: float = 20, upper: float = 80):
         self.invest = invest
-        min_period = relativedelta(hours=1)
-        min_period_ticks = 200
+        self.threads = threads
 
-        self.so_indicator = StochasticOscillatorIndicator(min_period=min_period, min_period_ticks=min_period_ticks, lower=20, upper=80, threads=threads)
+        self.so_indicator = StochasticOscillatorIndicator(min_period=min_period, min_period_ticks=min_period_ticks, lower=lower, upper=upper, threads=threads)
 
     def get_weight(self, security: DataFile, end_date: datetime) -> None | float:
-        soi = self.so_indicator.indication(security, end_date)
+        return self.get_weight_at(security, TickView.of(security).position(end_date))
+
+    def get_weight_at(self, security: DataFile, i: int) -> None | float:
+        soi = self.so_indicator.indication_at(security, i)
 
         if soi == Indication.BUY:
             return self.invest
@@ -26,13 +34,34 @@ class MomentumStrategy(BaseStrategy):
         else:
             return None
 
+    def tick_kernel(self, security: DataFile) -> tuple:
+        so = self.so_indicator
+        starts = TickView.of(security).starts(so.timedelta_min_period, so.min_period_ticks)
+        return _tick_weight, (TickView.of(security).mid, starts, float(so.lower), float(so.upper), float(self.invest))
+
     def get_weights(self, security: DataFile) -> pd.Series:
         start_time = datetime.now()
         print(f"Calculate MomentumStrategy at <{start_time}>")
 
-        soi = self.so_indicator.series_indication(security)
-        soi = soi.apply(lambda x: self.invest if x == Indication.BUY else 0 if x == Indication.SELL else None)
+        soi = self.combine(security, self.evaluate(security, threads=self.threads))
 
         end_date = datetime.now()
         print(f"End calculation at <{end_date}> within {end_date - start_time}")
         return soi
+
+    def nodes(self, graph: IndicatorGraph) -> dict[str, Node]:
+        return {"so": self.so_indicator.signal_node(graph)}
+
+    def combine(self, security: DataFile, values: dict[str, np.ndarray]) -> pd.Series:
+        return pd.Series(SignalCombiner.signal(values["so"], self.invest), index=security.index, name=security.mid.name)
+
+
+@jit(nopython=True, nogil=True)
+def _tick_weight(i: int, weights: np.ndarray, state: tuple) -> float:
+    mid, starts, lower, upper, invest = state
+    soi = stochastic_at(mid, starts, i, lower, upper)
+    if soi == BUY:
+        return invest
+    elif soi == SELL:
+        return 0.0
+    return np.nan
@@ -0,0 +1,36 @@
+import numpy as np
+
+from Backtesting.Indicator import Indication
+
+
+class SignalCombiner:
+    # float weights per tick, invest for buy, 0 for sell and NaN where the weight does not change
+
+    @staticmethod
+    def weights(buy: np.ndarray, sell: np.ndarray, invest: float) -> np.ndarray:
+        # sell is checked first, like the if / elif chains of get_weight
+        return np.select([sell, buy], [0.0, invest], np.nan)
+
+    @staticmethod
+    def signal(signal: np.ndarray, invest: float) -> np.ndarray:
+        return SignalCombiner.weights(signal == Indication.BUY.value, signal == Indication.SELL.value, invest)
+
+    @staticmethod
+    def vote(signals: list[np.ndarray], invest: float, min_buy: int, min_sell: int, where: None | np.ndarray = None) -> np.ndarray:
+        # buy with at least min_buy buy and no sell signals, sell with at least min_sell sell and no buy signals
+        signals = np.stack(signals)
+        count_buy = np.count_nonzero(signals == Indication.BUY.value, axis=0)
+        count_sell = np.count_nonzero(signals == Indication.SELL.value, axis=0)
+        buy = (min_buy <= count_buy) & (count_sell == 0)
+        sell = (min_sell <= count_sell) & (count_buy == 0)
+        if where is not None:
+            buy, sell = buy & where, sell & where
+        return SignalCombiner.weights(buy, sell, invest)
+
+    @staticmethod
+    def cross(fast: np.ndarray, slow: np.ndarray, invest: float, price: None | np.ndarray = None, trend: None | np.ndarray = None) -> np.ndarray:
+        # buy while fast is above slow (and price above trend), sell while it is below, NaN comparisons give no change
+        buy, sell = slow < fast, fast < slow
+        if price is not None:
+            buy, sell = buy & (trend < price), sell & (price < trend)
+        return SignalCombiner.weights(buy, sell, invest)
@@ -1,26 +1,44 @@
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
+from numba import jit
 
 from DataDownload.DataFile import DataFile
 from . import BaseStrategy
+from .SignalCombiner import SignalCombiner
 from ..Indicator import SimpleMovingAverageIndicator, ExponentialMovingAverageIndicator
+from ..Indicator.IndicatorGraph import IndicatorGraph, Node
+from ..Indicator.TickKernels import ema_at, sma_at
+from ..Indicator.TickView import TickView
 
 
 class TrendStrategy(BaseStrategy):
-    def __init__(self, invest: float = 1.0, threads: int = 1):
+    def __init__(
+        self,
+        invest: float = 1.0,
+        threads: int = 1,
+        fast_period: relativedelta = relativedelta(hours=1),
+        fast_period_ticks: int = 200,
+        slow_period: relativedelta = relativedelta(hours=6),
+        slow_period_ticks: int = 1200,
+    ):
         self.invest = invest
+        self.threads = threads
 
-        self.sma_1h = SimpleMovingAverageIndicator(min_period_ticks=200, min_period=relativedelta(hours=1))
-        self.sma_6h = SimpleMovingAverageIndicator(min_period_ticks=1200, min_period=relativedelta(hours=6))
-        self.ema_1h = ExponentialMovingAverageIndicator(min_period_ticks=200, min_period=relativedelta(hours=1), threads=threads)
+        self.sma_1h = SimpleMovingAverageIndicator(min_period_ticks=fast_period_ticks, min_period=fast_period)
+        self.sma_6h = SimpleMovingAverageIndicator(min_period_ticks=slow_period_ticks, min_period=slow_period)
+        self.ema_1h = ExponentialMovingAverageIndicator(min_period_ticks=fast_period_ticks, min_period=fast_period, threads=threads)
 
     def get_weight(self, security: DataFile, end_date: datetime) -> None | float:
-        sma_1 = self.sma_1h.indication(security, end_date)
-        sma_6 = self.sma_6h.indication(security, end_date)
-        ema_1 = self.ema_1h.indication(security, end_date)
-        last_price = security.mid.loc[end_date]
+        return self.get_weight_at(security, TickView.of(security).position(end_date))
+
+    def get_weight_at(self, security: DataFile, i: int) -> None | float:
+        sma_1 = self.sma_1h.indication_at(security, i)
+        sma_6 = self.sma_6h.indication_at(security, i)
+        ema_1 = self.ema_1h.indication_at(security, i)
+        last_price = TickView.of(security).mid[i]
         if sma_1 < sma_6 and last_price < ema_1:
             sma = 0
         elif sma_6 < sma_1 and ema_1 < last_price:
@@ -30,20 +48,38 @@ class TrendStrategy(BaseStrategy):
 
         return sma
 
+    def tick_kernel(self, security: DataFile) -> tuple:
+        view = TickView.of(security)
+        starts_1 = view.starts(self.sma_1h.timedelta_min_period, self.sma_1h.min_period_ticks)
+        starts_6 = view.starts(self.sma_6h.timedelta_min_period, self.sma_6h.min_period_ticks)
+        starts_ema = view.starts(self.ema_1h.timedelta_min_period, self.ema_1h.min_period_ticks)
+        return _tick_weight, (view.mid, starts_1, starts_6, starts_ema, float(self.invest))
+
     def get_weights(self, security: DataFile) -> pd.Series:
         start_time = datetime.now()
         print(f"Calculate TrendStrategy at <{start_time}>")
 
-        df = security.mid.to_frame("price")
-        df["sma_1"] = self.sma_1h.series_indication(security)
-        df["sma_6"] = self.sma_6h.series_indication(security)
-        df["ema_1"] = self.ema_1h.series_indication(security)
-
-        trend_strat = df.apply(
-            lambda x: 0 if x.sma_1 < x.sma_6 and x.price < x.ema_1 else self.invest if x.sma_6 < x.sma_1 and x.ema_1 < x.price else None,
-            axis="columns",
-        )
+        trend_strat = self.combine(security, self.evaluate(security, threads=self.threads))
 
         end_date = datetime.now()
         print(f"End calculation at <{end_date}> within {end_date - start_time}")
         return trend_strat
+
+    def nodes(self, graph: IndicatorGraph) -> dict[str, Node]:
+        return {"price": graph.column("mid"), "sma_1": self.sma_1h.node(graph), "sma_6": self.sma_6h.node(graph), "ema_1": self.ema_1h.node(graph)}
+
+    def combine(self, security: DataFile, values: dict[str, np.ndarray]) -> pd.Series:
+        return pd.Series(SignalCombiner.cross(values["sma_1"], values["sma_6"], self.invest, price=values["price"], trend=values["ema_1"]), index=security.index)
+
+
+@jit(nopython=True, nogil=True)
+def _tick_weight(i: int, weights: np.ndarray, state: tuple) -> float:
+    mid, starts_1, starts_6, starts_ema, invest = state
+    sma_1 = sma_at(mid, starts_1, i)
+    sma_6 = sma_at(mid, starts_6, i)
+    ema_1 = ema_at(mid, starts_ema, i)
+    if sma_1 < sma_6 and mid[i] < ema_1:
+        return 0.0
+    elif sma_6 < sma_1 and ema_1 < mid[i]:
+        return invest
+    return np.nan
@@ -1,29 +1,46 @@
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
+from numba import jit
 
 from DataDownload.DataFile import DataFile
 from . import BaseStrategy
+from .SignalCombiner import SignalCombiner
 from ..Indicator import SimpleAverageTrueRangeIndicator, BollingerBandsIndicator, KeltnerChannelsIndicator, Indication
+from ..Indicator.IndicatorGraph import IndicatorGraph, Node
+from ..Indicator.TickKernels import BUY, SELL, atr_at, bollinger_at, keltner_at
+from ..Indicator.TickView import TickView
 
 
 class VolatilityStrategy(BaseStrategy):
-    def __init__(self, invest: float = 1.0, threads: int = 1):
+    def __init__(
+        self,
+        invest: float = 1.0,
+        threads: int = 1,
+        min_period: relativedelta = relativedelta(hours=1),
+        min_period_ticks: int = 200,
+        n: int = 14,
+        standard_deviations: float = 2,
+        times_art: float = 2,
+    ):
         self.invest = invest
-        min_period = relativedelta(hours=1)
-        min_period_ticks = 200
+        self.threads = threads
 
-        self.atr_1h = SimpleAverageTrueRangeIndicator(min_period=min_period, min_period_ticks=min_period_ticks, threads=threads)
-        self.atr_6h = SimpleAverageTrueRangeIndicator(min_period=6 * min_period, min_period_ticks=6 * min_period_ticks, threads=threads)
-        self.bb = BollingerBandsIndicator(min_period=min_period, min_period_ticks=min_period_ticks, threads=threads)
-        self.kc = KeltnerChannelsIndicator(min_period=min_period, min_period_ticks=min_period_ticks, threads=threads)
+        self.atr_1h = SimpleAverageTrueRangeIndicator(min_period=min_period, min_period_ticks=min_period_ticks, n=n, threads=threads)
+        self.atr_6h = SimpleAverageTrueRangeIndicator(min_period=6 * min_period, min_period_ticks=6 * min_period_ticks, n=n, threads=threads)
+        self.bb = BollingerBandsIndicator(min_period=min_period, min_period_ticks=min_period_ticks, standard_deviations=standard_deviations, threads=threads)
+        self.kc = KeltnerChannelsIndicator(min_period=min_period, min_period_ticks=min_period_ticks, n=n, times_art=times_art, threads=threads)
 
     def get_weight(self, security: DataFile, end_date: datetime) -> None | float:
-        atr_1h = self.atr_1h.indication(security=security, end_date=end_date)
-        atr_6h = self.atr_1h.indication(security=security, end_date=end_date)
-        bb = self.bb.indication(security=security, end_date=end_date)
-        kc = self.kc.indication(security=security, end_date=end_date)
+        return self.get_weight_at(security, TickView.of(security).position(end_date))
+
+    def get_weight_at(self, security: DataFile, i: int) -> None | float:
+        atr_1h = self.atr_1h.indication_at(security=security, i=i)
+        atr_6h = self.atr_1h.indication_at(security=security, i=i)
+        bb = self.bb.indication_at(security=security, i=i)
+        kc = self.kc.indication_at(security=security, i=i)
 
         count_sell = [bb, kc].count(Indication.SELL)
         count_buy = [bb, kc].count(Indication.BUY)
@@ -34,24 +51,49 @@ class VolatilityStrategy(BaseStrategy):
         else:
             return None
 
+    def tick_kernel(self, security: DataFile) -> tuple:
+        view = TickView.of(security)
+        starts_atr = view.starts(self.atr_1h.timedelta_min_period, self.atr_1h.min_period_ticks)
+        starts_bb = view.starts(self.bb.timedelta_min_period, self.bb.min_period_ticks)
+        starts_kc = view.starts(self.kc.timedelta_min_period, self.kc.min_period_ticks)
+        atr = (starts_atr, int(self.atr_1h.n))
+        bb = (starts_bb, float(self.bb.standard_deviations))
+        kc = (starts_kc, int(self.kc.n), float(self.kc.times_art))
+        return _tick_weight, (view.mid, atr, bb, kc, float(self.invest))
+
     def get_weights(self, security: DataFile) -> pd.Series:
         start_time = datetime.now()
         print(f"Calculate VolatilityStrategy at <{start_time}>")
 
-        df = self.atr_1h.series_indication(security=security).to_frame("atr_1h")
-        df["atr_6h"] = self.atr_1h.series_indication(security=security)
-        df["bb"] = self.bb.series_indication(security=security)
-        df["kc"] = self.kc.series_indication(security=security, atr=df["atr_1h"])
-
-        vol = df.apply(
-            lambda x: self.invest
-            if 1 <= [x.bb, x.kc].count(Indication.BUY) and 0 == [x.bb, x.kc].count(Indication.SELL) and x.atr_6h < x.atr_1h
-            else 0
-            if 0 == [x.bb, x.kc].count(Indication.BUY) and 1 <= [x.bb, x.kc].count(Indication.SELL) and x.atr_6h < x.atr_1h
-            else None,
-            axis="columns",
-        )
+        vol = self.combine(security, self.evaluate(security, threads=self.threads))
 
         end_date = datetime.now()
         print(f"End calculation at <{end_date}> within {end_date - start_time}")
         return vol
+
+    def nodes(self, graph: IndicatorGraph) -> dict[str, Node]:
+        atr_1h = self.atr_1h.node(graph)
+        # atr_6h reads atr_1h like get_weight does
+        return {"atr_1h": atr_1h, "atr_6h": atr_1h, "bb": self.bb.signal_node(graph), "kc": self.kc.signal_node(graph, atr=atr_1h)}
+
+    def combine(self, security: DataFile, values: dict[str, np.ndarray]) -> pd.Series:
+        rising = values["atr_6h"] < values["atr_1h"]
+        return pd.Series(SignalCombiner.vote([values["bb"], values["kc"]], self.invest, min_buy=1, min_sell=1, where=rising), index=security.index)
+
+
+@jit(nopython=True, nogil=True)
+def _tick_weight(i: int, weights: np.ndarray, state: tuple) -> float:
+    mid, atr, bb, kc, invest = state
+    # atr_6h reads atr_1h like get_weight_at does
+    atr_1h = atr_at(mid, atr[0], i, atr[1])
+    atr_6h = atr_1h
+    signals = (bollinger_at(mid, bb[0], i, bb[1]), keltner_at(mid, kc[0], i, kc[1], kc[2]))
+    count_sell, count_buy = 0, 0
+    for signal in signals:
+        count_sell += signal == SELL
+        count_buy += signal == BUY
+    if 2 <= count_buy and 0 == count_sell and atr_6h < atr_1h:
+        return invest
+    elif 0 == count_buy and 2 <= count_sell and atr_6h < atr_1h:
+        return 0.0
+    return np.nan
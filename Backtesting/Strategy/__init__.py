@@ -1,4 +1,5 @@
 from .BaseStrategy import BaseStrategy
+from .SignalCombiner import SignalCombiner
 from .CombinationStrategy import CombinationStrategy
 from .MomentumStrategy import MomentumStrategy
 from .TrendStrategy import TrendStrategy
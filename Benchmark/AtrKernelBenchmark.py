@@ -0,0 +1,38 @@
+import time
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from Backtesting.Indicator import SimpleAverageTrueRangeIndicator
+from tests.Legacy import legacy_atr
+from tests.SyntheticData import synthetic_datafile
+
+
+def benchmark(num_days: int = 5, ticks_per_day: int = 20_000) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    # same as VolatilityStrategy atr_1h / atr_6h, plus a tick window wider than the time window
+    indicators = {
+        "atr_1h": SimpleAverageTrueRangeIndicator(min_period=relativedelta(hours=1), min_period_ticks=200),
+        "atr_6h": SimpleAverageTrueRangeIndicator(min_period=relativedelta(hours=6), min_period_ticks=1200),
+        "atr_5min_2000": SimpleAverageTrueRangeIndicator(min_period=relativedelta(minutes=5), min_period_ticks=2000, n=9),
+    }
+    SimpleAverageTrueRangeIndicator(min_period=relativedelta(hours=1), min_period_ticks=200).series_indication(security.strip(security.index[1000]))
+
+    results = {}
+    for name, indicator in indicators.items():
+        start_time = time.perf_counter()
+        legacy = legacy_atr(indicator, security)
+        legacy_seconds = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        kernel = indicator.series_indication(security)
+        kernel_seconds = time.perf_counter() - start_time
+        results[name] = dict(
+            legacy_ticks_per_second=len(security.mid) / legacy_seconds,
+            kernel_ticks_per_second=len(security.mid) / kernel_seconds,
+            speedup=legacy_seconds / kernel_seconds,
+        )
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -0,0 +1,68 @@
+import time
+from datetime import date
+
+import pandas as pd
+
+from Backtesting.AggBacktestResult import AggBacktestResult
+from Backtesting.Backtesting import Backtesting
+from Backtesting.BacktestScheduler import BacktestScheduler, DataSource
+from Backtesting.Strategy import CombinationStrategy, GoldenCrossStrategy, MomentumStrategy, TrendStrategy, VolatilityStrategy
+from DataDownload.DataFile import DataFile
+from tests.SyntheticData import synthetic_datafile
+
+NUM_DAYS: int = 3
+TICKS_PER_DAY: int = 20_000
+
+
+class SyntheticSource(DataSource):
+    # synthetic DataFiles instead of a data store, seeded by the ticker
+    def update(self, ticker: str, start_date: date, end_date: date) -> None:
+        pass
+
+    def datafile(self, ticker: str, start_date: date, end_date: date, update: bool = True) -> DataFile:
+        return synthetic_datafile(num_days=NUM_DAYS, ticks_per_day=TICKS_PER_DAY, seed=int(ticker[-1]), ticker=ticker)
+
+
+def serial(source: DataSource, datasets: list, strategies: list) -> dict:
+    # the previous loop of main.py, one Backtesting per strategy
+    aggregated = {}
+    for tic, start_dt, sta_at, end_dt in datasets:
+        data = source.datafile(tic, start_dt, end_dt)
+        results = [Backtesting(security=data, strategy=strat, start_at=sta_at).result for strat in strategies]
+        aggregated[tic] = AggBacktestResult(results, data_file=data, with_ts=False).info
+    return aggregated
+
+
+def scheduled(scheduler: BacktestScheduler, datasets: list, strategies: list) -> dict:
+    aggregated, results = {}, {}
+    for (tic, start_dt, sta_at, end_dt), task_results, mid, complete in scheduler.run(datasets, strategies):
+        results.setdefault(tic, []).extend(task_results)
+        if complete:
+            ordered = sorted(results[tic], key=lambda result: [strat.__class__.__name__ for strat in strategies].index(result.strategy_name))
+            aggregated[tic] = AggBacktestResult(ordered, benchmark_mid=mid, with_ts=False).info
+    return aggregated
+
+
+def benchmark(num_tickers: int = 4) -> pd.DataFrame:
+    source = SyntheticSource()
+    datasets = [(f"SYNTH{i}", date(2023, 1, 2), TICKS_PER_DAY, date(2023, 1, 4)) for i in range(num_tickers)]
+    strategies = [CombinationStrategy(), MomentumStrategy(), TrendStrategy(), VolatilityStrategy(), GoldenCrossStrategy()]
+
+    start_time = time.perf_counter()
+    expected = serial(source, datasets, strategies)
+    results = {"serial": dict(seconds=time.perf_counter() - start_time)}
+    nbytes = source.datafile("SYNTH0", None, None).nbytes
+    # with a single dataset its strategies are split over the processes and attach to one SharedMemoryDataFile
+    for num_datasets, processes, memory_budget in [(num_tickers, 1, None), (num_tickers, 4, None), (num_tickers, 4, 2 * nbytes), (1, 4, None)]:
+        scheduler = BacktestScheduler(source, processes=processes, memory_budget=memory_budget)
+        start_time = time.perf_counter()
+        aggregated = scheduled(scheduler, datasets[:num_datasets], strategies)
+        seconds = time.perf_counter() - start_time
+        for tic, info in aggregated.items():
+            pd.testing.assert_frame_equal(info, expected[tic])
+        results[f"scheduler, {num_datasets} datasets, {processes} processes, budget {memory_budget}"] = dict(seconds=seconds, tasks=len(scheduler.tasks(datasets[:num_datasets], strategies)))
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string())
@@ -0,0 +1,63 @@
+import lzma
+import struct
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from DataDownload.DataDownloader import DataDownloader
+
+
+def synthetic_bi5(num_ticks: int, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    records = np.empty(num_ticks, dtype=DataDownloader.FILE_DTYPE)
+    records["date"] = np.sort(rng.integers(0, 3_600_000, num_ticks))
+    records["bid"] = 110_000 + np.cumsum(rng.integers(-3, 4, num_ticks))
+    records["ask"] = records["bid"] + rng.integers(1, 20, num_ticks)
+    records["ask_vol"] = rng.random(num_ticks).astype(np.float32) * 5
+    records["bid_vol"] = rng.random(num_ticks).astype(np.float32) * 5
+    return lzma.compress(records.tobytes(), format=lzma.FORMAT_ALONE)
+
+
+def legacy_decode(rawdata: bytes, timestamp: datetime) -> pd.DataFrame:
+    data = []
+    decompresseddata = lzma.LZMADecompressor(lzma.FORMAT_AUTO, None, None).decompress(rawdata)
+    for i in range(0, int(len(decompresseddata) / 20)):
+        data.append(struct.unpack(DataDownloader.FILE_FORMAT, decompresseddata[i * 20 : (i + 1) * 20]))
+    df = pd.DataFrame(data=data, columns=["date", "ask", "bid", "ask_vol", "bid_vol"])
+    df["date"] = df["date"].apply(lambda milsec: timestamp + relativedelta(microseconds=milsec * 1000))
+    df.set_index("date", inplace=True)
+    df["ask"] = df["ask"].apply(lambda quote: quote / 1000)
+    df["bid"] = df["bid"].apply(lambda quote: quote / 1000)
+    df["mid"] = (df["ask"] + df["bid"]) / 2
+    df["spread"] = df["ask"] - df["bid"]
+    return df
+
+
+def vectorized_decode(rawdata: bytes, timestamp: datetime) -> pd.DataFrame:
+    decompresseddata = lzma.LZMADecompressor(lzma.FORMAT_AUTO, None, None).decompress(rawdata)
+    return DataDownloader.decode_bi5(decompresseddata, timestamp)
+
+
+def benchmark(num_hours: int = 24, ticks_per_hour: int = 5_000) -> pd.DataFrame:
+    timestamp = pd.Timestamp(2023, 5, 2)
+    payloads = [(synthetic_bi5(ticks_per_hour, seed=h), timestamp + relativedelta(hour=h)) for h in range(num_hours)]
+    results = {}
+    for name, decoder in (("legacy", legacy_decode), ("vectorized", vectorized_decode)):
+        start_time = time.perf_counter()
+        dfs = [decoder(raw, ts) for raw, ts in payloads]
+        elapsed = time.perf_counter() - start_time
+        results[name] = dict(seconds=elapsed, ticks_per_second=num_hours * ticks_per_hour / elapsed, df=pd.concat(dfs))
+
+    legacy, vectorized = results["legacy"]["df"], results["vectorized"]["df"]
+    pd.testing.assert_index_equal(legacy.index.as_unit("ns"), vectorized.index, check_names=False)
+    pd.testing.assert_frame_equal(legacy.reset_index(drop=True), vectorized.reset_index(drop=True))
+    return pd.DataFrame({name: {k: v for k, v in res.items() if k != "df"} for name, res in results.items()}).transpose()
+
+
+if __name__ == "__main__":
+    res = benchmark()
+    print(res)
+    print(f"Speedup: {res.loc['legacy', 'seconds'] / res.loc['vectorized', 'seconds']:,.1f}x")
@@ -0,0 +1,53 @@
+import time
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from Backtesting.Indicator import BollingerBandsIndicator
+from Backtesting.Indicator.IndicatorGraph import IndicatorGraph
+from DataDownload.DataFile import DataFile
+from tests.Legacy import legacy_std
+from tests.SyntheticData import synthetic_datafile
+
+
+def kernel_std(indicator: BollingerBandsIndicator, security: DataFile) -> pd.Series:
+    return pd.Series(IndicatorGraph.compute(security, indicator.std_node), index=security.index)
+
+
+def band_side(indicator: BollingerBandsIndicator, security: DataFile, std: pd.Series) -> np.ndarray:
+    sma = indicator.sma.series_indication(security)
+    lower_band, upper_band = sma - std * indicator.standard_deviations, sma + std * indicator.standard_deviations
+    return np.select([security.mid <= lower_band, upper_band <= security.mid], [-1, 1], 0)
+
+
+def benchmark(num_days: int = 5, ticks_per_day: int = 20_000) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    indicators = {
+        "bb_1h": BollingerBandsIndicator(min_period=relativedelta(hours=1), min_period_ticks=200),
+        "bb_6h": BollingerBandsIndicator(min_period=relativedelta(hours=6), min_period_ticks=1200),
+        "bb_5min_2000": BollingerBandsIndicator(min_period=relativedelta(minutes=5), min_period_ticks=2000),
+    }
+    kernel_std(indicators["bb_1h"], security.strip(security.index[1000]))
+
+    results = {}
+    for name, indicator in indicators.items():
+        start_time = time.perf_counter()
+        legacy = legacy_std(indicator, security)
+        legacy_seconds = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        kernel = kernel_std(indicator, security)
+        kernel_seconds = time.perf_counter() - start_time
+        mismatches = (band_side(indicator, security, kernel) != band_side(indicator, security, legacy)).sum()
+        results[name] = dict(
+            legacy_ticks_per_second=len(security.mid) / legacy_seconds,
+            kernel_ticks_per_second=len(security.mid) / kernel_seconds,
+            speedup=legacy_seconds / kernel_seconds,
+            max_rel_error=((kernel - legacy).abs() / legacy.abs()).max(),
+            indication_mismatches=mismatches,
+        )
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark())
@@ -0,0 +1,38 @@
+import time
+
+import pandas as pd
+
+from Backtesting.Strategy import CombinationStrategy, GoldenCrossStrategy, TrendStrategy, VolatilityStrategy
+from tests.Legacy import legacy_combination, legacy_golden_cross, legacy_trend, legacy_volatility
+from tests.SyntheticData import synthetic_datafile
+
+
+def benchmark(num_days: int = 3, ticks_per_day: int = 20_000) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    num_ticks = len(security.index)
+    strategies = {
+        "CombinationStrategy": (CombinationStrategy(), legacy_combination),
+        "VolatilityStrategy": (VolatilityStrategy(), legacy_volatility),
+        "TrendStrategy": (TrendStrategy(), legacy_trend),
+        "GoldenCrossStrategy": (GoldenCrossStrategy(), legacy_golden_cross),
+    }
+    results = {}
+    for name, (strategy, legacy_combine) in strategies.items():
+        # the indicator values are shared, only the combination is timed
+        values = strategy.evaluate(security)
+        start_time = time.perf_counter()
+        legacy = legacy_combine(strategy, security, values)
+        legacy_seconds = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        weights = strategy.combine(security, values)
+        combiner_seconds = time.perf_counter() - start_time
+        results[name] = dict(
+            legacy_ticks_per_second=num_ticks / legacy_seconds,
+            combiner_ticks_per_second=num_ticks / combiner_seconds,
+            speedup=legacy_seconds / combiner_seconds,
+        )
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string())
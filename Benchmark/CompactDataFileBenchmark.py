@@ -0,0 +1,68 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from Backtesting.Backtesting import Backtesting
+from Backtesting.Strategy import MomentumStrategy
+from DataDownload.CompactDataFile import CompactDataFile
+from DataDownload.DataFile import DataFile
+from tests.SyntheticData import synthetic_ts
+
+DATA_FILE_COLUMNS: list[str] = ["ask", "bid", "mid", "spread", "pct_returns", "pct_sell_costs"]
+BACKTEST_COLUMNS: list[str] = ["mid", "pct_returns", "pct_sell_costs"]
+
+
+def retained_bytes(build) -> tuple[object, int]:
+    tracemalloc.start()
+    obj = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def touch(data_file: DataFile, names: list[str]) -> DataFile:
+    for name in names:
+        getattr(data_file, name)
+    return data_file
+
+
+def benchmark(num_days: int = 20, ticks_per_day: int = 50_000) -> pd.DataFrame:
+    source = synthetic_ts(num_days=num_days, ticks_per_day=ticks_per_day, start="2023-01-03")
+    source = source.iloc[1:]
+    num_ticks = len(source)
+
+    data_file, data_file_bytes = retained_bytes(lambda: DataFile(ticker="SYNTH", df_ts=source.copy(deep=True)))
+    compact, compact_bytes = retained_bytes(lambda: CompactDataFile.from_df(ticker="SYNTH", df_ts=source))
+    _, backtest_bytes = retained_bytes(lambda: touch(compact, BACKTEST_COLUMNS))
+    _, derived_bytes = retained_bytes(lambda: touch(compact, DATA_FILE_COLUMNS))
+
+    for name in DATA_FILE_COLUMNS:
+        if not np.array_equal(getattr(compact, name).to_numpy(), getattr(data_file, name).to_numpy(), equal_nan=True):
+            raise AssertionError(f"{name} differs between DataFile and CompactDataFile")
+    end_date = source.index[num_ticks // 2]
+    stripped, expected = compact.between(source.index[1000], end_date), data_file.strip(end_date).pct_returns.iloc[1000:]
+    if not np.array_equal(stripped.pct_returns.to_numpy(), expected.to_numpy()):
+        raise AssertionError("returns of a sliced CompactDataFile differ")
+    strategy = MomentumStrategy()
+    pd.testing.assert_series_equal(
+        Backtesting(compact.slice(0, 100_000), strategy, start_at=1000).performance_rel,
+        Backtesting(data_file.strip(source.index[99_999]), strategy, start_at=1000).performance_rel,
+        check_names=False,
+        check_index_type=False,
+    )
+
+    return pd.DataFrame(
+        {
+            "DataFile": dict(bytes_per_tick=data_file_bytes / num_ticks),
+            "CompactDataFile": dict(bytes_per_tick=compact_bytes / num_ticks),
+            "CompactDataFile+backtest columns": dict(bytes_per_tick=(compact_bytes + backtest_bytes) / num_ticks),
+            "CompactDataFile+all columns": dict(bytes_per_tick=(compact_bytes + backtest_bytes + derived_bytes) / num_ticks),
+        }
+    ).transpose()
+
+
+if __name__ == "__main__":
+    res = benchmark()
+    print(res)
+    print(f"Memory per tick reduced {res.loc['DataFile', 'bytes_per_tick'] / res.loc['CompactDataFile', 'bytes_per_tick']:,.1f}x without cached columns")
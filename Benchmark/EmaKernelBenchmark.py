@@ -0,0 +1,42 @@
+import time
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from Backtesting.Indicator import ExponentialMovingAverageIndicator
+from tests.Legacy import legacy_ema
+from tests.SyntheticData import synthetic_datafile
+
+
+def timed(func) -> tuple[pd.Series, float]:
+    start_time = time.perf_counter()
+    res = func()
+    return res, time.perf_counter() - start_time
+
+
+def benchmark(num_days: int = 5, ticks_per_day: int = 20_000) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    num_ticks = len(security.mid)
+    min_period, min_period_ticks = relativedelta(hours=1), 200
+    for mode in ExponentialMovingAverageIndicator.MODES:
+        ExponentialMovingAverageIndicator(min_period=min_period, min_period_ticks=min_period_ticks, mode=mode).series_indication(security.strip(security.index[1000]))
+
+    results = {}
+    # TrendStrategy ema_1h, VolatilityStrategy keltner channel and a tick window wider than the time window
+    for name, (period, ticks) in {"ema_1h": (min_period, min_period_ticks), "ema_2h": (relativedelta(hours=2), 400), "ema_5min_2000": (relativedelta(minutes=5), 2000)}.items():
+        indicator = ExponentialMovingAverageIndicator(min_period=period, min_period_ticks=ticks)
+        legacy, legacy_seconds = timed(lambda: legacy_ema(indicator, security))
+        kernel, kernel_seconds = timed(lambda: indicator.series_indication(security))
+        results[f"compat {name}"] = dict(legacy_ticks_per_second=num_ticks / legacy_seconds, kernel_ticks_per_second=num_ticks / kernel_seconds, speedup=legacy_seconds / kernel_seconds)
+
+    # the speedup of the recursive modes is against the legacy ema_1h series
+    legacy_seconds = num_ticks / results["compat ema_1h"]["legacy_ticks_per_second"]
+    for mode in (ExponentialMovingAverageIndicator.SPAN, ExponentialMovingAverageIndicator.TIME):
+        indicator = ExponentialMovingAverageIndicator(min_period=min_period, min_period_ticks=min_period_ticks, mode=mode)
+        kernel, kernel_seconds = timed(lambda: indicator.series_indication(security))
+        results[f"{mode} ema_1h"] = dict(legacy_ticks_per_second=num_ticks / legacy_seconds, kernel_ticks_per_second=num_ticks / kernel_seconds, speedup=legacy_seconds / kernel_seconds)
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string())
@@ -0,0 +1,47 @@
+import tempfile
+import time
+
+import pandas as pd
+
+from Backtesting.Indicator import IndicatorCache
+from Backtesting.Strategy import CombinationStrategy, GoldenCrossStrategy, MomentumStrategy, TrendStrategy, VolatilityStrategy
+from DataDownload.DataFile import DataFile
+from tests.SyntheticData import synthetic_datafile
+
+STRATEGIES: list[type] = [MomentumStrategy, TrendStrategy, GoldenCrossStrategy, CombinationStrategy, VolatilityStrategy]
+
+
+def run_strategies(security: DataFile) -> tuple[dict[str, pd.Series], float]:
+    # fresh strategy objects like every main.py run
+    start_time = time.perf_counter()
+    weights = {strategy.__name__: strategy().get_weights(security) for strategy in STRATEGIES}
+    return weights, time.perf_counter() - start_time
+
+
+def benchmark(num_days: int = 3, ticks_per_day: int = 20_000) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    IndicatorCache.deactivate()
+    expected, uncached_seconds = run_strategies(security)
+    results = {"uncached": dict(seconds=uncached_seconds)}
+
+    with tempfile.TemporaryDirectory() as folder:
+        cache = IndicatorCache(folder=folder).activate()
+        try:
+            for run in ["first run", "second run"]:
+                weights, seconds = run_strategies(security)
+                for name, series in weights.items():
+                    pd.testing.assert_series_equal(series, expected[name])
+                results[f"memory+disk {run}"] = dict(seconds=seconds, **cache.stats)
+            # a new process only finds the disk tier
+            cache = IndicatorCache(folder=folder).activate()
+            weights, seconds = run_strategies(synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day))
+            for name, series in weights.items():
+                pd.testing.assert_series_equal(series, expected[name])
+            results["disk only"] = dict(seconds=seconds, **cache.stats)
+        finally:
+            IndicatorCache.deactivate()
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string())
@@ -0,0 +1,57 @@
+import time
+
+import pandas as pd
+
+from Backtesting.Indicator import IndicatorCache
+from Backtesting.Indicator.IndicatorGraph import IndicatorGraph
+from Backtesting.Strategy import BaseStrategy, CombinationStrategy, GoldenCrossStrategy, MomentumStrategy, TrendStrategy, VolatilityStrategy
+from DataDownload.DataFile import DataFile
+from tests.SyntheticData import synthetic_datafile
+
+
+def legacy_trend(strategy: TrendStrategy, security: DataFile) -> pd.Series:
+    df = security.mid.to_frame("price")
+    df["sma_1"] = strategy.sma_1h.series_indication(security)
+    df["sma_6"] = strategy.sma_6h.series_indication(security)
+    df["ema_1"] = strategy.ema_1h.series_indication(security)
+    return df.apply(
+        lambda x: 0 if x.sma_1 < x.sma_6 and x.price < x.ema_1 else strategy.invest if x.sma_6 < x.sma_1 and x.ema_1 < x.price else None,
+        axis="columns",
+    )
+
+
+def legacy_golden_cross(strategy: GoldenCrossStrategy, security: DataFile) -> pd.Series:
+    df = strategy.sma_1h.series_indication(security).to_frame("sma_1")
+    df["sma_6"] = strategy.sma_6h.series_indication(security)
+    return df.apply(lambda x: 0 if x.sma_1 < x.sma_6 else strategy.invest if x.sma_6 < x.sma_1 else None, axis="columns")
+
+
+def node_count(strategies: list[BaseStrategy]) -> int:
+    graph = IndicatorGraph()
+    outputs = {(i, name): node for i, strategy in enumerate(strategies) for name, node in strategy.nodes(graph).items()}
+    return len(graph._required(outputs))
+
+
+def benchmark(num_days: int = 3, ticks_per_day: int = 20_000) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    IndicatorCache.deactivate()
+    strategies = [MomentumStrategy(), TrendStrategy(), GoldenCrossStrategy(), CombinationStrategy(), VolatilityStrategy()]
+
+    pd.testing.assert_series_equal(strategies[1].get_weights(security), legacy_trend(strategies[1], security), check_names=False)
+    pd.testing.assert_series_equal(strategies[2].get_weights(security), legacy_golden_cross(strategies[2], security), check_names=False)
+
+    start_time = time.perf_counter()
+    expected = [strategy.get_weights(security) for strategy in strategies]
+    results = {"separate graphs": dict(seconds=time.perf_counter() - start_time, nodes=sum(node_count([strategy]) for strategy in strategies))}
+    for threads in [1, 4]:
+        start_time = time.perf_counter()
+        weights = BaseStrategy.strategies_weights(security, strategies, threads=threads)
+        seconds = time.perf_counter() - start_time
+        for series, expected_series in zip(weights, expected):
+            pd.testing.assert_series_equal(series, expected_series, check_names=False)
+        results[f"shared graph, {threads} threads"] = dict(seconds=seconds, nodes=node_count(strategies))
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string())
@@ -0,0 +1,138 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from Backtesting.Backtesting import Backtesting
+from Backtesting.Indicator import (
+    BaseIndicators,
+    BollingerBandsIndicator,
+    ExponentialMovingAverageIndicator,
+    KeltnerChannelsIndicator,
+    RelativeStrengthIndexIndicator,
+    SimpleAverageTrueRangeIndicator,
+    SimpleMovingAverageIndicator,
+    StochasticOscillatorIndicator,
+    Indication,
+)
+from Backtesting.Indicator.RollingKernels import stochastic_k
+from Backtesting.Strategy import CombinationStrategy, MomentumStrategy, TrendStrategy, VolatilityStrategy
+from DataDownload.DataFile import DataFile
+from tests.SyntheticData import synthetic_datafile
+
+
+def legacy_period(indicator: BaseIndicators.BaseIndicator, security: DataFile, end_date: datetime) -> pd.Series:
+    end_index = security.index.get_loc(end_date) + 1
+    start_index = security.index.get_indexer(pd.DatetimeIndex([end_date - indicator.min_period]), method="backfill")[0]
+    start_index = max(0, min(start_index, end_index - indicator.min_period_ticks))
+    return security.mid.iloc[start_index:end_index]
+
+
+def legacy_atr(period: pd.Series, n: int) -> float:
+    split = np.array_split(period, min(len(period), n))
+    return np.array([max(arr.max(), arr.flat[0]) - min(arr.min(), arr.flat[0]) for arr in split]).mean()
+
+
+def legacy_sma(indicator: SimpleMovingAverageIndicator, security: DataFile, end_date: datetime):
+    return legacy_period(indicator, security, end_date).mean()
+
+
+def legacy_atr_indication(indicator: SimpleAverageTrueRangeIndicator, security: DataFile, end_date: datetime):
+    return legacy_atr(legacy_period(indicator, security, end_date), indicator.n)
+
+
+def legacy_ema(indicator: ExponentialMovingAverageIndicator, security: DataFile, end_date: datetime):
+    period = legacy_period(indicator, security, end_date)
+    return period.ewm(span=len(period), adjust=False).mean().iloc[-1]
+
+
+def legacy_bb(indicator: BollingerBandsIndicator, security: DataFile, end_date: datetime):
+    period = legacy_period(indicator, security, end_date)
+    sma, std_dev = period.mean(), period.pct_change().std()
+    upper_band, lower_band = sma + indicator.standard_deviations * std_dev, sma - indicator.standard_deviations * std_dev
+    indication = Indication.SELL if upper_band <= period.iloc[-1] else Indication.BUY if period.iloc[-1] <= lower_band else Indication.HOLD
+    return indication, {"lower_band": lower_band, "sma": sma, "upper_band": upper_band}
+
+
+def legacy_kc(indicator: KeltnerChannelsIndicator, security: DataFile, end_date: datetime):
+    # the previous code read the ema with [-1], which pandas 3 treats as a label
+    period = legacy_period(indicator, security, end_date)
+    ema = period.ewm(span=len(period), adjust=False).mean().iloc[-1]
+    atr = legacy_atr(period, indicator.n)
+    lower_band, upper_band = ema - indicator.times_art * atr, ema + indicator.times_art * atr
+    indication = Indication.SELL if upper_band <= ema else Indication.BUY if ema <= lower_band else Indication.HOLD
+    return indication, {"lower_band": lower_band, "ema": ema, "upper_band": upper_band}
+
+
+def legacy_rsi(indicator: RelativeStrengthIndexIndicator, security: DataFile, end_date: datetime):
+    diff = legacy_period(indicator, security, end_date).diff()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + diff.clip(lower=0).mean() / -diff.clip(upper=0).mean()))
+    return Indication.BUY if rsi <= indicator.lower else Indication.SELL if indicator.upper <= rsi else Indication.HOLD, rsi
+
+
+def legacy_so(indicator: StochasticOscillatorIndicator, security: DataFile, end_date: datetime):
+    soi = stochastic_k(legacy_period(indicator, security, end_date).to_numpy())
+    return Indication.SELL if indicator.upper <= soi else Indication.BUY if soi <= indicator.lower else Indication.HOLD, soi
+
+
+def same(a, b) -> bool:
+    if isinstance(a, tuple):
+        return all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, dict):
+        return all(same(a[key], b[key]) for key in a)
+    if isinstance(a, Indication):
+        return a == b
+    return a == b or (np.isnan(a) and np.isnan(b))
+
+
+def legacy_weights(strategy, security: DataFile, start_at: int) -> pd.Series:
+    weights = {dt: strategy.get_weight(security, dt) for dt in security.index[start_at:].to_list()}
+    return pd.Series(data=weights, dtype=float).sort_index().ffill().fillna(0)
+
+
+def benchmark(num_days: int = 2, ticks_per_day: int = 10_000, step: int = 7) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    hour = relativedelta(hours=1)
+    indicators = {
+        "sma": (SimpleMovingAverageIndicator(min_period=hour, min_period_ticks=200), legacy_sma, lambda ind, i: ind.indication_at(security, i)),
+        "atr": (SimpleAverageTrueRangeIndicator(min_period=hour, min_period_ticks=200), legacy_atr_indication, lambda ind, i: ind.indication_at(security, i)),
+        "ema": (ExponentialMovingAverageIndicator(min_period=hour, min_period_ticks=200), legacy_ema, lambda ind, i: ind.indication_at(security, i)),
+        "bb": (BollingerBandsIndicator(min_period=hour, min_period_ticks=200), legacy_bb, lambda ind, i: (ind.indication_at(security, i), ind.idx_cache[i + 1])),
+        "kc": (KeltnerChannelsIndicator(min_period=hour, min_period_ticks=200), legacy_kc, lambda ind, i: (ind.indication_at(security, i), ind.idx_cache[i + 1])),
+        "rsi": (RelativeStrengthIndexIndicator(min_period=2 * hour, min_period_ticks=400), legacy_rsi, lambda ind, i: (ind.indication_at(security, i), ind.idx_cache[i + 1])),
+        "so": (StochasticOscillatorIndicator(min_period=hour, min_period_ticks=200), legacy_so, lambda ind, i: (ind.indication_at(security, i), ind.idx_cache[i + 1])),
+    }
+    positions = range(0, len(security.index), step)
+    dates = security.index[positions].to_list()
+
+    results = {}
+    for name, (indicator, legacy_func, positional) in indicators.items():
+        positional(indicator, 0)
+        start_time = time.perf_counter()
+        legacy = [legacy_func(indicator, security, dt) for dt in dates]
+        legacy_seconds = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        for i in positions:
+            indicator.indication_at(security, i)
+        positional_seconds = time.perf_counter() - start_time
+        for i, expected in zip(positions, legacy):
+            if not same(positional(indicator, i), expected):
+                raise AssertionError(f"{name} differs at position {i}")
+        results[name] = dict(
+            legacy_us_per_tick=1e6 * legacy_seconds / len(dates),
+            positional_us_per_tick=1e6 * positional_seconds / len(dates),
+            speedup=legacy_seconds / positional_seconds,
+        )
+
+    start_at = len(security.index) - 2_000
+    for strategy in [MomentumStrategy(), TrendStrategy(), CombinationStrategy(), VolatilityStrategy()]:
+        backtest = Backtesting(security, strategy, start_at=start_at, iterative=True)
+        pd.testing.assert_series_equal(backtest.weights, legacy_weights(strategy, security, start_at), check_freq=False)
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string())
@@ -0,0 +1,35 @@
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from DataDownload.DataStore import LocalDataStore
+from tests.SyntheticData import synthetic_ts
+
+
+def benchmark(num_days: int = 20, ticks_per_day: int = 50_000) -> pd.DataFrame:
+    df = synthetic_ts(num_days=num_days, ticks_per_day=ticks_per_day)
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for file_format in LocalDataStore.FILE_FORMATS:
+            data_store = LocalDataStore(ticker=f"SYNTH_{file_format}", file_format=file_format, agg_data_folder=f"{folder}/csv", agg_npy_folder=f"{folder}/npy")
+            start_time = time.perf_counter()
+            data_store.upload_ts(df)
+            upload_seconds = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            loaded = data_store.download_ts()
+            download_seconds = time.perf_counter() - start_time
+            pd.testing.assert_frame_equal(loaded, df, check_exact=False, check_freq=False, check_index_type=False)
+            exact = bool(np.array_equal(loaded.to_numpy(), df.to_numpy(), equal_nan=True))
+            results[file_format] = dict(upload_seconds=upload_seconds, download_seconds=download_seconds, ticks_per_second=len(df) / download_seconds, exact=exact)
+
+    if not results["npy"]["exact"]:
+        raise AssertionError("npy round trip is not exact")
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    res = benchmark()
+    print(res)
+    print(f"Load speedup: {res.loc['csv', 'download_seconds'] / res.loc['npy', 'download_seconds']:,.1f}x")
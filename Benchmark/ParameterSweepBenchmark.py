@@ -0,0 +1,66 @@
+import time
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from Backtesting.Backtesting import Backtesting
+from Backtesting.Indicator.IndicatorGraph import IndicatorGraph
+from Backtesting.ParameterSweep import ParameterSweep
+from Backtesting.Strategy import CombinationStrategy
+from DataDownload.DataFile import DataFile
+from tests.SyntheticData import synthetic_datafile
+
+GRID: dict[str, list] = {
+    "min_period": [relativedelta(hours=1), relativedelta(hours=2)],
+    "rsi_lower": [20, 30],
+    "rsi_upper": [70, 80],
+    "so_lower": [10, 20],
+    "so_upper": [80, 90],
+}
+
+
+def separate(security: DataFile, sweep: ParameterSweep) -> pd.DataFrame:
+    # one Backtesting per combination, every strategy computes its own indicators
+    rows = []
+    for params in sweep.combinations:
+        backtesting = Backtesting(security=security, strategy=CombinationStrategy(**params), start_at=sweep.start_at)
+        rows.append({**params, **backtesting.result.to_info_df().iloc[:, 0].to_dict()})
+    return pd.DataFrame(rows)
+
+
+def graph_nodes(sweep: ParameterSweep) -> tuple[int, int]:
+    # nodes of one graph per strategy and of one graph per chunk
+    separate_nodes, shared_nodes = 0, 0
+    for chunk in sweep.chunks():
+        shared = IndicatorGraph()
+        for params in chunk:
+            strategy = CombinationStrategy(**params)
+            strategy.nodes(shared)
+            graph = IndicatorGraph()
+            strategy.nodes(graph)
+            separate_nodes += len(graph.nodes)
+        shared_nodes += len(shared.nodes)
+    return separate_nodes, shared_nodes
+
+
+def benchmark(num_days: int = 3, ticks_per_day: int = 20_000) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    start_at = ticks_per_day
+
+    start_time = time.perf_counter()
+    expected = separate(security, ParameterSweep(security, CombinationStrategy, GRID, start_at=start_at))
+    separate_seconds = time.perf_counter() - start_time
+
+    results = {"separate backtests": dict(seconds=separate_seconds, nodes=graph_nodes(ParameterSweep(security, CombinationStrategy, GRID, chunk_size=1))[0])}
+    for processes, chunk_size in [(1, None), (1, 8), (4, None)]:
+        sweep = ParameterSweep(security, CombinationStrategy, GRID, start_at=start_at, processes=processes, chunk_size=chunk_size)
+        start_time = time.perf_counter()
+        table = sweep.run()
+        seconds = time.perf_counter() - start_time
+        pd.testing.assert_frame_equal(table, expected)
+        results[f"sweep, {processes} processes, {len(sweep.chunks())} chunks"] = dict(seconds=seconds, nodes=graph_nodes(sweep)[1])
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string())
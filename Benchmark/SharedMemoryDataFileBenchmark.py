@@ -0,0 +1,60 @@
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from Backtesting.Strategy import CombinationStrategy, MomentumStrategy, TrendStrategy, VolatilityStrategy
+from DataDownload.DataFile import DataFile
+from DataDownload.SharedMemoryDataFile import SharedMemoryDataFile
+from tests.SyntheticData import synthetic_datafile
+
+STRATEGIES: list = [CombinationStrategy(), MomentumStrategy(), TrendStrategy(), VolatilityStrategy()]
+
+
+def worker_weights(security: DataFile) -> list[np.ndarray]:
+    return [strategy.combine(security, strategy.evaluate(security)).to_numpy() for strategy in STRATEGIES]
+
+
+def worker_receive(security: DataFile) -> int:
+    return len(security.index)
+
+
+def send(executor: ProcessPoolExecutor, security: DataFile, processes: int) -> float:
+    start_time = time.perf_counter()
+    list(executor.map(worker_receive, [security] * processes))
+    return time.perf_counter() - start_time
+
+
+def benchmark(num_days: int = 5, ticks_per_day: int = 50_000, processes: int = 2) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    start_time = time.perf_counter()
+    shared = SharedMemoryDataFile.publish(security)
+    publish_seconds = time.perf_counter() - start_time
+    name = shared.segment.name
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        # the strategies see the same prices in the workers
+        expected = worker_weights(security)
+        for weights in executor.map(worker_weights, [shared] * processes):
+            for a, b in zip(weights, expected):
+                if not np.array_equal(a, b, equal_nan=True):
+                    raise AssertionError("weights on the attached SharedMemoryDataFile differ")
+        send(executor, security, processes)
+        results = {
+            "pickled DataFile": dict(bytes_per_worker=len(pickle.dumps(security)), seconds=send(executor, security, processes)),
+            "SharedMemoryDataFile": dict(bytes_per_worker=len(pickle.dumps(shared)), seconds=send(executor, shared, processes) + publish_seconds),
+        }
+
+    shared.close()
+    try:
+        SharedMemoryDataFile.attach(security.ticker, name, shared.layout)
+        raise AssertionError("the segment was not freed by close()")
+    except FileNotFoundError:
+        pass
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string())
@@ -0,0 +1,80 @@
+import time
+import tracemalloc
+
+import pandas as pd
+
+from Backtesting.Indicator import Indication
+from Backtesting.Strategy import CombinationStrategy, MomentumStrategy, VolatilityStrategy
+from DataDownload.DataFile import DataFile
+from tests.SyntheticData import synthetic_datafile
+
+
+def legacy_momentum(strategy: MomentumStrategy, security: DataFile) -> pd.Series:
+    soi = strategy.so_indicator.series_indication(security)
+    return soi.apply(lambda x: strategy.invest if x == Indication.BUY else 0 if x == Indication.SELL else None)
+
+
+def legacy_combination(strategy: CombinationStrategy, security: DataFile) -> pd.Series:
+    df = strategy.bb.series_indication(security=security).to_frame("bb")
+    df["rsi"] = strategy.rsi.series_indication(security=security)
+    df["so"] = strategy.so.series_indication(security=security)
+    return df.apply(
+        lambda x: strategy.invest
+        if 2 <= x.to_list().count(Indication.BUY) and x.to_list().count(Indication.SELL) == 0
+        else 0
+        if 3 <= x.to_list().count(Indication.SELL) and x.to_list().count(Indication.BUY) == 0
+        else None,
+        axis="columns",
+    )
+
+
+def legacy_volatility(strategy: VolatilityStrategy, security: DataFile) -> pd.Series:
+    df = strategy.atr_1h.series_indication(security=security).to_frame("atr_1h")
+    df["atr_6h"] = strategy.atr_1h.series_indication(security=security)
+    df["bb"] = strategy.bb.series_indication(security=security)
+    df["kc"] = strategy.kc.series_indication(security=security, atr=df["atr_1h"])
+    return df.apply(
+        lambda x: strategy.invest
+        if 1 <= [x.bb, x.kc].count(Indication.BUY) and 0 == [x.bb, x.kc].count(Indication.SELL) and x.atr_6h < x.atr_1h
+        else 0
+        if 0 == [x.bb, x.kc].count(Indication.BUY) and 1 <= [x.bb, x.kc].count(Indication.SELL) and x.atr_6h < x.atr_1h
+        else None,
+        axis="columns",
+    )
+
+
+def timed(func) -> tuple[pd.Series, float, int]:
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    res = func()
+    seconds = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return res, seconds, peak
+
+
+def benchmark(num_days: int = 3, ticks_per_day: int = 20_000) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    num_ticks = len(security.mid)
+    strategies = {
+        "MomentumStrategy": (MomentumStrategy(), legacy_momentum),
+        "CombinationStrategy": (CombinationStrategy(), legacy_combination),
+        "VolatilityStrategy": (VolatilityStrategy(), legacy_volatility),
+    }
+    results = {}
+    for name, (strategy, legacy_weights) in strategies.items():
+        legacy, legacy_seconds, legacy_peak = timed(lambda: legacy_weights(strategy, security))
+        signal, signal_seconds, signal_peak = timed(lambda: strategy.get_weights(security))
+        # Backtesting casts the weights to float
+        pd.testing.assert_series_equal(signal.astype(float), legacy.astype(float), check_names=False)
+        results[name] = dict(
+            legacy_ticks_per_second=num_ticks / legacy_seconds,
+            signal_ticks_per_second=num_ticks / signal_seconds,
+            legacy_peak_bytes_per_tick=legacy_peak / num_ticks,
+            signal_peak_bytes_per_tick=signal_peak / num_ticks,
+        )
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string())
@@ -0,0 +1,49 @@
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from DataDownload.DataDownloader import DataDownloader
+from DataDownload.DataStore import SplitBucketDataStore
+from DataDownload.DataStore.LocalBucket import LocalBucket
+from DataDownload.PartitionStore import PartitionStore
+from tests.SyntheticData import synthetic_ts
+
+
+def benchmark(num_days: int = 365, ticks_per_day: int = 2_000) -> pd.DataFrame:
+    df = synthetic_ts(num_days=num_days + 1, ticks_per_day=ticks_per_day, start="2022-01-16")
+    last_day = df.index[-1].normalize()
+    history, update = df.loc[df.index < last_day], df.loc[last_day <= df.index, PartitionStore.COLUMNS]
+    update_hours = list(pd.date_range(last_day, periods=24, freq="h"))
+
+    # the previous upload_ts rewrote one csv per year of the whole history on every update
+    start_time = time.perf_counter()
+    legacy_bytes = sum(len(group.to_csv(index=True, sep=DataDownloader.SEPARATOR).encode()) for _, group in df.groupby(df.index.year))
+    legacy_seconds = time.perf_counter() - start_time
+
+    with tempfile.TemporaryDirectory() as folder:
+        bucket = LocalBucket(folder)
+        data_store = SplitBucketDataStore(ticker="SYNTH", num_threads=4, bucket=bucket)
+        data_store.upload_ts(history)
+        bucket.uploaded_bytes = 0
+        start_time = time.perf_counter()
+        data_store.append_ts(update, update_hours)
+        update_seconds = time.perf_counter() - start_time
+        update_bytes = bucket.uploaded_bytes
+        loaded = data_store.download_ts()
+
+    if not np.array_equal(loaded.to_numpy(), df.to_numpy(), equal_nan=True):
+        raise AssertionError("updated partitions differ from the full ts")
+    return pd.DataFrame(
+        {
+            "full_reupload": dict(uploaded_mb=legacy_bytes / 1000000, seconds=legacy_seconds),
+            "changed_partitions": dict(uploaded_mb=update_bytes / 1000000, seconds=update_seconds),
+        }
+    ).transpose()
+
+
+if __name__ == "__main__":
+    res = benchmark()
+    print(res)
+    print(f"Upload volume reduced {res.loc['full_reupload', 'uploaded_mb'] / res.loc['changed_partitions', 'uploaded_mb']:,.1f}x")
@@ -0,0 +1,38 @@
+import time
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from Backtesting.Indicator import StochasticOscillatorIndicator
+from tests.Legacy import legacy_soi
+from tests.SyntheticData import synthetic_datafile
+
+
+def benchmark(num_days: int = 5, ticks_per_day: int = 20_000) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    # MomentumStrategy and CombinationStrategy windows, plus a tick window wider than the time window
+    indicators = {
+        "so_1h": StochasticOscillatorIndicator(min_period=relativedelta(hours=1), min_period_ticks=200),
+        "so_2h": StochasticOscillatorIndicator(min_period=relativedelta(hours=2), min_period_ticks=400),
+        "so_5min_2000": StochasticOscillatorIndicator(min_period=relativedelta(minutes=5), min_period_ticks=2000),
+    }
+    indicators["so_1h"].series_low_high(security.strip(security.index[1000]))
+
+    results = {}
+    for name, indicator in indicators.items():
+        start_time = time.perf_counter()
+        legacy = legacy_soi(indicator, security)
+        legacy_seconds = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        kernel = indicator.series_low_high(security).soi
+        kernel_seconds = time.perf_counter() - start_time
+        results[name] = dict(
+            legacy_ticks_per_second=len(security.mid) / legacy_seconds,
+            kernel_ticks_per_second=len(security.mid) / kernel_seconds,
+            speedup=legacy_seconds / kernel_seconds,
+        )
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark())
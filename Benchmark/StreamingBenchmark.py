@@ -0,0 +1,132 @@
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from Backtesting.Indicator import (
+    BollingerBandsIndicator,
+    ExponentialMovingAverageIndicator,
+    KeltnerChannelsIndicator,
+    RelativeStrengthIndexIndicator,
+    SimpleAverageTrueRangeIndicator,
+    SimpleMovingAverageIndicator,
+    StochasticOscillatorIndicator,
+    Indication,
+)
+from Backtesting.Indicator.BaseIndicators import BaseIndicator
+from Backtesting.Indicator.IndicatorGraph import IndicatorGraph
+from DataDownload.DataFile import DataFile
+from tests.SyntheticData import synthetic_datafile
+
+# running sums and Welford updates round differently than the sums over each window
+RTOL: float = 1e-9
+
+
+def run_stream(indicator: BaseIndicator, dates: np.ndarray, prices: np.ndarray) -> tuple[list, list, float]:
+    stream = indicator.stream()
+    results, values = [], []
+    start_time = time.perf_counter()
+    for date, price in zip(dates.tolist(), prices.tolist()):
+        results.append(stream.update_ns(date, price))
+        values.append(getattr(stream, "value", results[-1]))
+    return results, values, time.perf_counter() - start_time
+
+
+def run_positional(indicator: BaseIndicator, security: DataFile) -> tuple[list, list, float]:
+    results, values = [], []
+    start_time = time.perf_counter()
+    for i in range(len(security.index)):
+        results.append(indicator.indication_at(security, i))
+        values.append(indicator.idx_cache[i + 1])
+    return results, values, time.perf_counter() - start_time
+
+
+def retained_bytes(run) -> int:
+    # memory still held after all ticks, the stream state or the caches of the indicator
+    tracemalloc.start()
+    held = run()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del held
+    return current
+
+
+def stream_all(indicator: BaseIndicator, dates: np.ndarray, prices: np.ndarray):
+    stream = indicator.stream()
+    for date, price in zip(dates.tolist(), prices.tolist()):
+        stream.update_ns(date, price)
+    return stream
+
+
+def positional_all(indicator: BaseIndicator, security: DataFile, cache_size: None | int):
+    indicator.limit_cache(cache_size)
+    for i in range(len(security.index)):
+        indicator.indication_at(security, i)
+    return indicator
+
+
+def flat(values: list) -> np.ndarray:
+    return np.array([list(value.values()) if isinstance(value, dict) else [value] for value in values], dtype=np.float64)
+
+
+def benchmark(num_days: int = 2, ticks_per_day: int = 20_000) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    dates, prices = security.index.as_unit("ns").asi8, security.mid.to_numpy(dtype=np.float64)
+    hour = relativedelta(hours=1)
+    indicators = {
+        "sma": (SimpleMovingAverageIndicator(min_period=hour, min_period_ticks=200), RTOL),
+        "atr": (SimpleAverageTrueRangeIndicator(min_period=hour, min_period_ticks=200), 0.0),
+        "ema": (ExponentialMovingAverageIndicator(min_period=hour, min_period_ticks=200), 0.0),
+        "bb": (BollingerBandsIndicator(min_period=hour, min_period_ticks=200), RTOL),
+        "kc": (KeltnerChannelsIndicator(min_period=hour, min_period_ticks=200), 0.0),
+        "rsi": (RelativeStrengthIndexIndicator(min_period=2 * hour, min_period_ticks=400), RTOL),
+        "so": (StochasticOscillatorIndicator(min_period=hour, min_period_ticks=200), 0.0),
+    }
+    results = {}
+    for name, (indicator, rtol) in indicators.items():
+        indicator.indication_at(security, 0)
+        stream_results, stream_values, stream_seconds = run_stream(indicator, dates, prices)
+        indicator.limit_cache(None)
+        positional_results, positional_values, positional_seconds = run_positional(indicator, security)
+        if not np.allclose(flat(stream_values), flat(positional_values), rtol=rtol, atol=0.0, equal_nan=True):
+            raise AssertionError(f"{name} stream differs from indication_at")
+        mismatches = sum(a != b for a, b in zip(stream_results, positional_results) if isinstance(a, Indication))
+        if mismatches:
+            raise AssertionError(f"{name} stream indicates differently than indication_at at {mismatches} ticks")
+        results[name] = dict(
+            stream_us_per_tick=1e6 * stream_seconds / len(prices),
+            positional_us_per_tick=1e6 * positional_seconds / len(prices),
+            stream_bytes=retained_bytes(lambda: stream_all(indicator, dates, prices)),
+            unbounded_cache_bytes=retained_bytes(lambda: positional_all(indicator, security, None)),
+            bounded_cache_bytes=retained_bytes(lambda: positional_all(indicator, security, 1000)),
+        )
+
+    # the recursive modes equal the series of the indicator
+    for mode in [ExponentialMovingAverageIndicator.SPAN, ExponentialMovingAverageIndicator.TIME]:
+        indicator = ExponentialMovingAverageIndicator(min_period=hour, min_period_ticks=200, mode=mode)
+        _, stream_values, stream_seconds = run_stream(indicator, dates, prices)
+        if not np.array_equal(np.array(stream_values), IndicatorGraph.compute(security, indicator.node), equal_nan=True):
+            raise AssertionError(f"{mode} ema stream differs from the series")
+        results[f"ema_{mode}"] = dict(stream_us_per_tick=1e6 * stream_seconds / len(prices), stream_bytes=retained_bytes(lambda: stream_all(indicator, dates, prices)))
+
+    # the chunks atr and the keltner channels on it and on the span ema equal their series as well
+    recursive = {
+        "atr_chunks": (SimpleAverageTrueRangeIndicator(min_period=hour, min_period_ticks=200, mode=SimpleAverageTrueRangeIndicator.CHUNKS), lambda indicator: IndicatorGraph.compute(security, indicator.node)),
+        "kc_span_chunks": (
+            KeltnerChannelsIndicator(min_period=hour, min_period_ticks=200, ema_mode=ExponentialMovingAverageIndicator.SPAN, atr_mode=SimpleAverageTrueRangeIndicator.CHUNKS),
+            lambda indicator: indicator.series_signal(security).to_numpy(),
+        ),
+    }
+    for name, (indicator, series) in recursive.items():
+        stream_results, _, stream_seconds = run_stream(indicator, dates, prices)
+        stream_results = [result.value if isinstance(result, Indication) else result for result in stream_results]
+        if not np.array_equal(np.array(stream_results), series(indicator), equal_nan=True):
+            raise AssertionError(f"{name} stream differs from the series")
+        results[name] = dict(stream_us_per_tick=1e6 * stream_seconds / len(prices), stream_bytes=retained_bytes(lambda: stream_all(indicator, dates, prices)))
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string())
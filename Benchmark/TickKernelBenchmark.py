@@ -0,0 +1,111 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from numba import jit
+
+from Backtesting.Backtesting import Backtesting
+from Backtesting.Strategy import BaseStrategy, CombinationStrategy, GoldenCrossStrategy, MomentumStrategy, TrendStrategy, VolatilityStrategy
+from DataDownload.DataFile import DataFile
+from tests.SyntheticData import synthetic_datafile
+
+
+@jit(nopython=True, nogil=True)
+def _trailing_stop(i: int, weights: np.ndarray, state: tuple) -> float:
+    # memory[0] is 1 while invested, memory[1] the highest price since the buy
+    mid, memory, drop, invest = state
+    price = mid[i]
+    if memory[0] == 0.0:
+        if 0 < i and mid[i - 1] < price:
+            memory[0], memory[1] = 1.0, price
+            return invest
+        return np.nan
+    memory[1] = max(memory[1], price)
+    if price <= memory[1] * (1 - drop):
+        memory[0] = 0.0
+        return 0.0
+    return np.nan
+
+
+class TrailingStopStrategy(BaseStrategy):
+    # path dependent: buys on an up tick and sells after a drop from the highest price since the buy
+    def __init__(self, drop: float = 0.0005, invest: float = 1.0, compiled: bool = True):
+        self.drop = drop
+        self.invest = invest
+        self.compiled = compiled
+        self.held, self.peak = False, 0.0
+
+    def get_weight(self, security: DataFile, end_date: datetime) -> None | float:
+        return self.get_weight_at(security, security.index.get_loc(end_date))
+
+    def get_weight_at(self, security: DataFile, i: int) -> None | float:
+        mid = security.mid
+        price = mid.iloc[i]
+        if not self.held:
+            if 0 < i and mid.iloc[i - 1] < price:
+                self.held, self.peak = True, price
+                return self.invest
+            return None
+        self.peak = max(self.peak, price)
+        if price <= self.peak * (1 - self.drop):
+            self.held = False
+            return 0
+        return None
+
+    def get_weights(self, security: DataFile) -> pd.Series:
+        raise NotImplementedError
+
+    def tick_kernel(self, security: DataFile) -> None | tuple:
+        if not self.compiled:
+            return None
+        return _trailing_stop, (security.mid.to_numpy(dtype=np.float64), np.zeros(2), float(self.drop), float(self.invest))
+
+
+def run(backtest: Backtesting) -> tuple[np.ndarray, float]:
+    start_time = time.perf_counter()
+    weights = backtest.iterative_weights(datetime.now())
+    return weights, time.perf_counter() - start_time
+
+
+def quiet(done: int, total: int, elapsed) -> None:
+    pass
+
+
+def benchmark(num_days: int = 2, ticks_per_day: int = 10_000, num_ticks: int = 3_000) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    start_at = len(security.index) - num_ticks
+    results = {}
+    for strategy in [MomentumStrategy(), GoldenCrossStrategy(), TrendStrategy(), CombinationStrategy(), VolatilityStrategy()]:
+        name = strategy.__class__.__name__
+        # compile the kernel outside of the timing
+        run(Backtesting(security, strategy, start_at=len(security.index) - 1, iterative=True, progress=quiet))
+        kernel, kernel_seconds = run(Backtesting(security, strategy, start_at=start_at, iterative=True, progress=quiet))
+        start_time = time.perf_counter()
+        positional = np.array([np.nan if (weight := strategy.get_weight_at(security, i)) is None else weight for i in range(start_at, len(security.index))], dtype=float)
+        positional_seconds = time.perf_counter() - start_time
+        if not np.array_equal(kernel, positional, equal_nan=True):
+            raise AssertionError(f"{name} kernel differs from get_weight_at")
+        results[name] = dict(
+            positional_ticks_per_second=num_ticks / positional_seconds,
+            kernel_ticks_per_second=num_ticks / kernel_seconds,
+            speedup=positional_seconds / kernel_seconds,
+        )
+
+    # a path dependent strategy over a longer history, the kernel keeps its state in an array of the state tuple
+    security = synthetic_datafile(num_days=10, ticks_per_day=100_000)
+    run(Backtesting(security, TrailingStopStrategy(), start_at=len(security.index) - 1, iterative=True, progress=quiet))
+    kernel, kernel_seconds = run(Backtesting(security, TrailingStopStrategy(), iterative=True, progress=quiet))
+    positional, positional_seconds = run(Backtesting(security, TrailingStopStrategy(compiled=False), iterative=True, progress=quiet))
+    if not np.array_equal(kernel, positional, equal_nan=True):
+        raise AssertionError("TrailingStopStrategy kernel differs from get_weight_at")
+    results["TrailingStopStrategy"] = dict(
+        positional_ticks_per_second=len(kernel) / positional_seconds,
+        kernel_ticks_per_second=len(kernel) / kernel_seconds,
+        speedup=positional_seconds / kernel_seconds,
+    )
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string())
@@ -0,0 +1,54 @@
+import time
+from datetime import timedelta
+
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from Backtesting.Indicator import RelativeStrengthIndexIndicator, SimpleMovingAverageIndicator
+from Backtesting.Indicator.IndicatorGraph import IndicatorGraph
+from Backtesting.Indicator.WindowBounds import WindowBounds
+from DataDownload.DataFile import DataFile
+from tests.Legacy import legacy_rsi, legacy_sma
+from tests.SyntheticData import synthetic_datafile
+
+
+def benchmark(num_days: int = 5, ticks_per_day: int = 20_000) -> pd.DataFrame:
+    security = synthetic_datafile(num_days=num_days, ticks_per_day=ticks_per_day)
+    num_ticks = len(security.mid)
+    indicators = {
+        "sma_1h": (SimpleMovingAverageIndicator(min_period=relativedelta(hours=1), min_period_ticks=200), legacy_sma),
+        "sma_6h": (SimpleMovingAverageIndicator(min_period=relativedelta(hours=6), min_period_ticks=1200), legacy_sma),
+        "rsi_2h": (RelativeStrengthIndexIndicator(min_period=relativedelta(hours=2), min_period_ticks=400), legacy_rsi),
+        "rsi_5min_2000": (RelativeStrengthIndexIndicator(min_period=relativedelta(minutes=5), min_period_ticks=2000), legacy_rsi),
+    }
+    IndicatorGraph.compute(security.strip(security.index[1000]), indicators["sma_1h"][0].node)
+    IndicatorGraph.compute(security.strip(security.index[1000]), indicators["rsi_2h"][0].node)
+
+    results = {}
+    for name, (indicator, legacy_func) in indicators.items():
+        start_time = time.perf_counter()
+        legacy = legacy_func(security, indicator.timedelta_min_period, indicator.min_period_ticks)
+        legacy_seconds = time.perf_counter() - start_time
+        WindowBounds.clear()
+        start_time = time.perf_counter()
+        kernel = IndicatorGraph.compute(security, indicator.node)
+        kernel_seconds = time.perf_counter() - start_time
+        results[name] = dict(
+            legacy_ticks_per_second=num_ticks / legacy_seconds,
+            kernel_ticks_per_second=num_ticks / kernel_seconds,
+            speedup=legacy_seconds / kernel_seconds,
+        )
+
+    # the bounds are computed once per DataFile and window, every further indicator reuses them
+    WindowBounds.clear()
+    start_time = time.perf_counter()
+    WindowBounds.starts(security, timedelta(hours=1), 200)
+    first_seconds = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    WindowBounds.starts(security, timedelta(hours=1), 200)
+    results["window_bounds"] = dict(first_lookup_seconds=first_seconds, shared_lookup_seconds=time.perf_counter() - start_time)
+    return pd.DataFrame(results).transpose()
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string())
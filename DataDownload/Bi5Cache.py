@@ -0,0 +1,121 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+
+class Bi5Cache:
+    FOLDER: str = f"{os.path.dirname(__file__)}/../Data/Bi5Cache"
+    DEFAULT_MAX_BYTES: int = 10 * 1024**3
+
+    def __init__(self, folder: str = FOLDER, max_bytes: None | int = DEFAULT_MAX_BYTES, only_cache: bool = False):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.only_cache = only_cache
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(f"{self.folder}/objects", exist_ok=True)
+        self._db = sqlite3.connect(f"{self.folder}/index.sqlite", check_same_thread=False, isolation_level=None, timeout=60)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)")
+        self._total_bytes = self._size()
+
+    @staticmethod
+    def key(ticker: str, timestamp: datetime) -> str:
+        return f"{ticker}/{timestamp.year}/{timestamp.month:02d}/{timestamp.day:02d}/{timestamp.hour:02d}"
+
+    def _object_path(self, digest: str) -> str:
+        return f"{self.folder}/objects/{digest[:2]}/{digest}.bi5"
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self._size()
+
+    def _size(self) -> int:
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)").fetchone()[0]
+
+    def __contains__(self, item: tuple[str, datetime]) -> bool:
+        ticker, timestamp = item
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM entries WHERE key = ?", (Bi5Cache.key(ticker, timestamp),)).fetchone() is not None
+
+    def get(self, ticker: str, timestamp: datetime) -> None | bytes:
+        key = Bi5Cache.key(ticker, timestamp)
+        with self._lock:
+            row = self._db.execute("SELECT digest FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            try:
+                with open(self._object_path(row[0]), "rb") as file:
+                    raw = file.read()
+            except FileNotFoundError:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            return raw
+
+    def put(self, ticker: str, timestamp: datetime, raw: bytes) -> None:
+        key = Bi5Cache.key(ticker, timestamp)
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._object_path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as file:
+                    file.write(raw)
+                os.replace(tmp_path, path)
+                self._total_bytes += len(raw)
+            old = self._db.execute("SELECT digest FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO entries (key, digest, size, last_access) VALUES (?, ?, ?, ?)", (key, digest, len(raw), time.time()))
+            if old is not None and old[0] != digest:
+                self._remove_object_if_unused(old[0])
+            self._evict()
+
+    def remove(self, ticker: str, timestamp: datetime) -> None:
+        key = Bi5Cache.key(ticker, timestamp)
+        with self._lock:
+            row = self._db.execute("SELECT digest FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._remove_object_if_unused(row[0])
+
+    def _remove_object_if_unused(self, digest: str) -> None:
+        if self._db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+            path = self._object_path(digest)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self._total_bytes -= size
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> None:
+        if self.max_bytes is None or self._total_bytes <= self.max_bytes:
+            return
+        # other processes may share the folder, so the running total is only trusted to trigger a recount
+        self._total_bytes = self._size()
+        while self.max_bytes < self._total_bytes:
+            row = self._db.execute("SELECT key, digest FROM entries ORDER BY last_access LIMIT 1").fetchone()
+            if row is None:
+                # another process emptied the index, nothing left to evict
+                self._total_bytes = self._size()
+                break
+            key, digest = row
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._remove_object_if_unused(digest)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
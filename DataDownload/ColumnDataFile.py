@@ -0,0 +1,145 @@
+import os
+import shutil
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from .DataDownloader import DataDownloader
+from .DataFile import DataFile
+
+
+class ColumnDataFile(DataFile):
+    MEMMAP_FOLDER: str = f"{os.path.dirname(__file__)}/../Data/Memmap"
+    DATE_COLUMN: str = "date"
+    COLUMNS: list[str] = ["ask", "bid", "mid", "spread", "returns", "sell_costs"]
+    FINGERPRINT_FILE: str = "fingerprint.txt"
+
+    def __init__(self, ticker: str, dates: np.ndarray, columns: dict[str, np.ndarray]):
+        # DataFile.__init__ is not called, it assigns Series of a DataFrame where this class has properties over the column arrays
+        self.ticker = ticker
+        self.dates: np.ndarray = dates
+        self.columns: dict[str, np.ndarray] = columns
+        self._index: None | pd.DatetimeIndex = None
+        self._series: dict[str, pd.Series] = {}
+
+    @staticmethod
+    def from_data_file(data_file: DataFile) -> "ColumnDataFile":
+        if isinstance(data_file, ColumnDataFile):
+            return data_file
+        columns = dict(
+            ask=data_file.ask,
+            bid=data_file.bid,
+            mid=data_file.mid,
+            spread=data_file.spread,
+            returns=data_file.pct_returns,
+            sell_costs=data_file.pct_sell_costs,
+        )
+        return ColumnDataFile(
+            ticker=data_file.ticker,
+            dates=data_file.index.as_unit("ns").asi8,
+            columns={name: column.to_numpy(dtype=np.float64) for name, column in columns.items()},
+        )
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        if self._index is None:
+            self._index = pd.DatetimeIndex(self.dates.view("datetime64[ns]"), name=ColumnDataFile.DATE_COLUMN, copy=False)
+        return self._index
+
+    def _values(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def _column(self, name: str) -> pd.Series:
+        if name not in self._series:
+            self._series[name] = pd.Series(self._values(name), index=self.index, name=name, copy=False)
+        return self._series[name]
+
+    @property
+    def ask(self) -> pd.Series:
+        return self._column("ask")
+
+    @property
+    def bid(self) -> pd.Series:
+        return self._column("bid")
+
+    @property
+    def mid(self) -> pd.Series:
+        return self._column("mid")
+
+    @property
+    def spread(self) -> pd.Series:
+        return self._column("spread")
+
+    @property
+    def pct_returns(self) -> pd.Series:
+        return self._column("returns")
+
+    @property
+    def pct_sell_costs(self) -> pd.Series:
+        return self._column("sell_costs")
+
+    @property
+    def start_date(self) -> pd.Timestamp:
+        return pd.Timestamp(self.dates[0])
+
+    @property
+    def end_date(self) -> pd.Timestamp:
+        return pd.Timestamp(self.dates[-1])
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def nbytes(self) -> int:
+        return self.dates.nbytes + sum(column.nbytes for column in self.columns.values())
+
+    def position(self, dt: datetime | date, side: str = "left") -> int:
+        return int(np.searchsorted(self.dates, pd.Timestamp(dt).as_unit("ns").value, side=side))
+
+    def slice(self, start: int, stop: int) -> "ColumnDataFile":
+        return ColumnDataFile(ticker=self.ticker, dates=self.dates[start:stop], columns={name: column[start:stop] for name, column in self.columns.items()})
+
+    def between(self, start_date: None | datetime = None, end_date: None | datetime = None) -> "ColumnDataFile":
+        start = 0 if start_date is None else self.position(start_date, side="left")
+        stop = len(self) if end_date is None else self.position(end_date, side="right")
+        return self.slice(start, stop)
+
+    def strip(self, end_date: datetime) -> "ColumnDataFile":
+        return self.slice(0, self.position(end_date, side="right"))
+
+    def _memmap_arrays(self) -> dict[str, np.ndarray]:
+        return {ColumnDataFile.DATE_COLUMN: np.ascontiguousarray(self.dates, dtype=np.int64), **{name: np.ascontiguousarray(column) for name, column in self.columns.items()}}
+
+    def write_memmap(self, folder: str, fingerprint: None | str = None) -> None:
+        tmp_folder = f"{folder}.{os.getpid()}.tmp"
+        os.makedirs(tmp_folder, exist_ok=True)
+        for name, array in self._memmap_arrays().items():
+            np.save(f"{tmp_folder}/{name}.npy", array)
+        if fingerprint is not None:
+            with open(f"{tmp_folder}/{ColumnDataFile.FINGERPRINT_FILE}", "w") as file:
+                file.write(fingerprint)
+        if os.path.exists(folder):
+            shutil.rmtree(folder)
+        os.replace(tmp_folder, folder)
+
+    @staticmethod
+    def open_memmap(ticker: str, folder: str) -> "ColumnDataFile":
+        return ColumnDataFile(
+            ticker=ticker,
+            dates=np.load(f"{folder}/{ColumnDataFile.DATE_COLUMN}.npy", mmap_mode="r"),
+            columns={name: np.load(f"{folder}/{name}.npy", mmap_mode="r") for name in ColumnDataFile.COLUMNS},
+        )
+
+    @staticmethod
+    def memmap_fingerprint(folder: str) -> None | str:
+        # fingerprint of the stored ts the snapshot in folder was written from, None if there is no (fingerprinted) snapshot
+        path = f"{folder}/{ColumnDataFile.FINGERPRINT_FILE}"
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as file:
+            return file.read()
+
+    @staticmethod
+    def memmap_folder(ticker: str, start_date: date, end_date: date, suffix: str = "") -> str:
+        return f"{ColumnDataFile.MEMMAP_FOLDER}/{ticker}/{start_date.strftime(DataDownloader.DATE_FILE_FORMAT)}-{end_date.strftime(DataDownloader.DATE_FILE_FORMAT)}{suffix}"
@@ -0,0 +1,122 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from .ColumnDataFile import ColumnDataFile
+from .DataDownloader import DataDownloader
+from .DataFile import DataFile
+
+
+class CompactDataFile(ColumnDataFile):
+    PRICE_COLUMNS: list[str] = ["ask", "bid"]
+    VOLUME_COLUMNS: list[str] = ["ask_vol", "bid_vol"]
+    FIRST_RETURN: str = "first_return"
+    MEMMAP_SUFFIX: str = "-compact"
+
+    def __init__(self, ticker: str, dates: np.ndarray, columns: dict[str, np.ndarray], first_return: float = np.nan):
+        super().__init__(ticker=ticker, dates=dates, columns=columns)
+        self.first_return = float(first_return)
+        self._derived: dict[str, np.ndarray] = {}
+
+    @staticmethod
+    def to_points(prices: np.ndarray) -> None | np.ndarray:
+        points = np.rint(prices * DataDownloader.PRICE_SCALE)
+        if not np.all(np.abs(points) <= np.iinfo(np.int32).max) or not np.array_equal(points / DataDownloader.PRICE_SCALE, prices):
+            return None
+        return points.astype(np.int32)
+
+    @staticmethod
+    def from_df(ticker: str, df_ts: pd.DataFrame) -> "CompactDataFile":
+        columns = {}
+        for name in CompactDataFile.PRICE_COLUMNS:
+            prices = df_ts[name].to_numpy(dtype=np.float64)
+            points = CompactDataFile.to_points(prices)
+            if points is None:
+                print(f"{name} prices of {ticker} are no multiples of 1/{DataDownloader.PRICE_SCALE}, keeping them as float64")
+                columns[name] = prices
+            else:
+                columns[f"{name}_points"] = points
+        for name in CompactDataFile.VOLUME_COLUMNS:
+            if name in df_ts.columns:
+                volumes = df_ts[name].to_numpy(dtype=np.float64)
+                columns[name] = volumes.astype(np.float32) if np.array_equal(volumes.astype(np.float32), volumes, equal_nan=True) else volumes
+        first_return = df_ts["returns"].iloc[0] if "returns" in df_ts.columns and 0 < len(df_ts) else np.nan
+        return CompactDataFile(ticker=ticker, dates=df_ts.index.as_unit("ns").asi8, columns=columns, first_return=first_return)
+
+    @staticmethod
+    def from_data_file(data_file: DataFile) -> "CompactDataFile":
+        if isinstance(data_file, CompactDataFile):
+            return data_file
+        df_ts = getattr(data_file, "_df", None)
+        if df_ts is None:
+            df_ts = pd.DataFrame({"ask": data_file.ask, "bid": data_file.bid, "returns": data_file.pct_returns})
+        return CompactDataFile.from_df(ticker=data_file.ticker, df_ts=df_ts)
+
+    def _price(self, name: str, start: int = 0, stop: None | int = None) -> np.ndarray:
+        if name in self.columns:
+            return self.columns[name][start:stop]
+        return self.columns[f"{name}_points"][start:stop] / DataDownloader.PRICE_SCALE
+
+    def _derive(self, name: str) -> np.ndarray:
+        # same float operations as DataDownloader.decode_bi5 and calc_columns, so the values are identical
+        if name in CompactDataFile.PRICE_COLUMNS:
+            return self._price(name)
+        ask, bid = self._peek("ask"), self._peek("bid")
+        if name == "mid":
+            return (ask + bid) / 2
+        if name == "spread":
+            return ask - bid
+        if name == "sell_costs":
+            return -self._peek("spread") / ask
+        if name == "returns":
+            returns = np.empty(len(bid), dtype=np.float64)
+            returns[:1] = self.first_return
+            returns[1:] = bid[1:] / bid[:-1] - 1
+            return returns
+        raise KeyError(name)
+
+    def _peek(self, name: str) -> np.ndarray:
+        # intermediates are reused when cached but not cached themselves
+        if name in self.columns:
+            return self.columns[name]
+        if name in self._derived:
+            return self._derived[name]
+        return self._derive(name)
+
+    def _values(self, name: str) -> np.ndarray:
+        if name not in self.columns and name not in self._derived:
+            self._derived[name] = self._derive(name)
+        return self._peek(name)
+
+    def clear_derived(self) -> None:
+        self._derived = {}
+        self._series = {}
+
+    @property
+    def derived_nbytes(self) -> int:
+        return sum(column.nbytes for column in self._derived.values())
+
+    def slice(self, start: int, stop: int) -> "CompactDataFile":
+        start = min(max(start, 0), len(self))
+        if start == 0:
+            first_return = self.first_return
+        elif start < len(self):
+            bid = self._price("bid", start - 1, start + 1)
+            first_return = bid[1] / bid[0] - 1
+        else:
+            first_return = np.nan
+        return CompactDataFile(ticker=self.ticker, dates=self.dates[start:stop], columns={name: column[start:stop] for name, column in self.columns.items()}, first_return=first_return)
+
+    def _memmap_arrays(self) -> dict[str, np.ndarray]:
+        return {**super()._memmap_arrays(), CompactDataFile.FIRST_RETURN: np.array(self.first_return)}
+
+    @staticmethod
+    def open_memmap(ticker: str, folder: str) -> "CompactDataFile":
+        names = [file.removesuffix(".npy") for file in os.listdir(folder) if file.endswith(".npy")]
+        return CompactDataFile(
+            ticker=ticker,
+            dates=np.load(f"{folder}/{ColumnDataFile.DATE_COLUMN}.npy", mmap_mode="r"),
+            columns={name: np.load(f"{folder}/{name}.npy", mmap_mode="r") for name in names if name not in (ColumnDataFile.DATE_COLUMN, CompactDataFile.FIRST_RETURN)},
+            first_return=float(np.load(f"{folder}/{CompactDataFile.FIRST_RETURN}.npy")),
+        )
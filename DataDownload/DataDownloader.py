@@ -1,122 +1,159 @@
-import gc
-import lzma
-import struct
+import os
+import tempfile
 import threading
-import time
+from collections import Counter
 from datetime import datetime, date
 
 import numpy as np
 import pandas as pd
 import psutil
-import requests
 from dateutil.relativedelta import relativedelta
 
+from .Bi5Cache import Bi5Cache
+from .DownloadEngine import DownloadEngine
+from .DownloadManifest import DownloadManifest
+from .PartitionStore import PartitionStore
+
 
 class DataDownloader:
     FILE_FORMAT = "!IIIff"
+    FILE_DTYPE = np.dtype([("date", ">u4"), ("ask", ">u4"), ("bid", ">u4"), ("ask_vol", ">f4"), ("bid_vol", ">f4")])
+    PRICE_SCALE: float = 1000
     DATE_FORMAT = "%Y/%m/%d"
     DATE_FILE_FORMAT = "%Y_%m_%d"
     SEPARATOR: str = ";"
     EARLIEST_DATE: date = date(year=2015, month=3, day=24)
+    STAGING_FOLDER: str = f"{os.path.dirname(__file__)}/../Data/Staging"
 
     @staticmethod
-    def calc_columns(df: pd.DataFrame) -> pd.DataFrame:
+    def calc_columns(df: pd.DataFrame, previous_bid: None | float = None) -> pd.DataFrame:
         start_time = datetime.now()
         print(f"Start calculating columns at <{start_time}>")
-        for_ret_calc = df.dropna(how="any", axis="rows").copy()
-        for_ret_calc["returns"] = for_ret_calc["bid"].pct_change()
-        for_ret_calc["sell_costs"] = -for_ret_calc["spread"] / for_ret_calc["ask"]
-        df = df.join(for_ret_calc.loc[:, ["returns", "sell_costs"]], how="left")
+        valid = df.notna().all(axis="columns").to_numpy()
+        for_ret_calc = df.loc[valid, ["ask", "bid", "spread"]]
+        returns = for_ret_calc["bid"].pct_change().to_numpy(copy=True)
+        if previous_bid is not None and len(returns):
+            # ranges read from partitions continue the returns of the preceding tick
+            returns[0] = for_ret_calc["bid"].iloc[0] / previous_bid - 1
+        sell_costs = (-for_ret_calc["spread"] / for_ret_calc["ask"]).to_numpy()
+        # assigned by position, joining on the index would multiply ticks sharing a timestamp
+        df = df.assign(returns=np.nan, sell_costs=np.nan)
+        df.iloc[valid, df.columns.get_loc("returns")] = returns
+        df.iloc[valid, df.columns.get_loc("sell_costs")] = sell_costs
         end_time = datetime.now()
         print(f"End calculating columns at <{end_time}> within <{end_time - start_time}>")
         return df
 
     @staticmethod
-    def download_data(ticker: str, start_date: date, end_date: date, df: None | pd.DataFrame = None, num_threads: int = 1, log_delta: float = 5) -> pd.DataFrame:
-        print(f"Init downloading data from <{ticker}>")
-        start_date = max(start_date, DataDownloader.EARLIEST_DATE)
-        end_date = min(end_date, date.today() - relativedelta(days=1))
+    def clamp_dates(start_date: date, end_date: date) -> tuple[date, date]:
+        return max(start_date, DataDownloader.EARLIEST_DATE), min(end_date, date.today() - relativedelta(days=1))
 
-        if df is None or df.empty:
-            days = pd.date_range(start_date, end_date, freq="1d", inclusive="both")
-        else:
-            df = df.loc[:, ["ask", "bid", "ask_vol", "bid_vol", "mid", "spread"]]
-            df_first_day = df.index[0].date()
-            df_last_day = df.index[-1].date()
-            start_date = min(start_date, df_first_day)
-            end_date = max(end_date, df_last_day)
-            days = pd.date_range(start_date, end_date, freq="1d", inclusive="both")
-            done_days = pd.date_range(df_first_day, df_last_day, freq="1d", inclusive="both")
-            days = pd.to_datetime(np.setdiff1d(days, done_days))
+    @staticmethod
+    def staging_store(ticker: str) -> PartitionStore:
+        os.makedirs(DataDownloader.STAGING_FOLDER, exist_ok=True)
+        return PartitionStore(tempfile.mkdtemp(prefix=f"{ticker}_", dir=DataDownloader.STAGING_FOLDER))
 
-        to_download = np.array([[day + relativedelta(hour=i) for i in range(24)] for day in days]).flatten()
-        final_days: dict = dict.fromkeys(to_download, None)
-        number_days = len(to_download)
-        divided_dts = np.array_split(to_download, num_threads)
+    @staticmethod
+    def download_hours(
+        ticker: str,
+        hours: list[datetime],
+        num_threads: int = 1,
+        log_delta: float = 5,
+        cache: None | Bi5Cache = None,
+        store: None | PartitionStore = None,
+        manifest: None | DownloadManifest = None,
+    ) -> pd.DataFrame:
+        # frame of the downloaded days only, the staging partitions are removed even if the download fails
+        staging = store if store is not None else DataDownloader.staging_store(ticker)
+        try:
+            days = DataDownloader.download_hours_into(ticker=ticker, hours=hours, store=staging, num_threads=num_threads, log_delta=log_delta, cache=cache, manifest=manifest)
+            print(f"Memory usage before assembling partitions: {psutil.Process().memory_info().rss/1000000000:,.2f} GB")
+            return staging.read_days(days)
+        finally:
+            if store is None:
+                staging.delete()
 
+    @staticmethod
+    def download_hours_into(
+        ticker: str,
+        hours: list[datetime],
+        store: PartitionStore,
+        num_threads: int = 1,
+        log_delta: float = 5,
+        cache: None | Bi5Cache = None,
+        manifest: None | DownloadManifest = None,
+        append: bool = False,
+    ) -> list[date]:
+        # streams the hours into the day partitions of store, with append=True the hours are merged into existing partitions
         start_time = datetime.now()
-        print(f"Downloading data for {ticker} with {num_threads} threads at <{start_time}>")
-        threads = []
-        for dts in divided_dts:
-            thread = threading.Thread(target=DataDownloader.download_dts, args=(ticker, dts, final_days))
-            thread.start()
-            threads.append(thread)
-        while True:
-            if all([not thread.is_alive() for thread in threads]):
-                break
-            empty_days = sum([day is None for day in final_days.values()])
-            filled_days = number_days - empty_days
-            perc = filled_days / number_days * 100
-            print(f"\rDownloaded {filled_days}/{number_days} [{perc:.2f}%]", end="")
-            time.sleep(log_delta)
+        print(f"Downloading {len(hours)} hours for {ticker} with {num_threads} threads at <{start_time}>")
+        DataDownloader.stream_data(ticker=ticker, timestamps=hours, store=store, num_threads=num_threads, log_delta=log_delta, cache=cache, manifest=manifest, append=append)
         end_time = datetime.now()
-        print(f"\nDownload done at <{end_time}> Time needed <{end_time-start_time}>")
-
-        print(f"Memory usage before concat: {psutil.Process().memory_info().rss/1000000000:,.2f} GB")
-        dfs = list(final_days.values()) if df is None or df.empty else [*final_days.values(), df]
-        df = pd.concat(dfs, axis="index")
-        print(f"Memory usage after concat: {psutil.Process().memory_info().rss/1000000000:,.2f} GB")
-        del final_days
-        del dfs
-        gc.collect()
-        print(f"Memory usage after dfs garbage collection: {psutil.Process().memory_info().rss/1000000000:,.2f} GB")
-        df.sort_index(inplace=True)
-        return DataDownloader.calc_columns(df)
+        print(f"Download done at <{end_time}> Time needed <{end_time-start_time}>")
+        if cache is not None:
+            print(f"Bi5 cache hits: {cache.hits}, misses: {cache.misses}, size: {cache.size/1000000:,.2f} MB")
+        return sorted({hour.date() for hour in hours})
 
     @staticmethod
-    def download_dts(ticker: str, dts: list[datetime], final: dict[datetime, pd.DataFrame]) -> None:
-        for dt in dts:
-            final[dt] = DataDownloader.download_df(ticker=ticker, timestamp=dt)
+    def stream_data(
+        ticker: str,
+        timestamps: list[datetime],
+        store: PartitionStore,
+        num_threads: int = 1,
+        log_delta: float = 5,
+        cache: None | Bi5Cache = None,
+        manifest: None | DownloadManifest = None,
+        append: bool = False,
+    ) -> dict[str, float]:
+        expected = Counter(timestamp.date() for timestamp in timestamps)
+        pending: dict[date, dict[datetime, pd.DataFrame]] = {}
+        lock = threading.Lock()
+
+        def on_result(timestamp: datetime, decompressed: None | bytes) -> None:
+            hour_df = DataDownloader.decode_bi5(decompressed or b"", timestamp)
+            day = timestamp.date()
+            with lock:
+                if manifest is not None:
+                    manifest.set_result(timestamp, None if decompressed is None else len(decompressed) // DataDownloader.FILE_DTYPE.itemsize)
+                hours = pending.setdefault(day, {})
+                hours[timestamp] = hour_df
+                if len(hours) < expected[day]:
+                    return
+                del pending[day]
+            try:
+                day_df = pd.concat([hours[hour] for hour in sorted(hours)], axis="index")
+                if append:
+                    store.append(day_df, replace_hours=sorted(hours))
+                else:
+                    store.write_partition(day, day_df)
+            except Exception:
+                # the hours of a day that was not written are downloaded again
+                if manifest is not None:
+                    with lock:
+                        for hour in hours:
+                            manifest.set(hour, DownloadManifest.FAILED)
+                raise
+
+        return DownloadEngine(num_threads=num_threads, cache=cache).run(ticker=ticker, timestamps=timestamps, on_result=on_result, log_delta=log_delta)
 
     @staticmethod
-    def download_df(ticker: str, timestamp: datetime) -> pd.DataFrame:
-        # Developed by Maximilian Kauwetter
-        url = f"https://datafeed.dukascopy.com/datafeed/{ticker}/{timestamp.year}/{timestamp.month - 1:02d}/{timestamp.day:02d}/{timestamp.hour:02d}h_ticks.bi5"
-        df = DataDownloader.download_bi5_to_df(url)
-        df["date"] = df["date"].apply(lambda milsec: timestamp + relativedelta(microseconds=milsec * 1000))
-        df.set_index("date", inplace=True)
-        df["ask"] = df["ask"].apply(lambda quote: quote / 1000)
-        df["bid"] = df["bid"].apply(lambda quote: quote / 1000)
-        df["mid"] = (df["ask"] + df["bid"]) / 2
-        df["spread"] = df["ask"] - df["bid"]
+    def decode_bi5(decompressed: bytes, timestamp: datetime) -> pd.DataFrame:
+        records = np.frombuffer(decompressed, dtype=DataDownloader.FILE_DTYPE, count=len(decompressed) // DataDownloader.FILE_DTYPE.itemsize)
+        offsets = records["date"].astype(np.int64).astype("timedelta64[ms]")
+        index = pd.DatetimeIndex(np.datetime64(pd.Timestamp(timestamp), "ns") + offsets, name="date")
+        ask = records["ask"] / DataDownloader.PRICE_SCALE
+        bid = records["bid"] / DataDownloader.PRICE_SCALE
+        df = pd.DataFrame(
+            data={
+                "ask": ask,
+                "bid": bid,
+                "ask_vol": records["ask_vol"].astype(np.float64),
+                "bid_vol": records["bid_vol"].astype(np.float64),
+                "mid": (ask + bid) / 2,
+                "spread": ask - bid,
+            },
+            index=index,
+        )
         if df.empty:
             df.loc[timestamp] = np.nan
         return df
-
-    @staticmethod
-    def download_bi5_to_df(url):
-        data = []
-        for i in range(10):
-            try:
-                with requests.get(url, stream=True) as res:
-                    rawdata = res.content
-                    decomp = lzma.LZMADecompressor(lzma.FORMAT_AUTO, None, None)
-                    decompresseddata = decomp.decompress(rawdata)
-                    for i in range(0, int(len(decompresseddata) / 20)):
-                        data.append(struct.unpack(DataDownloader.FILE_FORMAT, decompresseddata[i * 20 : (i + 1) * 20]))
-                break
-            except:
-                pass
-        else:
-            print(f"Could not download data: {url}")
-        return pd.DataFrame(data=data, columns=["date", "ask", "bid", "ask_vol", "bid_vol"])
@@ -18,6 +18,10 @@ class DataFile:
         self.start_date: datetime = df_ts.index[0]
         self.end_date: datetime = df_ts.index[-1]
 
+    @property
+    def nbytes(self) -> int:
+        return int(self._df.memory_usage(index=True).sum())
+
     def strip(self, end_date: datetime) -> "DataFile":
         return DataFile(ticker=self.ticker, df_ts=self._df.loc[self._df.index <= end_date])
 
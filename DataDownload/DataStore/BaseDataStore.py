@@ -4,29 +4,94 @@ from datetime import date, datetime
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 
+from ..Bi5Cache import Bi5Cache
 from ..DataDownloader import DataDownloader
+from ..DownloadManifest import DownloadManifest
+from ..PartitionStore import PartitionStore
+from ..ColumnDataFile import ColumnDataFile
+from ..CompactDataFile import CompactDataFile
 from ..DataFile import DataFile
 from Backtesting.BacktestResult import BacktestResult
 from Backtesting.AggBacktestResult import AggBacktestResult
 
 
 class BaseDataStore(ABC):
-    def __init__(self, ticker: str, num_threads: int = 1):
+    def __init__(self, ticker: str, num_threads: int = 1, bi5_cache: None | Bi5Cache = None):
         self.ticker = ticker
         self.num_threads = num_threads
+        self.bi5_cache = bi5_cache
 
     @abstractmethod
     def ts_file_exists(self) -> bool:
         raise NotImplementedError
 
     @abstractmethod
-    def download_ts(self) -> pd.DataFrame:
+    def download_ts(self, start_date: None | date = None, end_date: None | date = None) -> pd.DataFrame:
         raise NotImplementedError
 
+    @staticmethod
+    def slice_ts(df: pd.DataFrame, start_date: None | date = None, end_date: None | date = None) -> pd.DataFrame:
+        if start_date is None and end_date is None:
+            return df
+        start = df.index.searchsorted(pd.Timestamp(start_date), side="left") if start_date is not None else 0
+        end = df.index.searchsorted(pd.Timestamp(end_date + relativedelta(days=1)), side="left") if end_date is not None else len(df)
+        return df.iloc[start:end]
+
     @abstractmethod
     def upload_ts(self, df: pd.DataFrame) -> None:
         raise NotImplementedError
 
+    def read_manifest(self) -> None | DownloadManifest:
+        # stored manifest, None if the store has none yet
+        return None
+
+    def upload_manifest(self, manifest: DownloadManifest) -> None:
+        pass
+
+    def download_manifest(self, start_date: None | date = None, end_date: None | date = None) -> DownloadManifest:
+        manifest = self.read_manifest()
+        manifest = manifest if manifest is not None else DownloadManifest()
+        if start_date is None or end_date is None:
+            return manifest
+        # days the manifest does not know yet (e.g. stored before the manifest existed) are derived from the ts of these days only
+        days = [day for day in pd.date_range(start_date, end_date, freq="D").date if day.strftime(DownloadManifest.DAY_FORMAT) not in manifest.days]
+        if days and self.ts_file_exists():
+            manifest.update_from_ts(self.download_ts(start_date=days[0], end_date=days[-1]), days)
+        return manifest
+
+    @staticmethod
+    def merge_ts(df_ts: None | pd.DataFrame, df: pd.DataFrame, hours: list[datetime], previous_bid: None | float = None) -> pd.DataFrame:
+        # the stored rows before the first appended hour keep their returns and sell_costs, the columns are only computed from there on
+        # previous_bid is the bid of the last valid tick before df_ts
+        df = df.loc[:, PartitionStore.COLUMNS]
+        if df_ts is None or df_ts.empty:
+            head, tail = None, df
+        else:
+            if not df_ts.index.is_monotonic_increasing:
+                df_ts = df_ts.sort_index(kind="stable")
+            split = df_ts.index.searchsorted(pd.Timestamp(min(hours)), side="left") if {"returns", "sell_costs"} <= set(df_ts.columns) else 0
+            head, tail = df_ts.iloc[:split], df_ts.iloc[split:]
+            tail = tail.loc[~tail.index.floor("h").isin(pd.DatetimeIndex(hours)), PartitionStore.COLUMNS]
+            tail = pd.concat([tail, df], axis="index", sort=False)
+            valid_bids = head.loc[head.loc[:, PartitionStore.COLUMNS].notna().all(axis="columns").to_numpy(), "bid"]
+            previous_bid = float(valid_bids.iloc[-1]) if len(valid_bids) else previous_bid
+        if not tail.index.is_monotonic_increasing:
+            tail = tail.sort_index(kind="stable")
+        tail = DataDownloader.calc_columns(tail, previous_bid=previous_bid)
+        if head is None or head.empty:
+            return tail
+        return pd.concat([head.loc[:, tail.columns], tail], axis="index", sort=False)
+
+    def append_ts(self, df: pd.DataFrame, hours: list[datetime]) -> None:
+        # single file stores are read and written as a whole, only the columns of the appended hours and later ticks are computed
+        df_ts = self.download_ts() if self.ts_file_exists() else None
+        self.upload_ts(df=BaseDataStore.merge_ts(df_ts, df, hours))
+
+    def download_hours(self, hours: list[datetime], manifest: DownloadManifest) -> None:
+        # the hours are staged on disk and only the frame of their days is appended to the stored ts
+        df_new = DataDownloader.download_hours(ticker=self.ticker, hours=hours, num_threads=self.num_threads, cache=self.bi5_cache, manifest=manifest)
+        self.append_ts(df=df_new, hours=hours)
+
     @abstractmethod
     def download_backtest(self, start_date, end_date, strategy_name, from_ts: bool = True) -> dict[str, pd.DataFrame]:
         raise NotImplementedError
@@ -38,34 +103,41 @@ class BaseDataStore(ABC):
     def upload_agg_backtest(self, agg_backtest_result: AggBacktestResult, with_plot: bool = True) -> None:
         raise NotImplementedError
 
-    def create_datafile(self, start_date: date = None, end_date: date = None) -> DataFile:
-        if self.ts_file_exists():
-            df_ts = self.download_ts()
-            print(f"Stored Ts has {len(df_ts)} rows")
-            dates = df_ts.index
-            df_first_date, df_last_date = dates[0].date(), dates[-1].date()
-            if start_date < df_first_date or df_last_date < end_date:
-                # build new bigger AggregateDF and store
-                df_ts = DataDownloader.download_data(
-                    ticker=self.ticker,
-                    start_date=start_date,
-                    end_date=end_date,
-                    df=df_ts,
-                    num_threads=self.num_threads,
-                )
-                self.upload_ts(df=df_ts)
-            start_date, end_date = pd.to_datetime((start_date, end_date + relativedelta(days=1, microseconds=-1)))
-            df_ts = df_ts.loc[(start_date <= df_ts.index) & (df_ts.index <= end_date)]
+    def create_datafile(self, start_date: date = None, end_date: date = None, memmap: bool = False, compact: bool = False, update: bool = True) -> DataFile:
+        # update=False only reads the stored ts, for processes that share the store with others which already updated the range
+        if update:
+            manifest = self.update_ts(start_date=start_date, end_date=end_date)
         else:
-            df_ts = DataDownloader.download_data(
-                ticker=self.ticker,
-                start_date=start_date,
-                end_date=end_date,
-                num_threads=self.num_threads,
-            )
-            self.upload_ts(df=df_ts)
+            manifest = self.download_manifest(*DataDownloader.clamp_dates(start_date, end_date))
+        if memmap:
+            folder = ColumnDataFile.memmap_folder(self.ticker, start_date, end_date, suffix=CompactDataFile.MEMMAP_SUFFIX if compact else "")
+            file_class = CompactDataFile if compact else ColumnDataFile
+            # the snapshot is written again once hours of its range were downloaded or repaired since it was written
+            fingerprint = manifest.digest(*DataDownloader.clamp_dates(start_date, end_date))
+            if ColumnDataFile.memmap_fingerprint(folder) != fingerprint:
+                file_class.from_data_file(self.load_datafile(start_date=start_date, end_date=end_date)).write_memmap(folder, fingerprint=fingerprint)
+            print(f"Memory mapped Datafile opened from <{folder}>")
+            return file_class.open_memmap(ticker=self.ticker, folder=folder)
+        return self.load_datafile(start_date=start_date, end_date=end_date, compact=compact)
+
+    def update_ts(self, start_date: date, end_date: date) -> DownloadManifest:
+        # downloads the missing and failed hours of the range into the stored ts
+        start_date, end_date = DataDownloader.clamp_dates(start_date, end_date)
+        manifest = self.download_manifest(start_date=start_date, end_date=end_date)
+        hours = manifest.todo(start_date, end_date)
+        print(f"Manifest of {self.ticker} between <{start_date}> and <{end_date}>: {manifest.summary(start_date, end_date)}, {len(hours)} hours to download")
+        if hours:
+            self.download_hours(hours=hours, manifest=manifest)
+        # also stored when nothing was downloaded, so the days derived from the ts are not derived again
+        self.upload_manifest(manifest)
+        return manifest
+
+    def load_datafile(self, start_date: date = None, end_date: date = None, compact: bool = False) -> DataFile:
+        df_ts = self.download_ts(start_date=start_date, end_date=end_date)
         print(f"Datafile has been created with {len(df_ts)} number of rows starting at <{df_ts.index[0]}> and ending at {df_ts.index[-1]}")
-        df_ts.dropna(how="any", axis="rows", inplace=True)
+        df_ts = df_ts.dropna(how="any", axis="rows")
+        if compact:
+            return CompactDataFile.from_df(ticker=self.ticker, df_ts=df_ts)
         return DataFile(ticker=self.ticker, df_ts=df_ts)
 
     def create_backtest_result(self, start_date: date, end_date: date, strategy_name: str, from_ts: bool = True) -> BacktestResult:
@@ -10,14 +10,16 @@ from matplotlib import ticker
 from Backtesting.AggBacktestResult import AggBacktestResult
 from Backtesting.BacktestResult import BacktestResult
 from . import BaseDataStore
+from ..Bi5Cache import Bi5Cache
 from ..DataDownloader import DataDownloader
+from ..DownloadManifest import DownloadManifest
 
 
 class BucketDataStore(BaseDataStore):
     AUTHENTICATOR_FILE_PATH: str = f"{os.path.dirname(__file__)}/../../google_cloud_authentication.json"
 
-    def __init__(self, ticker: str, num_threads: int = 1):
-        super().__init__(ticker, num_threads)
+    def __init__(self, ticker: str, num_threads: int = 1, bi5_cache: None | Bi5Cache = None):
+        super().__init__(ticker, num_threads, bi5_cache=bi5_cache)
         if self._has_authentication_json():
             client = storage.Client.from_service_account_json(BucketDataStore.AUTHENTICATOR_FILE_PATH)
         else:
@@ -28,6 +30,7 @@ class BucketDataStore(BaseDataStore):
                 exit()
         self.bucket = client.get_bucket("mkauwetter-datascience-bucket")
         self.data_blob = self.bucket.blob(f"Data/{ticker}.csv")
+        self.manifest_blob = self.bucket.blob(f"Data/{ticker}_manifest.json")
 
     @staticmethod
     def _has_authentication_json() -> bool:
@@ -36,7 +39,7 @@ class BucketDataStore(BaseDataStore):
     def ts_file_exists(self) -> bool:
         return self.data_blob.exists()
 
-    def download_ts(self) -> pd.DataFrame:
+    def download_ts(self, start_date: None | date = None, end_date: None | date = None) -> pd.DataFrame:
         start_time = datetime.now()
         print(f"Start blob download at <{start_time}>")
         df = pd.read_csv(
@@ -45,6 +48,7 @@ class BucketDataStore(BaseDataStore):
             parse_dates=["date"],
             index_col="date",
         )
+        df = BaseDataStore.slice_ts(df, start_date=start_date, end_date=end_date)
         end_time = datetime.now()
         print(f"End blob download at <{end_time}> within <{end_time - start_time}>")
         return df
@@ -60,6 +64,14 @@ class BucketDataStore(BaseDataStore):
         end_time = datetime.now()
         print(f"End blob upload at <{end_time}> within <{end_time - start_time}>")
 
+    def read_manifest(self) -> None | DownloadManifest:
+        if not self.manifest_blob.exists():
+            return None
+        return DownloadManifest.from_json(self.manifest_blob.download_as_bytes())
+
+    def upload_manifest(self, manifest: DownloadManifest) -> None:
+        self.manifest_blob.upload_from_string(manifest.to_json(), content_type="application/json")
+
     def download_backtest(self, start_date: date, end_date: date, strategy_name: str) -> dict[str, pd.DataFrame]:
         name = f"{self.ticker}-{start_date.strftime(DataDownloader.DATE_FILE_FORMAT)}-{end_date.strftime(DataDownloader.DATE_FILE_FORMAT)}-{strategy_name}"
         backtest_ts_blob = self.bucket.blob(f"Backtest/{name}|ts.csv")
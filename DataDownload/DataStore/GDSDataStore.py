@@ -1,3 +1,5 @@
+from datetime import date
+
 import pandas as pd
 
 from Backtesting.BacktestResult import BacktestResult
@@ -8,7 +10,7 @@ class GDSDataStore(BaseDataStore):
     def ts_file_exists(self) -> bool:
         pass
 
-    def download_ts(self) -> pd.DataFrame:
+    def download_ts(self, start_date: None | date = None, end_date: None | date = None) -> pd.DataFrame:
         pass
 
     def upload_ts(self, df: pd.DataFrame) -> None:
@@ -0,0 +1,56 @@
+import os
+import threading
+
+
+class LocalBlob:
+    def __init__(self, bucket: "LocalBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+        self.path = f"{bucket.folder}/{name}"
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def upload_from_string(self, data: str | bytes, content_type: None | str = None, timeout: None | float = None) -> None:
+        data = data.encode() if isinstance(data, str) else data
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, self.path)
+        self.bucket.count_upload(len(data))
+
+    def download_as_bytes(self) -> bytes:
+        with open(self.path, "rb") as file:
+            return file.read()
+
+    def delete(self) -> None:
+        os.remove(self.path)
+
+
+class LocalBucket:
+    FOLDER: str = f"{os.path.dirname(__file__)}/../../Data/LocalBucket"
+
+    def __init__(self, folder: str = FOLDER):
+        self.folder = folder
+        self.uploaded_bytes = 0
+        self.uploads = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.folder, exist_ok=True)
+
+    def count_upload(self, num_bytes: int) -> None:
+        with self._lock:
+            self.uploaded_bytes += num_bytes
+            self.uploads += 1
+
+    def blob(self, name: str) -> LocalBlob:
+        return LocalBlob(self, name)
+
+    def list_blobs(self, prefix: str = "") -> list[LocalBlob]:
+        blobs = []
+        for root, _, files in os.walk(self.folder):
+            for file in files:
+                name = os.path.relpath(f"{root}/{file}", self.folder).replace(os.sep, "/")
+                if name.startswith(prefix) and not name.endswith(".tmp"):
+                    blobs.append(LocalBlob(self, name))
+        return sorted(blobs, key=lambda blob: blob.name)
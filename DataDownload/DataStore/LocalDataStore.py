@@ -6,41 +6,140 @@ import pandas as pd
 from Backtesting.AggBacktestResult import AggBacktestResult
 from Backtesting.BacktestResult import BacktestResult
 from . import BaseDataStore
+from ..Bi5Cache import Bi5Cache
 from ..DataDownloader import DataDownloader
+from ..DownloadManifest import DownloadManifest
+from ..PartitionStore import PartitionStore
 
 
 class LocalDataStore(BaseDataStore):
     AGG_DATA_FOLDER: str = f"{os.path.dirname(__file__)}/../../Data/AggregatedCSVs"
+    AGG_NPY_FOLDER: str = f"{os.path.dirname(__file__)}/../../Data/AggregatedNpy"
+    MANIFEST_FILE: str = "manifest.json"
+    FILE_FORMATS: list[str] = ["csv", "npy"]
     BACKTEST_FOLDER: str = f"{os.path.dirname(__file__)}/../../Data/Backtest"
     AGG_BACKTEST_FOLDER: str = f"{os.path.dirname(__file__)}/../../Data/AggBacktest"
 
-    def __init__(self, ticker: str, num_threads: int = 1):
-        super().__init__(ticker, num_threads=num_threads)
-        self.file_path_ts = f"{LocalDataStore.AGG_DATA_FOLDER}/{self.ticker}_ts.csv"
+    def __init__(
+        self,
+        ticker: str,
+        num_threads: int = 1,
+        bi5_cache: None | Bi5Cache = None,
+        file_format: str = "npy",
+        agg_data_folder: None | str = None,
+        agg_npy_folder: None | str = None,
+    ):
+        super().__init__(ticker, num_threads=num_threads, bi5_cache=bi5_cache)
+        if file_format not in LocalDataStore.FILE_FORMATS:
+            raise ValueError(f"file_format must be one of {LocalDataStore.FILE_FORMATS} but was {file_format}")
+        self.file_path_ts = f"{agg_data_folder or LocalDataStore.AGG_DATA_FOLDER}/{self.ticker}_ts.csv"
+        self.folder_path_ts = f"{agg_npy_folder or LocalDataStore.AGG_NPY_FOLDER}/{self.ticker}"
+        # an npy folder without partitions does not hide an existing csv ts
+        if file_format == "npy" and not self.partition_store.days() and os.path.exists(self.file_path_ts):
+            print(f"Only a csv ts exists for {self.ticker}, using csv. Run `python -m DataDownload.DataStore.MigrateLocalTs {self.ticker}` to convert it")
+            file_format = "csv"
+        self.file_format = file_format
+
+    @property
+    def partition_store(self) -> PartitionStore:
+        return PartitionStore(self.folder_path_ts)
 
     def ts_file_exists(self) -> bool:
+        if self.file_format == "npy":
+            return 0 < len(self.partition_store.days())
         return os.path.exists(self.file_path_ts)
 
-    def download_ts(self) -> pd.DataFrame:
+    def download_ts(self, start_date: None | date = None, end_date: None | date = None) -> pd.DataFrame:
         start_time = datetime.now()
-        print(f"Start local download at <{start_time}>")
-        df = pd.read_csv(
-            filepath_or_buffer=self.file_path_ts,
-            sep=DataDownloader.SEPARATOR,
-            parse_dates=["date"],
-            index_col="date",
-        )
+        print(f"Start local {self.file_format} download at <{start_time}>")
+        if self.file_format == "npy":
+            store = self.partition_store
+            df = store.read(start_date=start_date, end_date=end_date)
+            previous_bid = store.last_valid("bid", before=start_date) if start_date is not None else None
+            df = DataDownloader.calc_columns(df, previous_bid=previous_bid)
+        else:
+            df = pd.read_csv(
+                filepath_or_buffer=self.file_path_ts,
+                sep=DataDownloader.SEPARATOR,
+                parse_dates=["date"],
+                index_col="date",
+            )
+            df = BaseDataStore.slice_ts(df, start_date=start_date, end_date=end_date)
         end_time = datetime.now()
         print(f"End local download at <{end_time}> within <{end_time - start_time}>")
         return df
 
     def upload_ts(self, df: pd.DataFrame) -> None:
         start_time = datetime.now()
-        print(f"Start local upload at <{start_time}>")
-        df.to_csv(path_or_buf=self.file_path_ts, index=True, sep=DataDownloader.SEPARATOR)
+        print(f"Start local {self.file_format} upload at <{start_time}>")
+        if self.file_format == "npy":
+            self.partition_store.write(df)
+        else:
+            os.makedirs(os.path.dirname(self.file_path_ts), exist_ok=True)
+            df.to_csv(path_or_buf=self.file_path_ts, index=True, sep=DataDownloader.SEPARATOR)
         end_time = datetime.now()
         print(f"End local upload at <{end_time}> within <{end_time - start_time}>")
 
+    def append_ts(self, df: pd.DataFrame, hours: list[datetime]) -> None:
+        if self.file_format != "npy":
+            return super().append_ts(df=df, hours=hours)
+        start_time = datetime.now()
+        print(f"Start local npy append at <{start_time}>")
+        days = self.partition_store.append(df, replace_hours=hours)
+        end_time = datetime.now()
+        print(f"End local npy append of {len(days)} partitions at <{end_time}> within <{end_time - start_time}>")
+
+    def download_hours(self, hours: list[datetime], manifest: DownloadManifest) -> None:
+        if self.file_format != "npy":
+            return super().download_hours(hours=hours, manifest=manifest)
+        # every completed day is merged into its partition right away, no frame of the downloaded hours is assembled
+        DataDownloader.download_hours_into(ticker=self.ticker, hours=hours, store=self.partition_store, num_threads=self.num_threads, cache=self.bi5_cache, manifest=manifest, append=True)
+
+    @property
+    def manifest_path(self) -> str:
+        if self.file_format == "npy":
+            return f"{self.folder_path_ts}/{LocalDataStore.MANIFEST_FILE}"
+        return self.csv_manifest_path
+
+    @property
+    def csv_manifest_path(self) -> str:
+        return f"{self.file_path_ts.removesuffix('_ts.csv')}_{LocalDataStore.MANIFEST_FILE}"
+
+    def read_manifest(self) -> None | DownloadManifest:
+        if not os.path.exists(self.manifest_path):
+            return None
+        with open(self.manifest_path, "r") as file:
+            return DownloadManifest.from_json(file.read())
+
+    def upload_manifest(self, manifest: DownloadManifest) -> None:
+        path = self.manifest_path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.{os.getpid()}.tmp", "w") as file:
+            file.write(manifest.to_json())
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+    def migrate_csv_to_npy(self, chunksize: int = 1_000_000, delete_csv: bool = False) -> None:
+        start_time = datetime.now()
+        print(f"Start migrating {self.file_path_ts} to {self.folder_path_ts} at <{start_time}>")
+        store = self.partition_store
+        carry = None
+        for chunk in pd.read_csv(self.file_path_ts, sep=DataDownloader.SEPARATOR, parse_dates=["date"], index_col="date", chunksize=chunksize):
+            chunk = chunk if carry is None else pd.concat([carry, chunk], axis="index")
+            last_day = chunk.index[-1].normalize()
+            store.write(chunk.loc[chunk.index < last_day])
+            carry = chunk.loc[last_day <= chunk.index]
+        if carry is not None and not carry.empty:
+            store.write(carry)
+        if delete_csv:
+            os.remove(self.file_path_ts)
+        self.file_format = "npy"
+        # the manifest moves with the ts, else the all-NaN hours would be derived as unknown and downloaded once more
+        if os.path.exists(self.csv_manifest_path):
+            os.makedirs(self.folder_path_ts, exist_ok=True)
+            os.replace(self.csv_manifest_path, self.manifest_path)
+        end_time = datetime.now()
+        print(f"End migrating at <{end_time}> within <{end_time - start_time}>")
+
     def download_backtest(self, start_date: date, end_date: date, strategy_name: str, from_ts: bool = True) -> dict[str, pd.DataFrame]:
         name = f"{self.ticker}-{start_date.strftime(DataDownloader.DATE_FILE_FORMAT)}-{end_date.strftime(DataDownloader.DATE_FILE_FORMAT)}-{strategy_name}"
         start_time = datetime.now()
@@ -0,0 +1,16 @@
+import os
+import sys
+
+from .LocalDataStore import LocalDataStore
+
+if __name__ == "__main__":
+    tickers = sys.argv[1:]
+    if len(tickers) == 0 and os.path.exists(LocalDataStore.AGG_DATA_FOLDER):
+        tickers = [file[: -len("_ts.csv")] for file in sorted(os.listdir(LocalDataStore.AGG_DATA_FOLDER)) if file.endswith("_ts.csv")]
+    delete_csv = eval(os.getenv("DELETE_CSV", "False"))
+    for ticker in tickers:
+        data_store = LocalDataStore(ticker=ticker, file_format="csv")
+        if not data_store.ts_file_exists():
+            print(f"No csv ts found for {ticker}")
+            continue
+        data_store.migrate_csv_to_npy(delete_csv=delete_csv)
@@ -1,26 +1,38 @@
+import hashlib
 import io
+import json
 import os
 import threading
-import time
 from datetime import datetime, date
 
 import numpy as np
 import pandas as pd
 import psutil
+from dateutil.relativedelta import relativedelta
 from google.cloud import storage
 
 from Backtesting.AggBacktestResult import AggBacktestResult
 from Backtesting.BacktestResult import BacktestResult
 from . import BaseDataStore
+from ..Bi5Cache import Bi5Cache
 from ..DataDownloader import DataDownloader
+from ..DownloadManifest import DownloadManifest
+from ..PartitionStore import PartitionStore
+from .LocalBucket import LocalBucket
 
 
 class SplitBucketDataStore(BaseDataStore):
     AUTHENTICATOR_FILE_PATH: str = f"{os.path.dirname(__file__)}/../../google_cloud_authentication.json"
+    CHECKSUM_FILE: str = "checksums.json"
+    MANIFEST_FILE: str = "manifest.json"
     # Developed by Maximilian Kauwetter
 
-    def __init__(self, ticker: str, num_threads: int = 1):
-        super().__init__(ticker, num_threads)
+    def __init__(self, ticker: str, num_threads: int = 1, bi5_cache: None | Bi5Cache = None, bucket: None | LocalBucket = None):
+        super().__init__(ticker, num_threads, bi5_cache=bi5_cache)
+        self.folder = f"Data/{self.ticker}"
+        if bucket is not None:
+            self.bucket = bucket
+            return
         if self._has_authentication_json():
             client = storage.Client.from_service_account_json(SplitBucketDataStore.AUTHENTICATOR_FILE_PATH)
         else:
@@ -35,8 +47,11 @@ class SplitBucketDataStore(BaseDataStore):
     def _has_authentication_json() -> bool:
         return os.path.exists(SplitBucketDataStore.AUTHENTICATOR_FILE_PATH)
 
+    def _partition_blob_names(self) -> list[str]:
+        return [blob.name for blob in self.bucket.list_blobs(prefix=f"{self.folder}/") if blob.name.endswith(".csv")]
+
     def ts_file_exists(self) -> bool:
-        return 0 < len(list(self.bucket.list_blobs(prefix=f"Data/{self.ticker}/")))
+        return 0 < len(self._partition_blob_names())
 
     def download_dfs(self, blob_names, final):
         for blob_name in blob_names:
@@ -46,13 +61,30 @@ class SplitBucketDataStore(BaseDataStore):
                 sep=DataDownloader.SEPARATOR,
                 parse_dates=["date"],
                 index_col="date",
+                float_precision="round_trip",
             )
 
-    def download_ts(self) -> pd.DataFrame:
+    @staticmethod
+    def _partition_span(blob_name: str) -> tuple[tuple[int, int], tuple[int, int]]:
+        # monthly partitions are named <YYYY>_<MM>.csv, older stores hold one <YYYY>.csv per year
+        parts = [int(part) for part in blob_name.split("/")[-1].split(".")[0].split("_")]
+        if len(parts) == 1:
+            return (parts[0], 1), (parts[0], 12)
+        return (parts[0], parts[1]), (parts[0], parts[1])
+
+    @staticmethod
+    def _blob_overlaps(blob_name: str, start_date: None | date, end_date: None | date) -> bool:
+        first, last = SplitBucketDataStore._partition_span(blob_name)
+        return (start_date is None or (start_date.year, start_date.month) <= last) and (end_date is None or first <= (end_date.year, end_date.month))
+
+    def download_ts(self, start_date: None | date = None, end_date: None | date = None) -> pd.DataFrame:
         start_time = datetime.now()
         print(f"Start blob download at <{start_time}>")
-        blob_names = [blob.name for blob in self.bucket.list_blobs(prefix=f"Data/{self.ticker}/")]
+        blob_names = self._partition_blob_names()
+        blob_names = [blob_name for blob_name in blob_names if SplitBucketDataStore._blob_overlaps(blob_name, start_date, end_date)]
         print(blob_names)
+        if len(blob_names) == 0:
+            return pd.DataFrame(columns=["ask", "bid", "ask_vol", "bid_vol", "mid", "spread", "returns", "sell_costs"], index=pd.DatetimeIndex([], name="date"))
         total_todo = len(blob_names)
         final: dict = dict.fromkeys(blob_names, None)
         threads = []
@@ -61,50 +93,137 @@ class SplitBucketDataStore(BaseDataStore):
             thread = threading.Thread(target=self.download_dfs, args=(arr, final))
             thread.start()
             threads.append(thread)
-        active_threads = 1
-        while 0 < active_threads:
+        while True:
             active_threads = sum([thread.is_alive() for thread in threads])
             empty = sum([df is None for df in final.values()])
             print(f"Downloading at <{datetime.now()}> done {total_todo-empty} downloads, {empty} todo , {active_threads} active threads")
-            time.sleep(5)
+            if active_threads == 0:
+                break
+            next(thread for thread in threads if thread.is_alive()).join(timeout=5)
 
         df = pd.concat(objs=final.values(), axis="index")
-        df.sort_index(inplace=True)
+        df.sort_index(inplace=True, kind="stable")
+        df = BaseDataStore.slice_ts(df, start_date=start_date, end_date=end_date)
         end_time = datetime.now()
         print(f"End blob download at <{end_time}> within <{end_time - start_time}>")
         return df
 
+    def _download_json(self, file_name: str) -> None | dict:
+        blob = self.bucket.blob(f"{self.folder}/{file_name}")
+        if not blob.exists():
+            return None
+        return json.loads(blob.download_as_bytes())
+
+    def _upload_json(self, file_name: str, content: str) -> None:
+        self.bucket.blob(f"{self.folder}/{file_name}").upload_from_string(content, content_type="application/json")
+
+    def read_manifest(self) -> None | DownloadManifest:
+        days = self._download_json(SplitBucketDataStore.MANIFEST_FILE)
+        return DownloadManifest(days) if days is not None else None
+
+    def upload_manifest(self, manifest: DownloadManifest) -> None:
+        self._upload_json(SplitBucketDataStore.MANIFEST_FILE, manifest.to_json())
+
+    @staticmethod
+    def split_months(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index(kind="stable")
+        keys = (df.index.year * 100 + df.index.month).to_numpy()
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(keys)) + 1, [len(df)]])
+        return {f"{keys[start] // 100}_{keys[start] % 100:02d}": df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if start != end}
+
+    @staticmethod
+    def partition_checksum(df: pd.DataFrame) -> str:
+        digest = hashlib.sha256(df.index.as_unit("ns").asi8.tobytes())
+        for column in df.columns:
+            values = df[column].to_numpy(dtype=np.float64, copy=True)
+            # NaN payloads differ between computed and parsed values
+            values[np.isnan(values)] = np.nan
+            digest.update(str(column).encode())
+            digest.update(values.tobytes())
+        return digest.hexdigest()
+
     def upload_dfs(self, to_upload: dict[str, pd.DataFrame], tracker: dict[str, bool] = None):
         if tracker is None:
             tracker = {}
-        for year, df in to_upload.items():
-            blob = self.bucket.blob(f"Data/{self.ticker}/{year}.csv")
+        for partition, df in to_upload.items():
+            blob = self.bucket.blob(f"{self.folder}/{partition}.csv")
             blob.upload_from_string(df.to_csv(index=True, sep=DataDownloader.SEPARATOR), content_type="text/csv")
-            tracker[year] = True
+            tracker[partition] = True
 
     def upload_ts(self, df: pd.DataFrame) -> None:
         start_time = datetime.now()
         print(f"Start split blob upload at <{start_time}>")
+        self.upload_partitions(SplitBucketDataStore.split_months(df), replace=True)
+        end_time = datetime.now()
+        print(f"End blob upload at <{end_time}> within <{end_time - start_time}>")
 
-        groups = df.groupby(df.index.year)
-        split = {str(group): groups.get_group(group) for group in groups.groups}
-        tracker: dict[str, bool] = dict.fromkeys(split.keys(), False)
-        total_todo = len(split)
+    def upload_partitions(self, split: dict[str, pd.DataFrame], replace: bool) -> None:
+        # uploads the partitions whose checksum changed, with replace=True the partitions not in split are deleted
+        stored_checksums = self._download_json(SplitBucketDataStore.CHECKSUM_FILE) or {}
+        checksums = {partition: SplitBucketDataStore.partition_checksum(part) for partition, part in split.items()}
+        existing = {blob_name.split("/")[-1].split(".")[0] for blob_name in self._partition_blob_names()}
+        changed = [partition for partition, checksum in checksums.items() if stored_checksums.get(partition) != checksum or partition not in existing]
+        print(f"{len(changed)} of {len(split)} partitions changed: {changed}")
+        tracker: dict[str, bool] = dict.fromkeys(changed, False)
+        total_todo = len(changed)
 
         threads = []
-        for arr in np.array_split(list(split.keys()), self.num_threads):
+        for arr in np.array_split(changed, min(self.num_threads, max(1, total_todo))):
             thread = threading.Thread(target=self.upload_dfs, args=({k: split[k] for k in arr}, tracker))
             thread.start()
             threads.append(thread)
-        active_threads = 1
-        while 0 < active_threads:
+        while True:
             active_threads = sum([thread.is_alive() for thread in threads])
             done = sum(tracker.values())
             print(f"Uploading at <{datetime.now()}> done {done} uploads, {total_todo-done} todo , {active_threads} active threads")
-            time.sleep(5)
+            if active_threads == 0:
+                break
+            next(thread for thread in threads if thread.is_alive()).join(timeout=5)
+        if done != total_todo:
+            raise RuntimeError(f"Only {done} of {total_todo} partitions of {self.ticker} have been uploaded")
+
+        if replace:
+            # yearly partitions of older stores and partitions no longer in the ts are replaced by the uploaded months
+            for partition in existing - checksums.keys():
+                self.bucket.blob(f"{self.folder}/{partition}.csv").delete()
+        else:
+            checksums = {**stored_checksums, **checksums}
+        self._upload_json(SplitBucketDataStore.CHECKSUM_FILE, json.dumps(checksums, indent=0, sort_keys=True))
         print(f"\nMemory before upload: {psutil.Process().memory_info().rss/1000000000:.2f} GB")
+
+    def _last_valid_bid(self, before: tuple[int, int]) -> None | float:
+        # bid of the last valid tick of the latest partition before the month
+        for blob_name in reversed(self._partition_blob_names()):
+            if SplitBucketDataStore._partition_span(blob_name)[1] < before:
+                final = {}
+                self.download_dfs([blob_name], final)
+                df = final[blob_name]
+                valid = df.loc[df.loc[:, PartitionStore.COLUMNS].notna().all(axis="columns").to_numpy(), "bid"]
+                if len(valid):
+                    return float(valid.iloc[-1])
+        return None
+
+    def append_ts(self, df: pd.DataFrame, hours: list[datetime]) -> None:
+        # only the months of the appended hours and the next stored month (its first return follows the last appended tick) are
+        # downloaded, merged and uploaded, the bid before them is read from the previous partition if the first month has none
+        blob_names = self._partition_blob_names()
+        first, last = min(hours), max(hours)
+        first_month, last_month = (first.year, first.month), (last.year, last.month)
+        spans = [SplitBucketDataStore._partition_span(blob_name) for blob_name in blob_names]
+        if any(span[0] != span[1] and span[0] <= last_month and first_month <= span[1] for span in spans):
+            # yearly partitions of older stores are replaced as a whole
+            return super().append_ts(df=df, hours=hours)
+        start_time = datetime.now()
+        print(f"Start split blob append of {len(hours)} hours at <{start_time}>")
+        later = [span[0] for span in spans if last_month < span[0]]
+        end_month = min(later) if later else last_month
+        df_ts = self.download_ts(start_date=date(*first_month, 1), end_date=date(*end_month, 1) + relativedelta(months=1, days=-1))
+        before_first = df_ts.loc[df_ts.index < pd.Timestamp(first), PartitionStore.COLUMNS]
+        previous_bid = None if before_first.notna().all(axis="columns").any() else self._last_valid_bid(first_month)
+        self.upload_partitions(SplitBucketDataStore.split_months(BaseDataStore.merge_ts(df_ts, df, hours, previous_bid=previous_bid)), replace=False)
         end_time = datetime.now()
-        print(f"End blob upload at <{end_time}> within <{end_time - start_time}>")
+        print(f"End split blob append at <{end_time}> within <{end_time - start_time}>")
 
     def download_backtest(self, start_date: date, end_date: date, strategy_name: str, from_ts: bool = True) -> dict[str, pd.DataFrame]:
         name = f"{self.ticker}-{start_date.strftime(DataDownloader.DATE_FILE_FORMAT)}-{end_date.strftime(DataDownloader.DATE_FILE_FORMAT)}-{strategy_name}"
@@ -0,0 +1,162 @@
+import lzma
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .Bi5Cache import Bi5Cache
+
+
+class DownloadEngine:
+    BASE_URL: str = "https://datafeed.dukascopy.com/datafeed"
+
+    def __init__(
+        self,
+        num_threads: int = 1,
+        cache: None | Bi5Cache = None,
+        max_retries: int = 10,
+        backoff: float = 0.5,
+        max_backoff: float = 30,
+        retry_budget: None | int = None,
+        timeout: float = 30,
+    ):
+        self.num_threads = max(1, num_threads)
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_budget = retry_budget
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._retries_left: int = 0
+        self.stats: dict[str, float] = {}
+
+    @staticmethod
+    def bi5_url(ticker: str, timestamp: datetime) -> str:
+        # Developed by Maximilian Kauwetter
+        return f"{DownloadEngine.BASE_URL}/{ticker}/{timestamp.year}/{timestamp.month - 1:02d}/{timestamp.day:02d}/{timestamp.hour:02d}h_ticks.bi5"
+
+    @staticmethod
+    def decompress_bi5(rawdata: bytes) -> bytes:
+        return lzma.LZMADecompressor(lzma.FORMAT_AUTO, None, None).decompress(rawdata)
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _count(self, **kwargs) -> None:
+        with self._lock:
+            for key, value in kwargs.items():
+                self.stats[key] = self.stats.get(key, 0) + value
+
+    def _take_retry(self) -> bool:
+        with self._lock:
+            if self._retries_left <= 0:
+                return False
+            self._retries_left -= 1
+            return True
+
+    def download_hour(self, session: requests.Session, ticker: str, timestamp: datetime) -> None | bytes:
+        url = DownloadEngine.bi5_url(ticker, timestamp)
+        if self.cache is not None:
+            rawdata = self.cache.get(ticker, timestamp)
+            if rawdata is not None:
+                try:
+                    decompressed = DownloadEngine.decompress_bi5(rawdata)
+                    self._count(cache_hits=1)
+                    return decompressed
+                except lzma.LZMAError:
+                    self.cache.remove(ticker, timestamp)
+            if self.cache.only_cache:
+                print(f"Not in cache: {url}")
+                return None
+
+        for attempt in range(self.max_retries):
+            try:
+                with session.get(url, timeout=self.timeout) as res:
+                    if 400 <= res.status_code < 500 and res.status_code != 429:
+                        print(f"Could not download data: {url} [{res.status_code}]")
+                        return None
+                    res.raise_for_status()
+                    rawdata = res.content
+                decompressed = DownloadEngine.decompress_bi5(rawdata)
+                self._count(downloaded_bytes=len(rawdata), requests=attempt + 1)
+                if self.cache is not None:
+                    self.cache.put(ticker, timestamp, rawdata)
+                return decompressed
+            except (requests.RequestException, lzma.LZMAError):
+                if attempt + 1 == self.max_retries or not self._take_retry():
+                    break
+                self._count(retries=1)
+                time.sleep(min(self.max_backoff, self.backoff * 2**attempt) * random.uniform(0.5, 1))
+        print(f"Could not download data: {url}")
+        return None
+
+    @staticmethod
+    def _report_failed(on_result: Callable[[datetime, None | bytes], None], ticker: str, timestamp: datetime) -> None:
+        try:
+            on_result(timestamp, None)
+        except Exception as e:
+            print(f"Could not report failed data: {DownloadEngine.bi5_url(ticker, timestamp)} [{e!r}]")
+
+    def _worker(self, ticker: str, todo: queue.Queue, on_result: Callable[[datetime, None | bytes], None], active: list[int], finished: threading.Event) -> None:
+        try:
+            with self._new_session() as session:
+                while True:
+                    try:
+                        timestamp = todo.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        decompressed = self.download_hour(session, ticker, timestamp)
+                        on_result(timestamp, decompressed)
+                    except Exception as e:
+                        # e.g. an undecodable payload, the hour is reported as failed and the worker goes on
+                        print(f"Could not process data: {DownloadEngine.bi5_url(ticker, timestamp)} [{e!r}]")
+                        decompressed = None
+                        self._report_failed(on_result, ticker, timestamp)
+                    self._count(done=1, failed=int(decompressed is None))
+        finally:
+            with self._lock:
+                active[0] -= 1
+                if active[0] == 0:
+                    finished.set()
+
+    def throughput(self) -> str:
+        elapsed = max(self.stats.get("elapsed", 0), 1e-9)
+        return (
+            f"{self.stats.get('done', 0) / elapsed:,.2f} hours/s, {self.stats.get('downloaded_bytes', 0) / 1000000 / elapsed:,.2f} MB/s, "
+            f"{int(self.stats.get('cache_hits', 0))} cache hits, {int(self.stats.get('retries', 0))} retries, {int(self.stats.get('failed', 0))} failed"
+        )
+
+    def run(self, ticker: str, timestamps: list[datetime], on_result: Callable[[datetime, None | bytes], None], log_delta: float = 5) -> dict[str, float]:
+        todo: queue.Queue = queue.Queue()
+        for timestamp in timestamps:
+            todo.put(timestamp)
+        total = len(timestamps)
+        self.stats = dict(done=0, failed=0, retries=0, requests=0, cache_hits=0, downloaded_bytes=0, elapsed=0)
+        self._retries_left = self.retry_budget if self.retry_budget is not None else max(100, total // 10)
+
+        start_time = time.perf_counter()
+        num_workers = min(self.num_threads, max(1, total))
+        active, finished = [num_workers], threading.Event()
+        threads = [threading.Thread(target=self._worker, args=(ticker, todo, on_result, active, finished)) for _ in range(num_workers)]
+        for thread in threads:
+            thread.start()
+        while not finished.wait(timeout=log_delta):
+            self.stats["elapsed"] = time.perf_counter() - start_time
+            done = int(self.stats["done"])
+            print(f"\rDownloaded {done}/{total} [{100 * done / max(total, 1):.2f}%] {self.throughput()}", end="")
+        for thread in threads:
+            thread.join()
+        self.stats["elapsed"] = time.perf_counter() - start_time
+        print(f"\nDownloaded {total} hours within {self.stats['elapsed']:,.2f}s: {self.throughput()}")
+        return self.stats
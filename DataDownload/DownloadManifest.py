@@ -0,0 +1,88 @@
+import hashlib
+import json
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+
+class DownloadManifest:
+    PRESENT: str = "P"
+    EMPTY: str = "E"
+    FAILED: str = "F"
+    UNKNOWN: str = "?"
+    MISSING: str = "-"
+    # hours downloaded (again) by todo()
+    TODO: tuple[str, ...] = (MISSING, FAILED, UNKNOWN)
+    DAY_FORMAT: str = "%Y_%m_%d"
+
+    def __init__(self, days: None | dict[str, str] = None):
+        self.days: dict[str, str] = dict(days) if days is not None else {}
+
+    @staticmethod
+    def _day_key(day: date) -> str:
+        return day.strftime(DownloadManifest.DAY_FORMAT)
+
+    def status(self, hour: datetime) -> str:
+        return self.days.get(DownloadManifest._day_key(hour), DownloadManifest.MISSING * 24)[hour.hour]
+
+    def set(self, hour: datetime, status: str) -> None:
+        key = DownloadManifest._day_key(hour)
+        statuses = self.days.get(key, DownloadManifest.MISSING * 24)
+        self.days[key] = statuses[: hour.hour] + status + statuses[hour.hour + 1 :]
+
+    def set_result(self, hour: datetime, num_ticks: None | int) -> None:
+        if num_ticks is None:
+            self.set(hour, DownloadManifest.FAILED)
+        else:
+            self.set(hour, DownloadManifest.PRESENT if 0 < num_ticks else DownloadManifest.EMPTY)
+
+    def todo(self, start_date: date, end_date: date) -> list[datetime]:
+        hours = []
+        day = start_date
+        while day <= end_date:
+            statuses = self.days.get(DownloadManifest._day_key(day), DownloadManifest.MISSING * 24)
+            hours.extend(datetime(day.year, day.month, day.day, hour) for hour, status in enumerate(statuses) if status in DownloadManifest.TODO)
+            day += timedelta(days=1)
+        return hours
+
+    def between(self, start_date: None | date = None, end_date: None | date = None) -> dict[str, str]:
+        start_key = DownloadManifest._day_key(start_date) if start_date is not None else ""
+        end_key = DownloadManifest._day_key(end_date) if end_date is not None else "9999"
+        return {key: statuses for key, statuses in sorted(self.days.items()) if start_key <= key <= end_key}
+
+    def digest(self, start_date: None | date = None, end_date: None | date = None) -> str:
+        # changes whenever an hour of the range is downloaded, repaired or fails
+        return hashlib.sha256(json.dumps(self.between(start_date, end_date)).encode()).hexdigest()
+
+    def summary(self, start_date: None | date = None, end_date: None | date = None) -> dict[str, int]:
+        statuses = "".join(self.between(start_date, end_date).values())
+        return {name: statuses.count(status) for name, status in (("present", DownloadManifest.PRESENT), ("empty", DownloadManifest.EMPTY), ("failed", DownloadManifest.FAILED), ("unknown", DownloadManifest.UNKNOWN))}
+
+    def to_json(self) -> str:
+        return json.dumps(dict(sorted(self.days.items())), indent=0)
+
+    @staticmethod
+    def from_json(text: str | bytes) -> "DownloadManifest":
+        return DownloadManifest(json.loads(text))
+
+    def update_from_ts(self, df: pd.DataFrame, days: list[date]) -> None:
+        # stored ts without a manifest only keep all-NaN rows for hours without ticks, failed and empty hours look alike
+        # so these hours are unknown and downloaded once more, hours without any row are missing
+        keys = {DownloadManifest._day_key(day) for day in days}
+        for key in keys:
+            self.days[key] = DownloadManifest.MISSING * 24
+        if df.empty:
+            return
+        hours = df.index.floor("h")
+        valid = df.loc[:, ["ask", "bid"]].notna().all(axis="columns").to_numpy()
+        for status, status_hours in ((DownloadManifest.UNKNOWN, hours[~valid].unique()), (DownloadManifest.PRESENT, hours[valid].unique())):
+            for hour in status_hours:
+                if DownloadManifest._day_key(hour) in keys:
+                    self.set(hour, status)
+
+    @staticmethod
+    def from_ts(df: pd.DataFrame) -> "DownloadManifest":
+        manifest = DownloadManifest()
+        if not df.empty:
+            manifest.update_from_ts(df, sorted(set(df.index.date)))
+        return manifest
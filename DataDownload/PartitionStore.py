@@ -0,0 +1,109 @@
+import os
+import shutil
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+class PartitionStore:
+    COLUMNS: list[str] = ["ask", "bid", "ask_vol", "bid_vol", "mid", "spread"]
+    DATE_COLUMN: str = "date"
+    PARTITION_FORMAT: str = "%Y_%m_%d"
+    NS_PER_DAY: int = 86_400_000_000_000
+    EPOCH: date = date(1970, 1, 1)
+
+    def __init__(self, folder: str, columns: None | list[str] = None):
+        self.folder = folder
+        self.columns: list[str] = list(columns) if columns is not None else PartitionStore.COLUMNS
+
+    def _partition_folder(self, day: date) -> str:
+        return f"{self.folder}/{day.year}/{day.strftime(PartitionStore.PARTITION_FORMAT)}"
+
+    def has_partition(self, day: date) -> bool:
+        return os.path.exists(f"{self._partition_folder(day)}/{PartitionStore.DATE_COLUMN}.npy")
+
+    def days(self) -> list[date]:
+        days = []
+        if not os.path.exists(self.folder):
+            return days
+        for year in os.listdir(self.folder):
+            if not year.isdigit():
+                continue
+            for partition in os.listdir(f"{self.folder}/{year}"):
+                if not partition.endswith(".tmp"):
+                    days.append(datetime.strptime(partition, PartitionStore.PARTITION_FORMAT).date())
+        return sorted(days)
+
+    def write_partition(self, day: date, df: pd.DataFrame) -> None:
+        folder = self._partition_folder(day)
+        tmp_folder = f"{folder}.{os.getpid()}.tmp"
+        os.makedirs(tmp_folder, exist_ok=True)
+        np.save(f"{tmp_folder}/{PartitionStore.DATE_COLUMN}.npy", df.index.as_unit("ns").asi8)
+        for column in self.columns:
+            np.save(f"{tmp_folder}/{column}.npy", df[column].to_numpy(dtype=np.float64))
+        if os.path.exists(folder):
+            shutil.rmtree(folder)
+        os.replace(tmp_folder, folder)
+
+    @staticmethod
+    def split_days(df: pd.DataFrame) -> list[tuple[date, pd.DataFrame]]:
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index(kind="stable")
+        dates = df.index.as_unit("ns").asi8
+        day_numbers = dates // PartitionStore.NS_PER_DAY
+        bounds = np.concatenate([[0], np.flatnonzero(np.diff(day_numbers)) + 1, [len(df)]])
+        return [(PartitionStore.EPOCH + timedelta(days=int(day_numbers[start])), df.iloc[start:end]) for start, end in zip(bounds[:-1], bounds[1:]) if start != end]
+
+    def write(self, df: pd.DataFrame) -> list[date]:
+        days = []
+        for day, day_df in PartitionStore.split_days(df):
+            self.write_partition(day, day_df)
+            days.append(day)
+        return days
+
+    def append(self, df: pd.DataFrame, replace_hours: None | list[datetime] = None) -> list[date]:
+        replace = pd.DatetimeIndex(replace_hours if replace_hours is not None else [])
+        days = []
+        for day, day_df in PartitionStore.split_days(df):
+            if self.has_partition(day):
+                existing = self.read_days([day])
+                existing = existing.loc[~existing.index.floor("h").isin(replace)]
+                day_df = pd.concat([existing, day_df.loc[:, self.columns]], axis="index", sort=False)
+                if not day_df.index.is_monotonic_increasing:
+                    day_df = day_df.sort_index(kind="stable")
+            self.write_partition(day, day_df)
+            days.append(day)
+        return days
+
+    def read_partition(self, day: date, column: str, mmap: bool = True) -> np.ndarray:
+        return np.load(f"{self._partition_folder(day)}/{column}.npy", mmap_mode="r" if mmap else None)
+
+    def read(self, start_date: None | date = None, end_date: None | date = None) -> pd.DataFrame:
+        return self.read_days([day for day in self.days() if (start_date is None or start_date <= day) and (end_date is None or day <= end_date)])
+
+    def read_days(self, days: list[date]) -> pd.DataFrame:
+        days = [day for day in sorted(days) if self.has_partition(day)]
+        lengths = [len(self.read_partition(day, PartitionStore.DATE_COLUMN)) for day in days]
+        offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+
+        dates = np.empty(offsets[-1], dtype=np.int64)
+        values = np.empty((len(self.columns), offsets[-1]), dtype=np.float64)
+        for day, start, end in zip(days, offsets[:-1], offsets[1:]):
+            dates[start:end] = self.read_partition(day, PartitionStore.DATE_COLUMN)
+            for i, column in enumerate(self.columns):
+                values[i, start:end] = self.read_partition(day, column)
+
+        index = pd.DatetimeIndex(dates.view("datetime64[ns]"), name=PartitionStore.DATE_COLUMN)
+        return pd.DataFrame(values.T, index=index, columns=self.columns, copy=False)
+
+    def last_valid(self, column: str, before: date) -> None | float:
+        for day in reversed([day for day in self.days() if day < before]):
+            values = self.read_partition(day, column)
+            valid = np.flatnonzero(~np.isnan(values))
+            if len(valid):
+                return float(values[valid[-1]])
+        return None
+
+    def delete(self) -> None:
+        shutil.rmtree(self.folder, ignore_errors=True)
@@ -0,0 +1,71 @@
+import sys
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .ColumnDataFile import ColumnDataFile
+from .DataFile import DataFile
+
+
+class SharedMemoryDataFile(ColumnDataFile):
+    # the dates and columns of a DataFile in one shared memory segment, published once by the owner and attached zero copy
+    # and read only by worker processes: pickling sends the segment name and the layout instead of the arrays
+    # close() (or the garbage collection of the owner) frees the segment, attached files only close their mapping
+    ALIGNMENT: int = 64
+
+    def __init__(self, ticker: str, segment: shared_memory.SharedMemory, layout: dict[str, tuple[str, int, int]], owner: bool):
+        arrays = {}
+        for name, (dtype, offset, length) in layout.items():
+            array = np.ndarray((length,), dtype=dtype, buffer=segment.buf, offset=offset)
+            array.flags.writeable = False
+            arrays[name] = array
+        dates = arrays.pop(ColumnDataFile.DATE_COLUMN)
+        super().__init__(ticker=ticker, dates=dates, columns=arrays)
+        self.segment = segment
+        self.layout = layout
+        self.owner = owner
+        self._finalizer = weakref.finalize(self, SharedMemoryDataFile._release, segment, owner)
+
+    @staticmethod
+    def publish(data_file: DataFile) -> "SharedMemoryDataFile":
+        source = data_file if isinstance(data_file, ColumnDataFile) else ColumnDataFile.from_data_file(data_file)
+        arrays = {ColumnDataFile.DATE_COLUMN: np.ascontiguousarray(source.dates, dtype=np.int64)}
+        arrays.update({name: np.ascontiguousarray(source._values(name)) for name in ColumnDataFile.COLUMNS})
+        layout, size = {}, 0
+        for name, array in arrays.items():
+            layout[name] = (array.dtype.str, size, len(array))
+            size += -(-array.nbytes // SharedMemoryDataFile.ALIGNMENT) * SharedMemoryDataFile.ALIGNMENT
+        segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, array in arrays.items():
+            dtype, offset, length = layout[name]
+            np.ndarray((length,), dtype=dtype, buffer=segment.buf, offset=offset)[:] = array
+        return SharedMemoryDataFile(ticker=data_file.ticker, segment=segment, layout=layout, owner=True)
+
+    @staticmethod
+    def attach(ticker: str, name: str, layout: dict[str, tuple[str, int, int]]) -> "SharedMemoryDataFile":
+        # only the owner unlinks the segment, newer Pythons can keep the resource tracker of the worker out of it
+        track = {"track": False} if (3, 13) <= sys.version_info else {}
+        return SharedMemoryDataFile(ticker=ticker, segment=shared_memory.SharedMemory(name=name, create=False, **track), layout=layout, owner=False)
+
+    def __reduce__(self):
+        return SharedMemoryDataFile.attach, (self.ticker, self.segment.name, self.layout)
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def __enter__(self) -> "SharedMemoryDataFile":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @staticmethod
+    def _release(segment: shared_memory.SharedMemory, owner: bool) -> None:
+        if owner:
+            segment.unlink()
+        try:
+            segment.close()
+        except BufferError:
+            # views of the columns are still alive, the mapping is closed together with the last of them
+            pass
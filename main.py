@@ -2,9 +2,9 @@ import os
 from datetime import datetime, date
 
 from Backtesting.AggBacktestResult import AggBacktestResult
-from Backtesting.Backtesting import Backtesting
+from Backtesting.BacktestScheduler import BacktestScheduler, DataSource
+from Backtesting.Indicator import IndicatorCache
 from Backtesting.Strategy import *
-from DataDownload.DataStore import SplitBucketDataStore, LocalDataStore
 
 if __name__ == "__main__":
     print("start")
@@ -14,8 +14,19 @@ if __name__ == "__main__":
     start_at_raw: str = os.getenv("START_AT", "0")
     end_date = os.getenv("END_DATE", "No end_date specified")
     num_threads = os.getenv("NUM_THREADS", "1")
+    num_processes = os.getenv("NUM_PROCESSES", "1")
+    memory_budget_gb = os.getenv("MEMORY_BUDGET_GB", "")
     calculate_backtest = eval(os.getenv("BACKTEST", "True"))
     ts_plot = eval(os.getenv("PLOT", "True"))
+    use_bi5_cache = eval(os.getenv("BI5_CACHE", "False"))
+    bi5_cache_only = eval(os.getenv("BI5_CACHE_ONLY", "False"))
+    bi5_cache_size_gb = float(os.getenv("BI5_CACHE_SIZE_GB", "10"))
+    memmap = eval(os.getenv("MEMMAP", "False"))
+    compact = eval(os.getenv("COMPACT", "False"))
+    use_indicator_cache = eval(os.getenv("INDICATOR_CACHE", "False"))
+    indicator_cache_size_gb = float(os.getenv("INDICATOR_CACHE_SIZE_GB", "2"))
+    indicator_cache_disk = eval(os.getenv("INDICATOR_CACHE_DISK", "False"))
+    indicator_cache_disk_size_gb = float(os.getenv("INDICATOR_CACHE_DISK_SIZE_GB", "10"))
 
     ticker_split = [t for t in ticker.split(";") if t not in [""]]
     start_at_split = [dt for dt in start_at_raw.split(";") if dt not in [""]]
@@ -67,6 +78,12 @@ if __name__ == "__main__":
     else:
         print(f"num_threads must be numeric but is: {num_threads}")
         exit()
+    if str.isnumeric(num_processes):
+        num_processes = int(num_processes)
+    else:
+        print(f"num_processes must be numeric but is: {num_processes}")
+        exit()
+    memory_budget = int(float(memory_budget_gb) * 1024**3) if memory_budget_gb != "" else None
 
     strategies: list[BaseStrategy] = []
     for strat_str in strategy.split(";"):
@@ -84,26 +101,40 @@ if __name__ == "__main__":
     print(f"Start At: {start_at}")
     print(f"End Date: {end_date}")
     print(f"Num Threads: {num_threads}")
+    print(f"Num Processes: {num_processes}")
 
-    for tic, start_dt, sta_at, end_dt in zip(ticker_split, start_date, start_at, end_date):
-        try:
-            data_store = SplitBucketDataStore(ticker=tic, num_threads=num_threads)
-        except Exception as e:
-            data_store = LocalDataStore(ticker=tic)
+    source = DataSource(num_threads=num_threads, memmap=memmap, compact=compact, bi5_cache=use_bi5_cache, bi5_cache_only=bi5_cache_only, bi5_cache_size_gb=bi5_cache_size_gb)
+    initializer, initargs = None, ()
+    if use_indicator_cache or indicator_cache_disk:
+        # activated here for the tasks run in this process and by the pool initializer in every worker process, only the disk tier is shared
+        cache_settings = dict(
+            max_bytes=int(indicator_cache_size_gb * 1024**3),
+            folder=IndicatorCache.FOLDER if indicator_cache_disk else None,
+            max_disk_bytes=int(indicator_cache_disk_size_gb * 1024**3),
+        )
+        IndicatorCache.activate_new(cache_settings)
+        initializer, initargs = IndicatorCache.activate_new, (cache_settings,)
 
-        data = data_store.create_datafile(start_date=start_dt, end_date=end_dt)
-
-        if calculate_backtest:
-            backtest_results = []
-            for strat in strategies:
-                backtesting = Backtesting(security=data, strategy=strat, start_at=sta_at, threads=num_threads, iterative=False)
-                data_store.upload_backtest(backtesting.result)
-                backtest_results.append(backtesting.result)
+    # (ticker, window, strategy) jobs, the results of the workers are uploaded and aggregated here as they come in
+    scheduler = BacktestScheduler(source, processes=num_processes, threads=num_threads, memory_budget=memory_budget, backtest=calculate_backtest, initializer=initializer, initargs=initargs)
+    datasets = list(zip(ticker_split, start_date, start_at, end_date))
+    data_stores = {}
+    for (tic, start_dt, sta_at, end_dt), results, mid, complete in scheduler.run(datasets, strategies):
+        if tic not in data_stores:
+            data_stores[tic] = source.data_store(tic)
+        data_store = data_stores[tic]
+        for result in results:
+            data_store.upload_backtest(result)
+        if not complete:
+            continue
 
         backtest_results = []
         for strat in strategies:
             backtest_results.append(data_store.create_backtest_result(start_date=sta_at, end_date=end_dt, strategy_name=strat.__class__.__name__, from_ts=ts_plot))
 
-        agg_res = AggBacktestResult(backtest_results, data_file=data, with_ts=ts_plot)
+        agg_res = AggBacktestResult(backtest_results, benchmark_mid=mid, with_ts=ts_plot)
         data_store.upload_agg_backtest(agg_res, ts_plot)
         print(agg_res.info)
+
+    if IndicatorCache.active is not None:
+        print(f"Indicator cache: {IndicatorCache.active.stats}")
@@ -0,0 +1,175 @@
+# the previous implementations of the indicators and strategy combinations, the kernels are tested and benchmarked against them
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from numba import jit, float64, int64
+
+from Backtesting.Indicator import (
+    ExponentialMovingAverageIndicator,
+    Indication,
+    SimpleAverageTrueRangeIndicator,
+    StochasticOscillatorIndicator,
+    BollingerBandsIndicator,
+)
+from Backtesting.Strategy import CombinationStrategy, GoldenCrossStrategy, TrendStrategy, VolatilityStrategy
+from DataDownload.DataFile import DataFile
+
+
+@jit(nopython=True, nogil=True)
+def legacy_atr_func(period: np.ndarray, n: int64) -> float64:
+    n = min(n, period.shape[0])
+    x = np.empty(n, dtype=np.float64)
+    arr = np.array_split(period, n)
+    for i in range(n):
+        ar = arr[i]
+        x[i] = max(ar.max(), ar.flat[0]) - min(ar.min(), ar.flat[0])
+    return x.mean()
+
+
+def legacy_atr(indicator: SimpleAverageTrueRangeIndicator, security: DataFile) -> pd.Series:
+    rolling = security.mid.rolling(window=indicator.timedelta_min_period)
+    selector = rolling.count().lt(indicator.min_period_ticks)
+    rolling_atr_period = security.mid.rolling(window=indicator.min_period_ticks, min_periods=1).apply(lambda x: legacy_atr_func(x.to_numpy(), indicator.n))
+    rolling_atr = rolling.apply(lambda x: legacy_atr_func(x.to_numpy(), indicator.n))
+    rolling_atr.loc[selector] = rolling_atr_period.loc[selector]
+    return rolling_atr
+
+
+@jit(nopython=True, nogil=True)
+def legacy_std_func(period: np.ndarray) -> float64:
+    return period.std()
+
+
+def legacy_std(indicator: BollingerBandsIndicator, security: DataFile) -> pd.Series:
+    pct_change = security.mid.pct_change()
+    std_period_rolling = pct_change.rolling(window=indicator.min_period_ticks, min_periods=1)
+    selector = std_period_rolling.count().lt(indicator.min_period_ticks)
+    std_period = std_period_rolling.apply(lambda x: legacy_std_func(x.to_numpy()))
+    std = pct_change.rolling(window=indicator.timedelta_min_period).apply(lambda x: legacy_std_func(x.to_numpy()))
+    std.loc[selector] = std_period.loc[selector]
+    return std
+
+
+@jit(nopython=True, nogil=True)
+def legacy_soi_func(period: np.ndarray) -> float64:
+    if len(period) == 0:
+        return 50
+    last = period[-1]
+    low = period.min()
+    hig = period.max()
+    if period.min() == period.max():
+        return 50
+    return 100 * (last - low) / (hig - low)
+
+
+def legacy_soi(indicator: StochasticOscillatorIndicator, security: DataFile) -> pd.Series:
+    rolling = security.mid.rolling(window=indicator.timedelta_min_period)
+    selector = rolling.count().lt(indicator.min_period_ticks)
+    soi_rolling = rolling.apply(lambda period: legacy_soi_func(period.to_numpy()))
+    soi_rolling_periods = security.mid.rolling(window=indicator.min_period_ticks, min_periods=1).apply(lambda period: legacy_soi_func(period.to_numpy()))
+    soi_rolling.loc[selector] = soi_rolling_periods.loc[selector]
+    return soi_rolling
+
+
+def legacy_soi_indication(indicator: StochasticOscillatorIndicator, security: DataFile) -> pd.Series:
+    return legacy_soi(indicator, security).apply(lambda x: Indication.SELL if x <= indicator.lower else Indication.BUY if indicator.upper <= x else Indication.HOLD)
+
+
+@jit(nopython=True, nogil=True)
+def legacy_ewma(arr_in, window) -> float64:
+    n = arr_in.shape[0]
+    ewma = np.empty(n, dtype=float64)
+    alpha = 2 / float(window + 1)
+    w = 1
+    ewma_old = arr_in[0]
+    ewma[0] = ewma_old
+    for i in range(1, n):
+        w += (1 - alpha) ** i
+        ewma_old = ewma_old * (1 - alpha) + arr_in[i]
+        ewma[i] = ewma_old / w
+    return ewma.mean()
+
+
+def legacy_ema(indicator: ExponentialMovingAverageIndicator, security: DataFile) -> pd.Series:
+    rolling = security.mid.rolling(window=indicator.timedelta_min_period)
+    selector = rolling.count().lt(indicator.min_period_ticks)
+    ema: pd.Series = rolling.apply(lambda x: legacy_ewma(x.to_numpy(), x.count()))
+    ema_period = security.mid.ewm(span=indicator.min_period_ticks, adjust=False).mean()
+    ema.loc[selector] = ema_period.loc[selector]
+    return ema
+
+
+def pandas_ewm(indicator: ExponentialMovingAverageIndicator, security: DataFile) -> pd.Series:
+    # the recursive modes replicate pandas ewm
+    if indicator.mode == ExponentialMovingAverageIndicator.SPAN:
+        return security.mid.ewm(span=indicator.span, adjust=False).mean()
+    return security.mid.ewm(halflife=indicator.timedelta_halflife, times=security.index).mean()
+
+
+def legacy_sma(security: DataFile, min_period: timedelta, min_period_ticks: int) -> np.ndarray:
+    rolling = security.mid.rolling(window=min_period)
+    selector = rolling.count().lt(min_period_ticks)
+    rolling = rolling.mean()
+    rolling_periods = security.mid.rolling(window=min_period_ticks, min_periods=1).mean()
+    rolling.loc[selector] = rolling_periods.loc[selector]
+    return rolling.to_numpy(dtype=np.float64)
+
+
+def legacy_rsi(security: DataFile, min_period: timedelta, min_period_ticks: int) -> np.ndarray:
+    diff = security.mid.diff()
+    gain = diff.clip(lower=0)
+    loss = -diff.clip(upper=0)
+    avg_loss_rolling = loss.rolling(window=min_period)
+    selector = avg_loss_rolling.count().lt(min_period_ticks)
+    avg_gain_periods = gain.rolling(window=min_period_ticks, min_periods=1).mean()
+    avg_loss_periods = loss.rolling(window=min_period_ticks, min_periods=1).mean()
+    avg_gain: pd.Series = gain.rolling(window=min_period).mean()
+    avg_loss: pd.Series = avg_loss_rolling.mean()
+    avg_gain.loc[selector] = avg_gain_periods.loc[selector]
+    avg_loss.loc[selector] = avg_loss_periods.loc[selector]
+    rs = avg_gain.divide(avg_loss).to_numpy()
+    return 100 - (100 / (rs + 1))
+
+
+def indications(signals: np.ndarray, index: pd.Index) -> pd.Series:
+    return Indication.from_signals(pd.Series(signals, index=index))
+
+
+def legacy_combination(strategy: CombinationStrategy, security: DataFile, values: dict[str, np.ndarray]) -> pd.Series:
+    df = pd.DataFrame({name: indications(values[name], security.index) for name in ["bb", "rsi", "so"]})
+    return df.apply(
+        lambda x: strategy.invest
+        if 2 <= x.to_list().count(Indication.BUY) and x.to_list().count(Indication.SELL) == 0
+        else 0
+        if 3 <= x.to_list().count(Indication.SELL) and x.to_list().count(Indication.BUY) == 0
+        else None,
+        axis="columns",
+    )
+
+
+def legacy_volatility(strategy: VolatilityStrategy, security: DataFile, values: dict[str, np.ndarray]) -> pd.Series:
+    df = pd.DataFrame({"atr_1h": values["atr_1h"], "atr_6h": values["atr_6h"]}, index=security.index)
+    df["bb"] = indications(values["bb"], security.index)
+    df["kc"] = indications(values["kc"], security.index)
+    return df.apply(
+        lambda x: strategy.invest
+        if 1 <= [x.bb, x.kc].count(Indication.BUY) and 0 == [x.bb, x.kc].count(Indication.SELL) and x.atr_6h < x.atr_1h
+        else 0
+        if 0 == [x.bb, x.kc].count(Indication.BUY) and 1 <= [x.bb, x.kc].count(Indication.SELL) and x.atr_6h < x.atr_1h
+        else None,
+        axis="columns",
+    )
+
+
+def legacy_trend(strategy: TrendStrategy, security: DataFile, values: dict[str, np.ndarray]) -> pd.Series:
+    df = pd.DataFrame(values, index=security.index)
+    return df.apply(
+        lambda x: 0 if x.sma_1 < x.sma_6 and x.price < x.ema_1 else strategy.invest if x.sma_6 < x.sma_1 and x.ema_1 < x.price else None,
+        axis="columns",
+    )
+
+
+def legacy_golden_cross(strategy: GoldenCrossStrategy, security: DataFile, values: dict[str, np.ndarray]) -> pd.Series:
+    df = pd.DataFrame(values, index=security.index)
+    return df.apply(lambda x: 0 if x.sma_1 < x.sma_6 else strategy.invest if x.sma_6 < x.sma_1 else None, axis="columns")
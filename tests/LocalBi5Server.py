@@ -0,0 +1,76 @@
+import lzma
+import threading
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from DataDownload.DataDownloader import DataDownloader
+from DataDownload.DownloadEngine import DownloadEngine
+
+
+def fake_bi5(num_ticks: int, seed: int = 0) -> bytes:
+    # lzma compressed hour file in the Dukascopy record layout
+    rng = np.random.default_rng(seed)
+    records = np.zeros(num_ticks, dtype=DataDownloader.FILE_DTYPE)
+    records["date"] = np.sort(rng.integers(0, 3_600_000, num_ticks))
+    records["bid"] = 110_000 + np.cumsum(rng.integers(-3, 4, num_ticks))
+    records["ask"] = records["bid"] + rng.integers(1, 20, num_ticks)
+    records["ask_vol"] = rng.random(num_ticks)
+    records["bid_vol"] = rng.random(num_ticks)
+    return lzma.compress(records.tobytes(), format=lzma.FORMAT_ALONE)
+
+
+class LocalBi5Server:
+    # stand-in for the Dukascopy datafeed on localhost, serves the hour files added with add() and 404 for all others
+    # hours in fail answer with 500, requests counts the requests per path
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+        self.fail: set[str] = set()
+        self.requests: Counter = Counter()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests[self.path] += 1
+                if self.path in server.fail:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                body = server.files.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def path(self, ticker: str, timestamp: datetime) -> str:
+        return DownloadEngine.bi5_url(ticker, timestamp)[len(DownloadEngine.BASE_URL) :]
+
+    def add(self, ticker: str, timestamp: datetime, raw: bytes) -> None:
+        self.files[self.path(ticker, timestamp)] = raw
+
+    def hour_requests(self, ticker: str, timestamp: datetime) -> int:
+        return self.requests[self.path(ticker, timestamp)]
+
+    def start(self) -> "LocalBi5Server":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from DataDownload.DataDownloader import DataDownloader
+from DataDownload.DataFile import DataFile
+from DataDownload.PartitionStore import PartitionStore
+
+
+def synthetic_ts(num_days: int = 5, ticks_per_day: int = 50_000, start: str = "2023-01-02", seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    num_ticks = num_days * ticks_per_day
+    day_starts = pd.date_range(start, periods=num_days, freq="D").as_unit("ns").asi8
+    offsets = np.sort(rng.integers(0, PartitionStore.NS_PER_DAY, size=(num_days, ticks_per_day)), axis=1)
+    dates = (day_starts[:, None] + offsets).ravel()
+    bid_points = 110_000 + np.cumsum(rng.integers(-3, 4, num_ticks))
+    ask_points = bid_points + rng.integers(1, 20, num_ticks)
+    df = pd.DataFrame(
+        data={
+            "ask": ask_points / DataDownloader.PRICE_SCALE,
+            "bid": bid_points / DataDownloader.PRICE_SCALE,
+            "ask_vol": rng.random(num_ticks).astype(np.float32).astype(np.float64),
+            "bid_vol": rng.random(num_ticks).astype(np.float32).astype(np.float64),
+        },
+        index=pd.DatetimeIndex(dates.view("datetime64[ns]"), name="date"),
+    )
+    df["mid"] = (df["ask"] + df["bid"]) / 2
+    df["spread"] = df["ask"] - df["bid"]
+    return DataDownloader.calc_columns(df)
+
+
+def synthetic_datafile(num_days: int = 5, ticks_per_day: int = 50_000, seed: int = 0, ticker: str = "SYNTH") -> DataFile:
+    # the first tick has no return, so it is dropped like the ticks the downloads cannot price
+    return DataFile(ticker=ticker, df_ts=synthetic_ts(num_days=num_days, ticks_per_day=ticks_per_day, seed=seed).dropna())
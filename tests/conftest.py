@@ -0,0 +1,20 @@
+import pytest
+
+from tests.SyntheticData import synthetic_datafile
+from DataDownload.DataFile import DataFile
+from DataDownload.DownloadEngine import DownloadEngine
+from tests.LocalBi5Server import LocalBi5Server
+
+
+@pytest.fixture
+def bi5_server(monkeypatch):
+    server = LocalBi5Server().start()
+    monkeypatch.setattr(DownloadEngine, "BASE_URL", server.url)
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def security() -> DataFile:
+    # small enough for the legacy rolling applies, ~125 ticks per hour
+    return synthetic_datafile(num_days=2, ticks_per_day=3000)
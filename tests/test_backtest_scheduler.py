@@ -0,0 +1,83 @@
+import os
+from datetime import date
+
+import pandas as pd
+
+from Backtesting.AggBacktestResult import AggBacktestResult
+from Backtesting.BacktestResult import BacktestResult
+from Backtesting.BacktestScheduler import BacktestScheduler, DataSource
+from Backtesting.Indicator import IndicatorCache
+from Backtesting.Strategy import GoldenCrossStrategy, TrendStrategy
+from tests.SyntheticData import synthetic_datafile
+from DataDownload.DataFile import DataFile
+
+DATASET = ("SYNTH0", date(2023, 1, 2), 0, date(2023, 1, 4))
+
+
+class SyntheticSource(DataSource):
+    def __init__(self):
+        super().__init__()
+        # (pid, ticker, start_date, end_date) of the updates and (pid, update) of the loaded DataFiles
+        self.updates, self.loads = [], []
+
+    def update(self, ticker: str, start_date: date, end_date: date) -> None:
+        self.updates.append((os.getpid(), ticker, start_date, end_date))
+
+    def datafile(self, ticker: str, start_date: date, end_date: date, update: bool = True) -> DataFile:
+        self.loads.append((os.getpid(), update))
+        return synthetic_datafile(num_days=3, ticks_per_day=2000, seed=int(ticker[-1]), ticker=ticker)
+
+
+def test_benchmark_spans_the_dates_of_the_stored_results():
+    source = SyntheticSource()
+    data = source.datafile(*DATASET[:2], DATASET[3])
+    # a stored result of an earlier run that starts a day later than the DataFile
+    mid = data.mid.loc["2023-01-03":]
+    stored = [BacktestResult(ticker=data.ticker, performance_rel=mid / mid.iloc[0], strategy_name="Stored")]
+
+    [(dataset, results, mid, complete)] = list(BacktestScheduler(source, backtest=False).run([DATASET], []))
+    assert complete and results == []
+    expected = AggBacktestResult(list(stored), data_file=data, with_ts=True)
+    aggregated = AggBacktestResult(list(stored), benchmark_mid=mid, with_ts=True)
+    pd.testing.assert_frame_equal(aggregated.info, expected.info)
+    pd.testing.assert_frame_equal(aggregated.performance, expected.performance)
+
+
+def test_worker_processes_activate_the_indicator_cache(tmp_path):
+    IndicatorCache.deactivate()
+    settings = dict(folder=str(tmp_path))
+    scheduler = BacktestScheduler(SyntheticSource(), processes=2, initializer=IndicatorCache.activate_new, initargs=(settings,))
+    # one dataset split over both processes, each process caches the indicators of its strategy on disk
+    outputs = list(scheduler.run([DATASET], [TrendStrategy(), GoldenCrossStrategy()]))
+    assert [complete for *_, complete in outputs] == [False, True]
+    assert outputs[0][2] is None and outputs[1][2] is not None
+    assert IndicatorCache.active is None
+    assert os.listdir(tmp_path)
+
+
+def test_stored_ts_is_updated_once_per_ticker_before_dispatching():
+    source = SyntheticSource()
+    datasets = [
+        ("SYNTH0", date(2023, 1, 2), 0, date(2023, 1, 4)),
+        ("SYNTH0", date(2023, 1, 3), 0, date(2023, 1, 6)),
+        ("SYNTH0", date(2023, 1, 7), 0, date(2023, 1, 8)),
+        ("SYNTH0", date(2023, 1, 12), 0, date(2023, 1, 13)),
+        ("SYNTH1", date(2023, 1, 2), 0, date(2023, 1, 4)),
+    ]
+    list(BacktestScheduler(source, processes=2, backtest=False).run(datasets, []))
+    # overlapping and adjacent windows are merged, the updates run serially in this process
+    assert source.updates == [
+        (os.getpid(), "SYNTH0", date(2023, 1, 2), date(2023, 1, 8)),
+        (os.getpid(), "SYNTH0", date(2023, 1, 12), date(2023, 1, 13)),
+        (os.getpid(), "SYNTH1", date(2023, 1, 2), date(2023, 1, 4)),
+    ]
+
+
+def test_published_dataset_yields_its_mid_prices_from_this_process():
+    source = SyntheticSource()
+    expected = source.datafile(*DATASET[:2], DATASET[3]).mid
+    outputs = list(BacktestScheduler(source, processes=2).run([DATASET], [TrendStrategy(), GoldenCrossStrategy()]))
+    # the dataset is loaded once here without updating the store and published to both tasks
+    assert source.loads[1:] == [(os.getpid(), False)]
+    assert outputs[0][2] is None
+    pd.testing.assert_series_equal(outputs[1][2], expected, check_names=False, check_index_type=False)
@@ -0,0 +1,89 @@
+import os
+import time
+from datetime import datetime
+
+from DataDownload.Bi5Cache import Bi5Cache
+from DataDownload.DownloadEngine import DownloadEngine
+from tests.LocalBi5Server import fake_bi5
+
+TICKER = "EURUSD"
+HOURS = [datetime(2023, 1, 2, 10), datetime(2023, 1, 2, 11), datetime(2023, 1, 2, 12)]
+
+
+def run(cache: Bi5Cache, hours: list[datetime]) -> dict[datetime, None | bytes]:
+    results = {}
+    DownloadEngine(num_threads=2, cache=cache).run(ticker=TICKER, timestamps=hours, on_result=results.__setitem__, log_delta=60)
+    return results
+
+
+def objects(cache: Bi5Cache) -> list[str]:
+    return [file for _, _, files in os.walk(f"{cache.folder}/objects") for file in files]
+
+
+def test_miss_then_hit(bi5_server, tmp_path):
+    bi5_server.add(TICKER, HOURS[0], fake_bi5(50, seed=0))
+    bi5_server.add(TICKER, HOURS[1], fake_bi5(60, seed=1))
+    cache = Bi5Cache(folder=str(tmp_path), max_bytes=None)
+
+    first = run(cache, HOURS)
+    assert (cache.hits, cache.misses) == (0, 3)
+    assert first[HOURS[2]] is None
+    assert (TICKER, HOURS[0]) in cache and (TICKER, HOURS[1]) in cache and (TICKER, HOURS[2]) not in cache
+
+    second = run(cache, HOURS)
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert second == first
+    # only the hour without a file is requested again
+    assert [bi5_server.hour_requests(TICKER, hour) for hour in HOURS] == [1, 1, 2]
+
+
+def test_identical_hours_are_stored_once(tmp_path):
+    raw = fake_bi5(40)
+    cache = Bi5Cache(folder=str(tmp_path), max_bytes=None)
+    cache.put(TICKER, HOURS[0], raw)
+    cache.put(TICKER, HOURS[1], raw)
+    assert len(objects(cache)) == 1
+    assert cache.size == len(raw)
+
+    cache.remove(TICKER, HOURS[0])
+    assert cache.get(TICKER, HOURS[1]) == raw
+    cache.remove(TICKER, HOURS[1])
+    assert objects(cache) == [] and cache.size == 0
+
+
+def test_least_recently_used_hour_is_evicted(tmp_path):
+    raws = [fake_bi5(40, seed=seed) for seed in range(3)]
+    cache = Bi5Cache(folder=str(tmp_path), max_bytes=len(raws[0]) + len(raws[1]) + len(raws[2]) // 2)
+    for hour, raw in zip(HOURS[:2], raws[:2]):
+        cache.put(TICKER, hour, raw)
+        time.sleep(0.01)
+    cache.get(TICKER, HOURS[0])
+    time.sleep(0.01)
+    cache.put(TICKER, HOURS[2], raws[2])
+
+    assert (TICKER, HOURS[0]) in cache and (TICKER, HOURS[1]) not in cache and (TICKER, HOURS[2]) in cache
+    assert cache.size == len(raws[0]) + len(raws[2])
+    assert len(objects(cache)) == 2
+
+
+def test_only_cache_makes_no_requests(bi5_server, tmp_path):
+    raw = fake_bi5(50)
+    bi5_server.add(TICKER, HOURS[0], raw)
+    bi5_server.add(TICKER, HOURS[1], raw)
+    Bi5Cache(folder=str(tmp_path)).put(TICKER, HOURS[0], raw)
+    cache = Bi5Cache(folder=str(tmp_path), only_cache=True)
+
+    results = run(cache, HOURS[:2])
+    assert results[HOURS[0]] == DownloadEngine.decompress_bi5(raw)
+    assert results[HOURS[1]] is None
+    assert sum(bi5_server.requests.values()) == 0
+
+
+def test_evict_with_empty_index(tmp_path):
+    cache = Bi5Cache(folder=str(tmp_path), max_bytes=10)
+    cache.put(TICKER, HOURS[0], fake_bi5(40))
+    # the entries were removed by another process sharing the folder
+    cache._db.execute("DELETE FROM entries")
+    cache._total_bytes = 1000
+    cache._evict()
+    assert cache._total_bytes == 0
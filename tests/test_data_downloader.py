@@ -0,0 +1,57 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from DataDownload.DataDownloader import DataDownloader
+from DataDownload.DownloadManifest import DownloadManifest
+from DataDownload.PartitionStore import PartitionStore
+from tests.LocalBi5Server import fake_bi5
+
+TICKER = "EURUSD"
+DAY = [datetime(2023, 1, 2, hour) for hour in range(4)]
+
+
+@pytest.fixture
+def staging_folder(tmp_path, monkeypatch):
+    folder = tmp_path / "Staging"
+    monkeypatch.setattr(DataDownloader, "STAGING_FOLDER", str(folder))
+    return folder
+
+
+def test_staging_is_removed_when_the_download_fails(staging_folder, monkeypatch):
+    def failing_stream(**kwargs):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(DataDownloader, "stream_data", staticmethod(failing_stream))
+    with pytest.raises(RuntimeError):
+        DataDownloader.download_hours(ticker=TICKER, hours=DAY)
+    assert os.listdir(staging_folder) == []
+
+
+def test_download_hours_reads_only_the_downloaded_days(bi5_server, staging_folder):
+    for seed, hour in enumerate(DAY):
+        bi5_server.add(TICKER, hour, fake_bi5(30, seed=seed))
+    df = DataDownloader.download_hours(ticker=TICKER, hours=DAY)
+    assert len(df) == 4 * 30
+    assert df.index.is_monotonic_increasing
+    assert os.listdir(staging_folder) == []
+
+
+def test_hours_are_appended_into_the_existing_partition(bi5_server, tmp_path):
+    for seed, hour in enumerate(DAY[:3]):
+        bi5_server.add(TICKER, hour, fake_bi5(30, seed=seed))
+    store = PartitionStore(str(tmp_path / "store"))
+    manifest = DownloadManifest()
+    DataDownloader.download_hours_into(ticker=TICKER, hours=DAY[:2], store=store, manifest=manifest, append=True)
+    DataDownloader.download_hours_into(ticker=TICKER, hours=DAY[2:], store=store, manifest=manifest, append=True)
+    assert manifest.status(DAY[3]) == DownloadManifest.FAILED
+
+    # the NaN row of the failed hour is replaced once the hour is downloaded
+    bi5_server.add(TICKER, DAY[3], fake_bi5(30, seed=3))
+    DataDownloader.download_hours_into(ticker=TICKER, hours=manifest.todo(DAY[0].date(), DAY[0].date())[:1], store=store, manifest=manifest, append=True)
+    df = store.read()
+    assert manifest.status(DAY[3]) == DownloadManifest.PRESENT
+    assert len(df) == 4 * 30 and not np.isnan(df.to_numpy()).any()
+    assert df.index.is_monotonic_increasing
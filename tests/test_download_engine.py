@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+
+from DataDownload.DataDownloader import DataDownloader
+from DataDownload.DownloadEngine import DownloadEngine
+from DataDownload.DownloadManifest import DownloadManifest
+from DataDownload.PartitionStore import PartitionStore
+from tests.LocalBi5Server import fake_bi5
+
+TICKER = "EURUSD"
+HOURS = [datetime(2023, 1, 2, hour) for hour in range(6)]
+
+
+@pytest.mark.parametrize("num_threads", [1, 3])
+def test_failing_on_result_keeps_the_workers_alive(bi5_server, num_threads):
+    for seed, hour in enumerate(HOURS):
+        bi5_server.add(TICKER, hour, fake_bi5(20, seed=seed))
+    results = {}
+
+    def on_result(timestamp, decompressed):
+        if decompressed is not None and timestamp.hour % 2 == 0:
+            raise ValueError("truncated payload")
+        results[timestamp] = decompressed
+
+    stats = DownloadEngine(num_threads=num_threads).run(ticker=TICKER, timestamps=HOURS, on_result=on_result, log_delta=60)
+    assert (stats["done"], stats["failed"]) == (6, 3)
+    assert sorted(results) == HOURS
+    assert [results[hour] is None for hour in HOURS] == [True, False] * 3
+
+
+def test_undecodable_hour_is_recorded_as_failed(bi5_server, tmp_path, monkeypatch):
+    for seed, hour in enumerate(HOURS):
+        bi5_server.add(TICKER, hour, fake_bi5(20, seed=seed))
+    decode_bi5 = DataDownloader.decode_bi5
+
+    def failing_decode(decompressed, timestamp):
+        if timestamp == HOURS[2] and decompressed:
+            raise ValueError("truncated payload")
+        return decode_bi5(decompressed, timestamp)
+
+    monkeypatch.setattr(DataDownloader, "decode_bi5", staticmethod(failing_decode))
+    manifest = DownloadManifest()
+    df = DataDownloader.download_hours(ticker=TICKER, hours=HOURS, num_threads=2, store=PartitionStore(str(tmp_path)), manifest=manifest)
+
+    # the day is still written, the failed hour is downloaded again by the next run
+    assert [manifest.status(hour) for hour in HOURS] == [DownloadManifest.PRESENT] * 2 + [DownloadManifest.FAILED] + [DownloadManifest.PRESENT] * 3
+    assert manifest.todo(HOURS[0].date(), HOURS[0].date())[0] == HOURS[2]
+    assert (df.index.floor("h").unique() == HOURS).all()
+    assert len(df) == 5 * 20 + 1
@@ -0,0 +1,83 @@
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.SyntheticData import synthetic_ts
+from DataDownload.DataDownloader import DataDownloader
+from DataDownload.DataStore import BaseDataStore, LocalDataStore
+from DataDownload.DownloadManifest import DownloadManifest
+from DataDownload.PartitionStore import PartitionStore
+from tests.LocalBi5Server import fake_bi5
+
+TICKER = "SYNTH"
+FAILED_HOUR = datetime(2023, 1, 3, 5)
+
+
+def stored_ts() -> pd.DataFrame:
+    # three days of ticks in every hour, FAILED_HOUR is kept as the all-NaN row of a failed download
+    df = synthetic_ts(num_days=3, ticks_per_day=2_000).loc[:, PartitionStore.COLUMNS]
+    df = df.loc[df.index.floor("h") != FAILED_HOUR]
+    df.loc[pd.Timestamp(FAILED_HOUR)] = np.nan
+    return DataDownloader.calc_columns(df.sort_index(kind="stable"))
+
+
+@pytest.fixture
+def csv_store(tmp_path):
+    data_store = LocalDataStore(ticker=TICKER, file_format="csv", agg_data_folder=str(tmp_path / "csv"), agg_npy_folder=str(tmp_path / "npy"))
+    data_store.upload_ts(stored_ts())
+    return data_store
+
+
+def test_merge_equals_a_full_recompute():
+    full = synthetic_ts(num_days=3, ticks_per_day=2_000).loc[:, PartitionStore.COLUMNS]
+    for hours in ([FAILED_HOUR], [datetime(2023, 1, 4, hour) for hour in range(20, 24)], [datetime(2023, 1, 2, 0)]):
+        new = full.loc[full.index.floor("h").isin(pd.DatetimeIndex(hours))]
+        stored = full.loc[~full.index.floor("h").isin(pd.DatetimeIndex(hours))]
+        stored = DataDownloader.calc_columns(pd.concat([stored, pd.DataFrame(np.nan, index=pd.DatetimeIndex(hours), columns=stored.columns)]).sort_index(kind="stable"))
+        merged = BaseDataStore.merge_ts(stored, new, hours)
+        expected = DataDownloader.calc_columns(full)
+        assert (merged.index == expected.index).all()
+        assert np.array_equal(merged.to_numpy(), expected.loc[:, merged.columns].to_numpy(), equal_nan=True)
+
+
+def test_manifest_is_derived_from_the_requested_days_only(csv_store, monkeypatch):
+    ranges = []
+    download_ts = csv_store.download_ts
+    monkeypatch.setattr(csv_store, "download_ts", lambda start_date=None, end_date=None: ranges.append((start_date, end_date)) or download_ts(start_date, end_date))
+
+    manifest = csv_store.download_manifest(start_date=date(2023, 1, 3), end_date=date(2023, 1, 3))
+    assert ranges == [(date(2023, 1, 3), date(2023, 1, 3))]
+    assert manifest.status(FAILED_HOUR) == DownloadManifest.UNKNOWN
+    assert manifest.todo(date(2023, 1, 3), date(2023, 1, 3)) == [FAILED_HOUR]
+    assert manifest.summary(date(2023, 1, 3), date(2023, 1, 3)) == dict(present=23, empty=0, failed=0, unknown=1)
+    assert "2023_01_02" not in manifest.days
+
+
+def test_manifest_is_stored_on_every_run(csv_store, bi5_server, monkeypatch):
+    bi5_server.add(TICKER, FAILED_HOUR, fake_bi5(30))
+    day = date(2023, 1, 3)
+    manifest = csv_store.update_ts(start_date=day, end_date=day)
+    assert manifest.status(FAILED_HOUR) == DownloadManifest.PRESENT
+    assert bi5_server.hour_requests(TICKER, FAILED_HOUR) == 1
+    assert csv_store.read_manifest().days == manifest.days
+
+    # a covered range is neither derived from the ts nor downloaded again
+    monkeypatch.setattr(csv_store, "download_ts", lambda **kwargs: pytest.fail("the ts was read to derive the manifest"))
+    monkeypatch.setattr(csv_store, "download_hours", lambda **kwargs: pytest.fail("hours were downloaded"))
+    assert csv_store.update_ts(start_date=day, end_date=day).days == manifest.days
+
+
+def test_appended_hours_keep_the_stored_columns_before_them(csv_store, bi5_server):
+    bi5_server.add(TICKER, FAILED_HOUR, fake_bi5(30))
+    before = csv_store.download_ts()
+    csv_store.update_ts(start_date=date(2023, 1, 3), end_date=date(2023, 1, 3))
+    after = csv_store.download_ts()
+    # the csv is parsed without round trip precision, so the rows are compared with a tolerance
+    head = before.index < pd.Timestamp(FAILED_HOUR)
+    assert np.allclose(after.loc[after.index < pd.Timestamp(FAILED_HOUR)].to_numpy(), before.loc[head].to_numpy(), rtol=1e-12, atol=0, equal_nan=True)
+    assert len(after) == len(before) - 1 + 30
+    assert after.loc[after.index.floor("h") == FAILED_HOUR, "bid"].notna().all()
+    expected = DataDownloader.calc_columns(after.loc[:, PartitionStore.COLUMNS])
+    assert np.allclose(after["returns"].to_numpy(), expected["returns"].to_numpy(), rtol=1e-9, atol=0, equal_nan=True)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from Backtesting.Indicator import IndicatorCache, KeltnerChannelsIndicator
+from Backtesting.Indicator.IndicatorGraph import IndicatorGraph
+
+
+def test_constants_are_keyed_by_content():
+    graph = IndicatorGraph()
+    first = graph.constant("atr", np.arange(4, dtype=np.float64))
+    assert graph.constant("atr", np.arange(4, dtype=np.float64)) is first
+    assert graph.constant("atr", np.arange(1, 5, dtype=np.float64)) is not first
+    assert graph.constant("atr", np.arange(4, dtype=np.float32)) is not first
+
+
+def test_cached_band_signal_follows_the_constant(security, tmp_path):
+    indicator = KeltnerChannelsIndicator(min_period=relativedelta(hours=1), min_period_ticks=20)
+    atrs = [pd.Series(width, index=security.index) for width in (1e-5, 1e-3)]
+    IndicatorCache.deactivate()
+    expected = [indicator.series_signal(security, atr=atr) for atr in atrs]
+    assert not expected[0].equals(expected[1])
+
+    cache = IndicatorCache(folder=str(tmp_path)).activate()
+    try:
+        for _ in range(2):
+            for atr, signal in zip(atrs, expected):
+                pd.testing.assert_series_equal(indicator.series_signal(security, atr=atr), signal)
+        # the ema and each band signal are computed once
+        assert (cache.misses, cache.hits) == (3, 5)
+    finally:
+        IndicatorCache.deactivate()
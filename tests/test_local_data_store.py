@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+
+from tests.SyntheticData import synthetic_ts
+from DataDownload.DataStore import LocalDataStore
+from DataDownload.DownloadManifest import DownloadManifest
+
+
+def local_store(folder, ticker: str = "SYNTH", file_format: str = "npy") -> LocalDataStore:
+    return LocalDataStore(ticker=ticker, file_format=file_format, agg_data_folder=f"{folder}/csv", agg_npy_folder=f"{folder}/npy")
+
+
+def test_npy_round_trip_is_exact(tmp_path):
+    df = synthetic_ts(num_days=3, ticks_per_day=500)
+    data_store = local_store(tmp_path)
+    data_store.upload_ts(df)
+    loaded = data_store.download_ts()
+    assert (loaded.index == df.index).all()
+    assert np.array_equal(loaded.to_numpy(), df.loc[:, loaded.columns].to_numpy(), equal_nan=True)
+
+
+def test_empty_npy_folder_falls_back_to_csv(tmp_path):
+    df = synthetic_ts(num_days=2, ticks_per_day=100)
+    local_store(tmp_path, file_format="csv").upload_ts(df)
+    os.makedirs(f"{tmp_path}/npy/SYNTH")
+    data_store = local_store(tmp_path)
+    assert data_store.file_format == "csv"
+    assert data_store.ts_file_exists()
+    assert len(data_store.download_ts()) == len(df)
+
+
+def test_reading_creates_no_folders(tmp_path):
+    data_store = local_store(tmp_path)
+    assert not data_store.ts_file_exists()
+    assert data_store.download_manifest().days == {}
+    assert data_store.partition_store.days() == []
+    assert os.listdir(tmp_path) == []
+
+
+def test_folders_are_per_instance(tmp_path):
+    local_store(tmp_path)
+    assert LocalDataStore(ticker="SYNTH").folder_path_ts == f"{LocalDataStore.AGG_NPY_FOLDER}/SYNTH"
+
+
+def test_migration_moves_the_manifest(tmp_path):
+    df = synthetic_ts(num_days=2, ticks_per_day=100)
+    csv_store = local_store(tmp_path, file_format="csv")
+    csv_store.upload_ts(df)
+    manifest = DownloadManifest.from_ts(df)
+    csv_store.upload_manifest(manifest)
+    csv_store.migrate_csv_to_npy(delete_csv=True)
+    assert csv_store.file_format == "npy"
+    assert not os.path.exists(csv_store.csv_manifest_path)
+    data_store = local_store(tmp_path)
+    assert data_store.file_format == "npy"
+    assert data_store.read_manifest().days == manifest.days
@@ -0,0 +1,45 @@
+from datetime import date, datetime
+
+import pytest
+
+from DataDownload.ColumnDataFile import ColumnDataFile
+from DataDownload.DataStore import LocalDataStore
+from tests.LocalBi5Server import fake_bi5
+
+TICKER = "EURUSD"
+DAY = date(2023, 1, 2)
+
+
+@pytest.fixture
+def data_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(ColumnDataFile, "MEMMAP_FOLDER", str(tmp_path / "Memmap"))
+    return LocalDataStore(ticker=TICKER, agg_data_folder=str(tmp_path / "csv"), agg_npy_folder=str(tmp_path / "npy"))
+
+
+def test_snapshot_is_rewritten_when_the_stored_ts_changes(bi5_server, data_store, monkeypatch):
+    for hour in range(4):
+        bi5_server.add(TICKER, datetime(2023, 1, 2, hour), fake_bi5(30, seed=hour))
+    writes = []
+    write_memmap = ColumnDataFile.write_memmap
+    monkeypatch.setattr(ColumnDataFile, "write_memmap", lambda self, folder, fingerprint=None: writes.append(folder) or write_memmap(self, folder, fingerprint))
+
+    # the first tick has no return and is dropped
+    assert len(data_store.create_datafile(start_date=DAY, end_date=DAY, memmap=True)) == 4 * 30 - 1
+    assert len(data_store.create_datafile(start_date=DAY, end_date=DAY, memmap=True)) == 4 * 30 - 1
+    assert len(writes) == 1
+
+    # a failed hour becomes available and is repaired by the next run
+    bi5_server.add(TICKER, datetime(2023, 1, 2, 7), fake_bi5(30, seed=7))
+    security = data_store.create_datafile(start_date=DAY, end_date=DAY, memmap=True)
+    assert len(writes) == 2
+    assert len(security) == 5 * 30 - 1
+    assert (security.index == data_store.create_datafile(start_date=DAY, end_date=DAY).index).all()
+
+
+def test_snapshot_without_fingerprint_is_rewritten(bi5_server, data_store):
+    bi5_server.add(TICKER, datetime(2023, 1, 2, 1), fake_bi5(30))
+    security = data_store.create_datafile(start_date=DAY, end_date=DAY, memmap=True)
+    folder = ColumnDataFile.memmap_folder(TICKER, DAY, DAY)
+    ColumnDataFile.from_data_file(security.slice(0, 10)).write_memmap(folder)
+    assert ColumnDataFile.memmap_fingerprint(folder) is None
+    assert len(data_store.create_datafile(start_date=DAY, end_date=DAY, memmap=True)) == 30 - 1
@@ -0,0 +1,20 @@
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from Backtesting.ParameterSweep import ParameterSweep
+from Backtesting.Strategy import CombinationStrategy
+
+GRID: dict[str, list] = {
+    "min_period": [relativedelta(hours=1), relativedelta(hours=2)],
+    "rsi_lower": [20, 30],
+    "so_upper": [80, 90],
+}
+
+
+def test_process_pool_matches_serial(security):
+    start_at = len(security.index) // 2
+    serial = ParameterSweep(security, CombinationStrategy, GRID, start_at=start_at).run()
+    # the workers attach to the shared memory of the DataFile, two chunks of four combinations
+    pooled = ParameterSweep(security, CombinationStrategy, GRID, start_at=start_at, processes=2).run()
+    assert len(serial) == 8
+    pd.testing.assert_frame_equal(pooled, serial, check_exact=True)
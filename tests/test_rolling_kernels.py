@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from Backtesting.Indicator import (
+    BollingerBandsIndicator,
+    ExponentialMovingAverageIndicator,
+    RelativeStrengthIndexIndicator,
+    SimpleAverageTrueRangeIndicator,
+    SimpleMovingAverageIndicator,
+    StochasticOscillatorIndicator,
+)
+from Backtesting.Indicator.IndicatorGraph import IndicatorGraph
+from Backtesting.Indicator.RollingKernels import rolling_stochastic, stochastic_k
+from tests.Legacy import legacy_atr, legacy_ema, legacy_rsi, legacy_sma, legacy_soi, legacy_soi_indication, legacy_std, pandas_ewm
+
+# (min_period, min_period_ticks, n of the atr)
+WINDOWS = [
+    (relativedelta(hours=1), 20, 14),
+    (relativedelta(hours=2), 100, 5),
+    # the tick window is wider than the time window
+    (relativedelta(minutes=5), 300, 9),
+]
+
+# indicator of a window, its kernel series and the series of the previous implementation
+KERNELS = {
+    "sma": (
+        lambda min_period, ticks, n: SimpleMovingAverageIndicator(min_period=min_period, min_period_ticks=ticks),
+        lambda indicator, security: IndicatorGraph.compute(security, indicator.node),
+        lambda indicator, security: legacy_sma(security, indicator.timedelta_min_period, indicator.min_period_ticks),
+    ),
+    "rsi": (
+        lambda min_period, ticks, n: RelativeStrengthIndexIndicator(min_period=min_period, min_period_ticks=ticks),
+        lambda indicator, security: IndicatorGraph.compute(security, indicator.node),
+        lambda indicator, security: legacy_rsi(security, indicator.timedelta_min_period, indicator.min_period_ticks),
+    ),
+    "atr": (
+        lambda min_period, ticks, n: SimpleAverageTrueRangeIndicator(min_period=min_period, min_period_ticks=ticks, n=n),
+        lambda indicator, security: indicator.series_indication(security),
+        legacy_atr,
+    ),
+    "bollinger_std": (
+        lambda min_period, ticks, n: BollingerBandsIndicator(min_period=min_period, min_period_ticks=ticks),
+        lambda indicator, security: IndicatorGraph.compute(security, indicator.std_node),
+        legacy_std,
+    ),
+    "stochastic": (
+        lambda min_period, ticks, n: StochasticOscillatorIndicator(min_period=min_period, min_period_ticks=ticks),
+        lambda indicator, security: indicator.series_low_high(security).soi,
+        legacy_soi,
+    ),
+    "stochastic_indication": (
+        lambda min_period, ticks, n: StochasticOscillatorIndicator(min_period=min_period, min_period_ticks=ticks),
+        lambda indicator, security: indicator.series_indication(security).map(lambda indication: indication.value),
+        lambda indicator, security: legacy_soi_indication(indicator, security).map(lambda indication: indication.value),
+    ),
+    "compat_ema": (
+        lambda min_period, ticks, n: ExponentialMovingAverageIndicator(min_period=min_period, min_period_ticks=ticks),
+        lambda indicator, security: indicator.series_indication(security),
+        legacy_ema,
+    ),
+}
+
+
+@pytest.mark.parametrize("window", WINDOWS, ids=["1h", "2h", "5min"])
+@pytest.mark.parametrize("name", list(KERNELS))
+def test_kernel_matches_legacy(security, name: str, window: tuple):
+    build, kernel, legacy = KERNELS[name]
+    indicator = build(*window)
+    expected = np.asarray(legacy(indicator, security), dtype=np.float64)
+    actual = np.asarray(kernel(indicator, security), dtype=np.float64)
+    if name == "bollinger_std":
+        # Welford updates round differently than the two pass np.std, so only the last bits may differ
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-15)
+    else:
+        np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize("mode", [ExponentialMovingAverageIndicator.SPAN, ExponentialMovingAverageIndicator.TIME])
+def test_recursive_ema_matches_pandas_ewm(security, mode):
+    indicator = ExponentialMovingAverageIndicator(min_period=relativedelta(hours=1), min_period_ticks=20, mode=mode)
+    pd.testing.assert_series_equal(indicator.series_indication(security), pandas_ewm(indicator, security), check_exact=True)
+
+
+def test_empty_stochastic_window_is_nan():
+    values = np.array([1.0, 3.0, 2.0, 2.0])
+    low, high, k = rolling_stochastic(values, np.array([0, 2, 2, 4]))
+    np.testing.assert_array_equal(k, [50.0, np.nan, 50.0, np.nan])
+    np.testing.assert_array_equal(low, [1.0, np.nan, 2.0, np.nan])
+    assert np.isnan(stochastic_k(values[:0]))
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.SyntheticData import synthetic_ts
+from DataDownload.DataDownloader import DataDownloader
+from DataDownload.DataStore import SplitBucketDataStore
+from DataDownload.DataStore.LocalBucket import LocalBucket
+from DataDownload.PartitionStore import PartitionStore
+
+TICKER = "SYNTH"
+
+
+@pytest.fixture
+def full() -> pd.DataFrame:
+    # 2023-01-16 until 2023-03-16
+    return synthetic_ts(num_days=60, ticks_per_day=300, start="2023-01-16")
+
+
+@pytest.fixture
+def bucket(tmp_path) -> LocalBucket:
+    return LocalBucket(str(tmp_path))
+
+
+def without_hours(df: pd.DataFrame, hours: list[datetime]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    in_hours = df.index.floor("h").isin(pd.DatetimeIndex(hours))
+    return DataDownloader.calc_columns(df.loc[~in_hours, PartitionStore.COLUMNS]), df.loc[in_hours, PartitionStore.COLUMNS]
+
+
+def uploaded(bucket: LocalBucket, action) -> list[str]:
+    names = []
+    upload_dfs = SplitBucketDataStore.upload_dfs
+
+    def recording_upload(self, to_upload, tracker=None):
+        names.extend(to_upload)
+        return upload_dfs(self, to_upload, tracker)
+
+    SplitBucketDataStore.upload_dfs = recording_upload
+    try:
+        action()
+    finally:
+        SplitBucketDataStore.upload_dfs = upload_dfs
+    return sorted(names)
+
+
+def test_upload_only_changed_partitions(full, bucket):
+    data_store = SplitBucketDataStore(ticker=TICKER, bucket=bucket)
+    assert uploaded(bucket, lambda: data_store.upload_ts(full)) == ["2023_01", "2023_02", "2023_03"]
+    assert uploaded(bucket, lambda: data_store.upload_ts(full)) == []
+
+    changed = full.copy()
+    changed.iloc[-1, changed.columns.get_loc("ask_vol")] += 1
+    assert uploaded(bucket, lambda: data_store.upload_ts(changed)) == ["2023_03"]
+    assert np.array_equal(data_store.download_ts().to_numpy(), changed.to_numpy(), equal_nan=True)
+
+    # months no longer in the ts are deleted
+    data_store.upload_ts(changed.loc[changed.index < "2023-03-01"])
+    assert [blob.name.split("/")[-1] for blob in bucket.list_blobs(f"Data/{TICKER}/") if blob.name.endswith(".csv")] == ["2023_01.csv", "2023_02.csv"]
+
+
+def test_append_downloads_and_uploads_only_the_touched_month(full, bucket, monkeypatch):
+    hours = list(pd.date_range("2023-03-16", periods=24, freq="h"))
+    stored, new = without_hours(full, hours)
+    data_store = SplitBucketDataStore(ticker=TICKER, bucket=bucket)
+    data_store.upload_ts(stored)
+
+    downloaded = []
+    download_dfs = data_store.download_dfs
+    monkeypatch.setattr(data_store, "download_dfs", lambda blob_names, final: downloaded.extend(blob_names) or download_dfs(blob_names, final))
+    assert uploaded(bucket, lambda: data_store.append_ts(new, hours)) == ["2023_03"]
+    assert [blob_name.split("/")[-1] for blob_name in downloaded] == ["2023_03.csv"]
+    assert np.array_equal(data_store.download_ts().to_numpy(), full.to_numpy(), equal_nan=True)
+
+
+@pytest.mark.parametrize("hours", [pd.date_range("2023-01-31 20:00", periods=4, freq="h"), pd.date_range("2023-02-01", periods=3, freq="h")])
+def test_append_inside_the_history_equals_a_full_recompute(full, bucket, hours):
+    # a gap at the end of a month changes the first return of the next month, a gap at its start needs the previous bid
+    hours = list(hours)
+    stored, new = without_hours(full, hours)
+    data_store = SplitBucketDataStore(ticker=TICKER, bucket=bucket)
+    data_store.upload_ts(stored)
+    assert uploaded(bucket, lambda: data_store.append_ts(new, hours)) == (["2023_01", "2023_02"] if hours[0].month == 1 else ["2023_02"])
+    assert np.array_equal(data_store.download_ts().to_numpy(), full.to_numpy(), equal_nan=True)
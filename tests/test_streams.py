@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from Backtesting.Indicator import (
+    BollingerBandsIndicator,
+    ExponentialMovingAverageIndicator,
+    KeltnerChannelsIndicator,
+    RelativeStrengthIndexIndicator,
+    SimpleAverageTrueRangeIndicator,
+    SimpleMovingAverageIndicator,
+    StochasticOscillatorIndicator,
+    Indication,
+)
+from Backtesting.Indicator.BaseIndicators import BaseIndicator, BoundedCache
+from Backtesting.Indicator.IndicatorGraph import IndicatorGraph
+
+HOUR = relativedelta(hours=1)
+# running sums and Welford updates round differently than the sums over each window
+RTOL = 1e-9
+
+
+def flat(value) -> list[float]:
+    return list(value.values()) if isinstance(value, dict) else [value]
+
+
+@pytest.mark.parametrize(
+    "indicator, rtol",
+    [
+        (SimpleMovingAverageIndicator(min_period=HOUR, min_period_ticks=20), RTOL),
+        (SimpleAverageTrueRangeIndicator(min_period=HOUR, min_period_ticks=20), 0.0),
+        (ExponentialMovingAverageIndicator(min_period=HOUR, min_period_ticks=20), 0.0),
+        (BollingerBandsIndicator(min_period=HOUR, min_period_ticks=20), RTOL),
+        (KeltnerChannelsIndicator(min_period=HOUR, min_period_ticks=20), 0.0),
+        (RelativeStrengthIndexIndicator(min_period=2 * HOUR, min_period_ticks=40), RTOL),
+        # the tick window is wider than the time window
+        (StochasticOscillatorIndicator(min_period=relativedelta(minutes=5), min_period_ticks=300), 0.0),
+    ],
+)
+def test_stream_matches_indication_at(security, indicator: BaseIndicator, rtol: float):
+    stream = indicator.stream()
+    indicator.limit_cache(None)
+    for i, (date, price) in enumerate(zip(security.index.as_unit("ns").asi8.tolist(), security.mid.tolist())):
+        result = stream.update_ns(date, price)
+        expected = indicator.indication_at(security, i)
+        if isinstance(expected, Indication):
+            assert result == expected
+        else:
+            np.testing.assert_allclose(result, expected, rtol=rtol, atol=0.0)
+        np.testing.assert_allclose(flat(getattr(stream, "value", result)), flat(indicator.idx_cache[i + 1]), rtol=rtol, atol=0.0)
+
+
+@pytest.mark.parametrize(
+    "indicator",
+    [
+        SimpleAverageTrueRangeIndicator(min_period=HOUR, min_period_ticks=20, mode=SimpleAverageTrueRangeIndicator.CHUNKS),
+        SimpleAverageTrueRangeIndicator(min_period=HOUR, n=1, mode=SimpleAverageTrueRangeIndicator.CHUNKS, chunk_ticks=7),
+        ExponentialMovingAverageIndicator(min_period=HOUR, min_period_ticks=20, mode=ExponentialMovingAverageIndicator.SPAN),
+        ExponentialMovingAverageIndicator(min_period=HOUR, min_period_ticks=20, mode=ExponentialMovingAverageIndicator.TIME),
+    ],
+)
+def test_recursive_stream_matches_series(security, indicator: BaseIndicator):
+    stream = indicator.stream()
+    values = [stream.update_ns(date, price) for date, price in zip(security.index.as_unit("ns").asi8.tolist(), security.mid.tolist())]
+    np.testing.assert_array_equal(values, IndicatorGraph.compute(security, indicator.node))
+    if isinstance(indicator, SimpleAverageTrueRangeIndicator):
+        np.testing.assert_array_equal([indicator.indication_at(security, i) for i in range(len(values))], values)
+
+
+@pytest.mark.parametrize("recursive", [False, True], ids=["window", "recursive"])
+def test_keltner_streams_signal_the_price_against_the_bands(security, recursive: bool):
+    modes = dict(ema_mode=ExponentialMovingAverageIndicator.SPAN, atr_mode=SimpleAverageTrueRangeIndicator.CHUNKS) if recursive else {}
+    indicator = KeltnerChannelsIndicator(min_period=HOUR, min_period_ticks=20, **modes)
+    stream = indicator.stream()
+    signals = []
+    for date, price in zip(security.index.as_unit("ns").asi8.tolist(), security.mid.tolist()):
+        signal = stream.update_ns(date, price)
+        bands = stream.value
+        assert signal == (Indication.SELL if price <= bands["lower_band"] else Indication.BUY if bands["upper_band"] <= price else Indication.HOLD)
+        signals.append(signal.value)
+    if recursive:
+        expected = indicator.series_signal(security).to_numpy()
+    else:
+        expected = [indicator.indication_at(security, i).value for i in range(len(signals))]
+    np.testing.assert_array_equal(signals, expected)
+    assert {Indication.SELL.value, Indication.BUY.value} <= set(signals)
+
+
+@pytest.mark.parametrize("max_size", [0, 1, 5])
+def test_bounded_cache_keeps_the_last_entries(max_size):
+    cache = BoundedCache(max_size)
+    for i in range(10):
+        cache[i] = i
+    assert list(cache) == list(range(10 - max_size, 10))
+
+
+@pytest.mark.parametrize("cache_size", [0, 3])
+def test_limit_cache_bounds_the_indicator_caches(security, cache_size):
+    indicator = SimpleMovingAverageIndicator(min_period=HOUR, min_period_ticks=20)
+    indicator.limit_cache(cache_size)
+    for i in range(10):
+        indicator.indication_at(security, i)
+    assert len(indicator.date_cache) == len(indicator.idx_cache) == cache_size
+    assert list(indicator.idx_cache) == list(range(11 - cache_size, 11))
+
+
+@pytest.mark.parametrize(
+    "indicator",
+    [
+        SimpleMovingAverageIndicator(min_period=HOUR, min_period_ticks=20),
+        ExponentialMovingAverageIndicator(min_period=HOUR, min_period_ticks=20),
+        RelativeStrengthIndexIndicator(min_period=HOUR, min_period_ticks=20),
+    ],
+)
+def test_series_keeps_the_caches_bounded(security, indicator: BaseIndicator):
+    indicator.limit_cache(3)
+    indicator.series_indication(security)
+    indicator.indication_at(security, 10)
+    assert isinstance(indicator.date_cache, BoundedCache) and isinstance(indicator.idx_cache, BoundedCache)
+    assert len(indicator.date_cache) == len(indicator.idx_cache) == 1
+    # unbounded caches keep the whole series
+    indicator.limit_cache(None)
+    series = indicator.series_indication(security)
+    assert len(indicator.date_cache) == len(indicator.idx_cache) == len(series)
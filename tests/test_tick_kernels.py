@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Backtesting.Backtesting import Backtesting
+from Backtesting.Indicator import TickKernels
+from Backtesting.Indicator.TickView import nan_mean, nan_std
+from Backtesting.Strategy import BaseStrategy, CombinationStrategy, GoldenCrossStrategy, MomentumStrategy, TrendStrategy, VolatilityStrategy
+
+# the positional path calls get_weight_at per tick, so only the last ticks are backtested
+NUM_TICKS = 1500
+
+
+def quiet(done: int, total: int, elapsed) -> None:
+    pass
+
+
+@pytest.mark.parametrize("strategy_class", [MomentumStrategy, GoldenCrossStrategy, TrendStrategy, CombinationStrategy, VolatilityStrategy])
+def test_kernel_matches_get_weight_at(security, monkeypatch, strategy_class: type[BaseStrategy]):
+    start_at = len(security.index) - NUM_TICKS
+    kernel = Backtesting(security, strategy_class(), start_at=start_at, iterative=True, progress=quiet)
+    positional_strategy = strategy_class()
+    monkeypatch.setattr(positional_strategy, "tick_kernel", lambda security: None)
+    positional = Backtesting(security, positional_strategy, start_at=start_at, iterative=True, progress=quiet)
+    assert kernel.strategy.tick_kernel(security) is not None
+    pd.testing.assert_series_equal(kernel.weights, positional.weights, check_exact=True)
+
+
+@pytest.mark.parametrize("length", [1, 2, 7, 8, 9, 127, 128, 129, 300, 1000, 4099])
+def test_reductions_match_numpy(length):
+    # the kernels reproduce the pairwise summation of ndarray.sum, the window weights depend on it bit for bit
+    values = 100 + np.random.default_rng(length).standard_normal(length).cumsum() * 1e-3
+    for period in [values, np.where(np.arange(length) % 5 == 3, np.nan, values)]:
+        assert TickKernels.pairwise_sum(period) == period.sum() or np.isnan(period).any()
+        assert np.array_equal(TickKernels.nan_mean(period), nan_mean(period), equal_nan=True)
+        assert np.array_equal(TickKernels.nan_std(period), nan_std(period), equal_nan=True)
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from Backtesting.Indicator.TickView import TickView
+from Backtesting.Indicator.WindowBounds import WindowBounds
+
+
+def test_starts_are_shared(security):
+    starts = WindowBounds.starts(security, timedelta(hours=1), 20)
+    assert WindowBounds.starts(security, timedelta(hours=1), 20) is starts
+    assert not starts.flags.writeable
+
+
+def test_tick_view_uses_the_left_side_starts(security):
+    view = TickView.of(security)
+    starts = view.starts(timedelta(hours=1), 20)
+    assert WindowBounds.starts(security, timedelta(hours=1), 20, side="left") is starts
+    right = WindowBounds.starts(security, timedelta(hours=1), 20)
+    # [t - 1h, t] holds at least the ticks of (t - 1h, t]
+    assert (starts <= right).all()